@@ -0,0 +1,87 @@
+"""Gunicorn production profile.
+
+Worker and thread counts come from the CPU count, capped by the memory
+available to the container: workers first (2 x CPUs + 1, as many as fit),
+then enough threads per worker to reach about 4 request slots per CPU,
+since requests spend much of their time waiting on the database, again
+only as many as the memory left over allows. The app is preloaded in the master and
+warmed up (URLs, templates, search index) before forking, so workers
+share that state copy-on-write and the first request is not a cold one.
+
+Overrides: WEB_CONCURRENCY, GUNICORN_THREADS, GUNICORN_WORKER_MEMORY_MB,
+GUNICORN_THREAD_MEMORY_MB, GUNICORN_WARMUP=0 to skip the warm-up.
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+
+
+def _memory_limit_mb():
+    """Container memory limit (cgroup v2/v1), else total system memory."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError):
+        return 512
+
+
+MAX_THREADS = 8
+PER_WORKER_MB = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", "150"))
+PER_THREAD_MB = int(os.environ.get("GUNICORN_THREAD_MEMORY_MB", "10"))
+
+
+def _default_workers():
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    by_memory = max(1, (_memory_limit_mb() - 100) // PER_WORKER_MB)
+    return max(1, min(by_cpu, by_memory))
+
+
+def _default_threads(workers):
+    by_cpu = -(-multiprocessing.cpu_count() * 4 // workers)  # ceil
+    spare_mb = _memory_limit_mb() - 100 - workers * PER_WORKER_MB
+    by_memory = 1 + max(0, spare_mb) // (workers * PER_THREAD_MB)
+    return max(1, min(by_cpu, by_memory, MAX_THREADS))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or _default_workers())
+threads = int(os.environ.get("GUNICORN_THREADS") or _default_threads(workers))
+worker_class = "gthread" if threads > 1 else "sync"
+preload_app = True
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = "-"
+
+
+def when_ready(server):
+    # Called in the master after the preloaded app is imported, before
+    # workers are forked.
+    if os.environ.get("GUNICORN_WARMUP", "1") == "0":
+        return
+    from zikrmeblogapp.warmup import warm_up
+
+    timings = warm_up()
+    server.log.info(
+        "Warm-up done: %s",
+        ", ".join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in timings.items()),
+    )
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    connections.close_all()
+    # Pick up mail left queued or awaiting a retry before the restart.
+    from zikrmeblogapp import outbox
+
+    outbox.drain()
@@ -0,0 +1,74 @@
+"""Measure gunicorn startup and first-request latency, with and without warm-up.
+
+Usage: python measure_startup.py [--path /] [--requests 10]
+Starts gunicorn with gunicorn.conf.py on a free port for each mode, waits
+until the worker has booted (after any warm-up in the master), then times
+the first request and the following ones.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_worker(proc):
+    """Block until gunicorn logs that a worker has booted."""
+    for line in proc.stderr:
+        if "Booting worker" in line:
+            return True
+    return False
+
+
+def timed_get(url):
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(warmup, path, requests):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), GUNICORN_WARMUP="1" if warmup else "0", WEB_CONCURRENCY="1")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "zikrmeblog.wsgi:application", "-c", "gunicorn.conf.py"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        if not wait_for_worker(proc):
+            raise SystemExit("gunicorn exited before a worker booted")
+        ready_ms = (time.perf_counter() - started) * 1000
+        time.sleep(0.2)  # let the worker finish initialising
+        url = f"http://127.0.0.1:{port}{path}"
+        first_ms = timed_get(url)
+        rest = [timed_get(url) for _ in range(requests)]
+    finally:
+        proc.terminate()
+        proc.wait()
+    return ready_ms, first_ms, statistics.median(rest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'boot ms':>9} {'first ms':>9} {'median ms':>10}")
+    for warmup in (False, True):
+        ready, first, median = measure(warmup, args.path, args.requests)
+        print(f"{'warm-up' if warmup else 'cold':<12} {ready:>9.0f} {first:>9.1f} {median:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -489,3 +489,124 @@
   }
 })();
 
+
+// Infinite scroll on post listings: append the next batch of cards fetched
+// from the fragment endpoint instead of reloading the whole page
+(function(){
+  const grid = document.querySelector('.cards[data-more-url]');
+  if(!grid || !('IntersectionObserver' in window)) return;
+
+  const pagination = document.querySelector('.pagination');
+  if(pagination) pagination.style.display = 'none';
+
+  let cursor = grid.dataset.cursor;
+  let loading = false;
+
+  const sentinel = document.createElement('div');
+  sentinel.className = 'cards-sentinel';
+  grid.insertAdjacentElement('afterend', sentinel);
+
+  function stop(){
+    observer.disconnect();
+    sentinel.remove();
+  }
+
+  async function loadMore(){
+    if(loading || cursor === null || cursor === undefined) return;
+    loading = true;
+    try {
+      const url = new URL(grid.dataset.moreUrl, window.location.origin);
+      url.searchParams.set('cursor', cursor);
+      const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
+      if(!res.ok) throw new Error('HTTP ' + res.status);
+      const data = await res.json();
+      grid.insertAdjacentHTML('beforeend', data.html);
+      cursor = data.cursor;
+      if(cursor === null) stop();
+    } catch (e) {
+      console.error('Loading more posts failed', e);
+      stop();
+      if(pagination) pagination.style.display = '';
+    } finally {
+      loading = false;
+    }
+  }
+
+  const observer = new IntersectionObserver((entries) => {
+    if(entries.some(entry => entry.isIntersecting)) loadMore();
+  }, { rootMargin: '400px 0px' });
+  observer.observe(sentinel);
+})();
+
+// Search-as-you-type suggestions for the hero search box
+(function(){
+  const input = document.querySelector('input[data-suggest-url]');
+  if(!input) return;
+
+  const list = document.createElement('ul');
+  list.className = 'search-suggest';
+  list.hidden = true;
+  input.form.appendChild(list);
+
+  let timer;
+  let active = -1;
+  let lastQuery = '';
+
+  function render(results){
+    list.innerHTML = '';
+    active = -1;
+    results.forEach(item => {
+      const li = document.createElement('li');
+      const a = document.createElement('a');
+      a.href = item.url;
+      a.textContent = item.title;
+      li.appendChild(a);
+      list.appendChild(li);
+    });
+    list.hidden = results.length === 0;
+  }
+
+  function highlight(index){
+    const links = list.querySelectorAll('a');
+    if(links.length === 0) return;
+    active = (index + links.length) % links.length;
+    links.forEach((a, i) => a.classList.toggle('active', i === active));
+  }
+
+  async function fetchSuggestions(){
+    const q = input.value.trim();
+    if(q === lastQuery) return;
+    lastQuery = q;
+    if(q.length < 2){ render([]); return; }
+    try {
+      const url = new URL(input.dataset.suggestUrl, window.location.origin);
+      url.searchParams.set('q', q);
+      const res = await fetch(url, { headers: { 'Accept': 'application/json' } });
+      if(!res.ok) return;
+      const data = await res.json();
+      if(q === input.value.trim()) render(data.results);
+    } catch (e) {
+      console.error('Suggestions failed', e);
+    }
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(fetchSuggestions, 120);
+  });
+
+  input.addEventListener('keydown', (e) => {
+    if(list.hidden) return;
+    if(e.key === 'ArrowDown'){ e.preventDefault(); highlight(active + 1); }
+    else if(e.key === 'ArrowUp'){ e.preventDefault(); highlight(active - 1); }
+    else if(e.key === 'Escape'){ list.hidden = true; }
+    else if(e.key === 'Enter' && active >= 0){
+      e.preventDefault();
+      window.location.href = list.querySelectorAll('a')[active].href;
+    }
+  });
+
+  document.addEventListener('click', (e) => {
+    if(!input.form.contains(e.target)) list.hidden = true;
+  });
+})();
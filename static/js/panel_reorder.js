@@ -0,0 +1,66 @@
+// Drag-and-drop reordering for panel lists.
+// A container with data-reorder-url holds items with data-id; after a drop
+// the full list of ids is POSTed as {"ids": [...]} and saved in one request.
+(function(){
+  function csrfToken(){
+    const input = document.querySelector('input[name="csrfmiddlewaretoken"]');
+    if(input) return input.value;
+    const match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return match ? decodeURIComponent(match[1]) : '';
+  }
+
+  function setStatus(list, text, isError){
+    const el = list.dataset.reorderStatus && document.getElementById(list.dataset.reorderStatus);
+    if(!el) return;
+    el.textContent = text;
+    el.className = isError ? 'text-sm text-red-600' : 'text-sm text-slate-500';
+  }
+
+  function save(list){
+    const ids = Array.from(list.querySelectorAll(':scope > [data-id]')).map(el => Number(el.dataset.id));
+    setStatus(list, 'Saving order…');
+    fetch(list.dataset.reorderUrl, {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken()},
+      credentials: 'same-origin',
+      body: JSON.stringify({ids: ids}),
+    })
+      .then(r => r.json().then(data => ({ok: r.ok, data: data})))
+      .then(({ok, data}) => {
+        if(!ok) throw new Error(data.error || 'Saving failed');
+        setStatus(list, 'Order saved.');
+      })
+      .catch(err => setStatus(list, err.message + ' Reload the page and try again.', true));
+  }
+
+  document.querySelectorAll('[data-reorder-url]').forEach(function(list){
+    let dragged = null;
+    let before = '';
+    list.querySelectorAll(':scope > [data-id]').forEach(function(item){
+      item.draggable = true;
+      item.classList.add('cursor-move');
+      item.addEventListener('dragstart', function(e){
+        dragged = item;
+        before = Array.from(list.children).map(el => el.dataset.id).join(',');
+        item.classList.add('opacity-50');
+        e.dataTransfer.effectAllowed = 'move';
+      });
+      item.addEventListener('dragend', function(){
+        item.classList.remove('opacity-50');
+        const after = Array.from(list.children).map(el => el.dataset.id).join(',');
+        if(dragged && after !== before) save(list);
+        dragged = null;
+      });
+      item.addEventListener('dragover', function(e){
+        if(!dragged || dragged === item) return;
+        e.preventDefault();
+        const rect = item.getBoundingClientRect();
+        const vertical = getComputedStyle(list).display !== 'grid' || rect.width > list.clientWidth / 2;
+        const after = vertical
+          ? e.clientY > rect.top + rect.height / 2
+          : e.clientX > rect.left + rect.width / 2;
+        list.insertBefore(dragged, after ? item.nextSibling : item);
+      });
+    });
+  });
+})();
@@ -56,6 +56,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'zikrmeblogapp.middleware.ProxyHeaderMiddleware',
+    'zikrmeblogapp.middleware.RequestTimingMiddleware',
+    'zikrmeblogapp.middleware.PageCacheMiddleware',
+    'zikrmeblogapp.middleware.CompressionMiddleware',
+    'zikrmeblogapp.middleware.HTMLMinifyMiddleware',
+    'zikrmeblogapp.middleware.SurrogateKeyMiddleware',
+    'zikrmeblogapp.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,14 +71,39 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Server-Timing header and slow request logging (see RequestTimingMiddleware)
+REQUEST_TIMING = get_bool_env('REQUEST_TIMING', DEBUG)
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', '500'))
+
+# Serve home and the post listings from zikrmeblogapp.async_views
+ASYNC_VIEWS = get_bool_env('ASYNC_VIEWS', False)
+# ASYNC_VIEWS_CONCURRENT (set below, once DATABASES is final) runs their
+# independent queries at the same time on separate connections.
+
+# Brotli/gzip for HTML and JSON responses (static files are precompressed).
+RESPONSE_COMPRESSION = get_bool_env('RESPONSE_COMPRESSION', True)
+
 ROOT_URLCONF = 'zikrmeblog.urls'
 
+# Compiled templates are cached per process whatever DEBUG says; runserver's
+# autoreloader clears the cache when a template changes. TEMPLATE_CACHE=False
+# re-reads templates from disk on every render.
+TEMPLATE_CACHE = get_bool_env('TEMPLATE_CACHE', True)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# The backends are Django's own, with templates that report render time to
+# RequestTimingMiddleware (see zikrmeblogapp.template_backends).
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'zikrmeblogapp.template_backends.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+            if TEMPLATE_CACHE else TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -83,16 +114,53 @@ TEMPLATES = [
     },
 ]
 
+# Optional Jinja2 engine for the public pages (jinja2/). It is tried first;
+# templates it does not have fall through to the Django engine. Needs the
+# Jinja2 package.
+JINJA2_TEMPLATES = get_bool_env('JINJA2_TEMPLATES', False)
+JINJA2_BYTECODE_CACHE_DIR = os.environ.get('JINJA2_BYTECODE_CACHE_DIR', str(BASE_DIR / '.jinja2_cache'))
+JINJA2_TEMPLATE_ENGINE = {
+    'BACKEND': 'zikrmeblogapp.template_backends.Jinja2',
+    'NAME': 'jinja2',
+    'DIRS': [BASE_DIR / 'jinja2'],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'zikrmeblogapp.jinja2_env.environment',
+        'context_processors': TEMPLATES[0]['OPTIONS']['context_processors'],
+    },
+}
+if JINJA2_TEMPLATES:
+    TEMPLATES.insert(0, JINJA2_TEMPLATE_ENGINE)
+
 WSGI_APPLICATION = 'zikrmeblog.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite connection tuning for several gunicorn workers sharing one file:
+# WAL lets readers run alongside a writer, IMMEDIATE transactions take the
+# write lock up front instead of failing mid-transaction, and the timeout
+# (busy_timeout, in seconds) makes writers queue instead of raising
+# "database is locked". A negative cache_size is in KiB. Compare with
+# `manage.py benchmark_sqlite`; set SQLITE_TUNING=0 to use SQLite's defaults.
+SQLITE_OPTIONS = {
+    'init_command': ';'.join([
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))}",
+        f"PRAGMA cache_size={int(os.environ.get('SQLITE_CACHE_SIZE', -20000))}",
+        'PRAGMA temp_store=MEMORY',
+    ]),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS if get_bool_env('SQLITE_TUNING', True) else {},
     }
 }
 
@@ -174,6 +242,111 @@ else:
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@zikrme.com')
 SERVER_EMAIL = os.environ.get('SERVER_EMAIL', DEFAULT_FROM_EMAIL)
 
+# Contact form messages go to these addresses (comma-separated)
+CONTACT_RECIPIENTS = [
+    e.strip() for e in os.environ.get('CONTACT_RECIPIENTS', '01personal002@gmail.com').split(',') if e.strip()
+]
+# Deliver queued mail on a background thread right after it is queued.
+# Disable to rely on `manage.py send_outbox` (e.g. from a cron job) only.
+EMAIL_OUTBOX_BACKGROUND = get_bool_env('EMAIL_OUTBOX_BACKGROUND', True)
+
+# Recompute related posts on a background thread after each post save.
+# Disable to refresh inline (e.g. for one-off scripts).
+RELATED_POSTS_BACKGROUND = get_bool_env('RELATED_POSTS_BACKGROUND', True)
+
+# Post/destination view counters are buffered in each worker and written
+# in one batch every N hits or every N seconds, whichever comes first, on a
+# background thread (VIEW_COUNT_FLUSH_BACKGROUND=0 writes inline).
+VIEW_COUNT_FLUSH_EVERY = int(os.environ.get('VIEW_COUNT_FLUSH_EVERY', '50'))
+VIEW_COUNT_FLUSH_SECONDS = int(os.environ.get('VIEW_COUNT_FLUSH_SECONDS', '30'))
+VIEW_COUNT_FLUSH_BACKGROUND = get_bool_env('VIEW_COUNT_FLUSH_BACKGROUND', True)
+
+# One cache shared by every worker, so an entry rendered or invalidated in
+# one gunicorn process is seen by all of them. CACHE_URL picks the backend:
+#   redis://host:6379/0 (or rediss://)    Redis, needs the `redis` package
+#   memcached://host:11211[,host:11211]   Memcached, needs `pymemcache`
+#   db://table_name                       a database table (createcachetable)
+#   file:///path/to/dir                   files on a disk all workers share
+#   locmem://                             per-process memory (one worker only)
+# Without it the cache lives in the default database (`migrate` creates the
+# table). Bump CACHE_VERSION to drop every entry at once.
+CACHE_URL = os.environ.get('CACHE_URL', 'db://django_cache')
+
+
+def cache_from_url(url: str) -> dict:
+    from urllib.parse import urlsplit
+    parts = urlsplit(url)
+    if parts.scheme in ('redis', 'rediss'):
+        config = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    elif parts.scheme == 'memcached':
+        config = {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': parts.netloc.split(','),
+        }
+    elif parts.scheme == 'db':
+        config = {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': parts.netloc or parts.path.strip('/') or 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000'))},
+        }
+    elif parts.scheme == 'file':
+        config = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parts.path,
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000'))},
+        }
+    elif parts.scheme == 'locmem':
+        config = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': parts.netloc}
+    else:
+        raise ValueError(f'Unsupported CACHE_URL scheme: {parts.scheme!r}')
+    config['KEY_PREFIX'] = os.environ.get('CACHE_KEY_PREFIX', 'zikrme')
+    config['VERSION'] = int(os.environ.get('CACHE_VERSION', '1'))
+    return config
+
+
+# Redis and Memcached are fast enough to hold every cache entry. With a
+# database or file cache each read is a query or a file, so only the
+# generation counters stay shared (see zikrmeblogapp.caching); pages,
+# fragments and query results, whose keys carry a generation and so can
+# never be stale, are kept in each worker's memory (CACHE_ENTRIES_ALIAS).
+CACHE_SERVER_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+)
+CACHES = {
+    'default': cache_from_url(CACHE_URL),
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'entries',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+CACHE_ENTRIES_ALIAS = os.environ.get(
+    'CACHE_ENTRIES_ALIAS', 'default' if CACHES['default']['BACKEND'] in CACHE_SERVER_BACKENDS else 'local'
+)
+
+# Sessions are only needed by the panel and the admin; public pages never
+# read or write them. With Redis or Memcached behind CACHE_URL they are
+# served by cached_db (the cache in front, the database as the source of
+# truth); otherwise straight from the database. A cache-backed engine needs a
+# cache every worker shares, or a logout in one worker would not reach the
+# others, so it is refused with a per-process cache. Set SESSION_ENGINE to
+# 'django.contrib.sessions.backends.signed_cookies' to keep them out of the
+# database entirely.
+def session_engine(cache: dict, engine: str = '') -> str:
+    if not engine:
+        if cache['BACKEND'] in CACHE_SERVER_BACKENDS:
+            return 'django.contrib.sessions.backends.cached_db'
+        return 'django.contrib.sessions.backends.db'
+    if engine.rsplit('.', 1)[-1] in ('cache', 'cached_db') and cache['BACKEND'].endswith('.LocMemCache'):
+        raise ValueError(f'SESSION_ENGINE {engine!r} needs a cache shared by every worker, not a per-process one')
+    return engine
+
+
+SESSION_ENGINE = session_engine(CACHES['default'], os.environ.get('SESSION_ENGINE', ''))
+# Each worker deletes expired sessions at most this often (0 disables).
+SESSION_PURGE_SECONDS = int(os.environ.get('SESSION_PURGE_SECONDS', '3600'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -204,13 +377,75 @@ if 'https://zikrme-blog.onrender.com' not in CSRF_TRUSTED_ORIGINS:
 
 # WhiteNoise for static files on Render
 MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+
+# CDN caching of public pages: shared-cache lifetime and surrogate keys
+# (see zikrmeblogapp.surrogate). CDN_S_MAXAGE=0 drops the headers. Purges
+# go to SURROGATE_PURGER; FilePurger appends them to SURROGATE_PURGE_LOG.
+CDN_S_MAXAGE = int(os.environ.get('CDN_S_MAXAGE', '300'))
+CDN_STALE_WHILE_REVALIDATE = int(os.environ.get('CDN_STALE_WHILE_REVALIDATE', '60'))
+SURROGATE_KEY_HEADER = os.environ.get('SURROGATE_KEY_HEADER', 'Surrogate-Key')
+SURROGATE_PURGER = os.environ.get('SURROGATE_PURGER', 'zikrmeblogapp.surrogate.NullPurger')
+SURROGATE_PURGE_LOG = os.environ.get('SURROGATE_PURGE_LOG', str(BASE_DIR / 'purge.log'))
+SURROGATE_PURGE_BACKGROUND = get_bool_env('SURROGATE_PURGE_BACKGROUND', True)
+
+# Optional whole-page cache for anonymous GETs (0 = off), served by
+# PageCacheMiddleware with single-flight recomputation. Cache hits skip the
+# view, so post/destination view counts only see cache misses while it is on.
+# HTML is minified once as each page is stored (HTML_MINIFY).
+# HTML_MINIFY_FOR_CDN also minifies every response sent with s-maxage; that
+# costs a few ms per origin hit, so only turn it on behind a real CDN.
+PAGE_CACHE_SECONDS = int(os.environ.get('PAGE_CACHE_SECONDS', '0'))
+HTML_MINIFY = get_bool_env('HTML_MINIFY', True)
+HTML_MINIFY_FOR_CDN = get_bool_env('HTML_MINIFY_FOR_CDN', False)
+
+# The unfiltered home page renders from a cached snapshot of its queries
+# (see zikrmeblogapp.home_snapshot), rebuilt on a background thread after
+# each relevant save. The lifetime is only a backstop (0 = live queries).
+HOME_SNAPSHOT_SECONDS = int(os.environ.get('HOME_SNAPSHOT_SECONDS', '86400'))
+HOME_SNAPSHOT_BACKGROUND = get_bool_env('HOME_SNAPSHOT_BACKGROUND', True)
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Optional: Use DATABASE_URL if provided (e.g., Render PostgreSQL)
+# DB_POOL=1 switches Postgres from persistent connections to psycopg's
+# connection pool, shared by all threads of a worker (Django 5.1+).
+DB_POOL = get_bool_env('DB_POOL', False)
+
+
+def database_from_url(url: str) -> dict:
+    import dj_database_url  # type: ignore
+    config = dj_database_url.parse(url, conn_max_age=0 if DB_POOL else 600)
+    if DB_POOL and config['ENGINE'] == 'django.db.backends.postgresql':
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+    return config
+
+
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
     try:
-        import dj_database_url  # type: ignore
-        DATABASES['default'] = dj_database_url.parse(DATABASE_URL, conn_max_age=600)
+        DATABASES['default'] = database_from_url(DATABASE_URL)
+    except Exception:
+        pass
+
+# Optional read replica for public pages; see zikrmeblogapp.db_routers.
+# Any URL works, so two local SQLite files can stand in for testing.
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+if DATABASE_REPLICA_URL:
+    try:
+        DATABASES['replica'] = database_from_url(DATABASE_REPLICA_URL)
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
     except Exception:
-        pass
\ No newline at end of file
+        pass
+
+# Concurrent async queries each take their own connection, which only pays
+# off with a pool; on SQLite every one would open (and tune) a new file handle.
+ASYNC_VIEWS_CONCURRENT = get_bool_env(
+    'ASYNC_VIEWS_CONCURRENT', bool(DATABASES['default'].get('OPTIONS', {}).get('pool'))
+)
+
+DATABASE_ROUTERS = ['zikrmeblogapp.db_routers.PrimaryReplicaRouter']
+# How long a browser stays pinned to the primary after it wrote something
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '10'))
\ No newline at end of file
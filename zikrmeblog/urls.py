@@ -19,10 +19,14 @@ from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
 from zikrmeblogapp import views as app_views
+from zikrmeblogapp import async_views
 from zikrmeblogapp.admin_site import custom_admin_site
 from zikrmeblogapp import panel_views
 from django.contrib.auth import views as auth_views
 
+# Home and the post listings have async variants that overlap their queries
+public_views = async_views if settings.ASYNC_VIEWS else app_views
+
 urlpatterns = [
     # Auth fallbacks for panel
     path("accounts/login/", auth_views.LoginView.as_view(), name="login"),
@@ -51,6 +55,7 @@ urlpatterns = [
     # CRUD - Posts
     path("panel/posts/", panel_views.post_list, name="panel_post_list"),
     path("panel/posts/create/", panel_views.post_create, name="panel_post_create"),
+    path("panel/posts/bulk/", panel_views.post_bulk, name="panel_post_bulk"),
     path("panel/posts/<int:pk>/edit/", panel_views.post_edit, name="panel_post_edit"),
     path("panel/posts/<int:pk>/delete/", panel_views.post_delete, name="panel_post_delete"),
     # CRUD - Destinations
@@ -58,9 +63,15 @@ urlpatterns = [
     path("panel/destinations/create/", panel_views.destination_create, name="panel_destination_create"),
     path("panel/destinations/<int:pk>/edit/", panel_views.destination_edit, name="panel_destination_edit"),
     path("panel/destinations/<int:pk>/delete/", panel_views.destination_delete, name="panel_destination_delete"),
+    path(
+        "panel/destinations/<int:pk>/cities/reorder/",
+        panel_views.destination_city_reorder,
+        name="panel_destination_city_reorder",
+    ),
     # CRUD - Hero Images
     path("panel/hero/", panel_views.hero_list, name="panel_hero_list"),
     path("panel/hero/create/", panel_views.hero_create, name="panel_hero_create"),
+    path("panel/hero/reorder/", panel_views.hero_reorder, name="panel_hero_reorder"),
     path("panel/hero/<int:pk>/toggle/", panel_views.hero_toggle, name="panel_hero_toggle"),
     path("panel/hero/<int:pk>/edit/", panel_views.hero_edit, name="panel_hero_edit"),
     path("panel/hero/<int:pk>/delete/", panel_views.hero_delete, name="panel_hero_delete"),
@@ -76,17 +87,19 @@ urlpatterns = [
     path("panel/home-mini-video/create/", panel_views.home_mini_video_create, name="panel_home_mini_video_create"),
     path("panel/home-mini-video/<int:pk>/edit/", panel_views.home_mini_video_edit, name="panel_home_mini_video_edit"),
     path("panel/home-mini-video/<int:pk>/delete/", panel_views.home_mini_video_delete, name="panel_home_mini_video_delete"),
-    path("", app_views.home, name="home"),
+    path("", public_views.home, name="home"),
     path("about/", app_views.about, name="about"),
     path("contact/", app_views.contact, name="contact"),
     path("categories/", app_views.categories_view, name="categories"),
     path("destination/", app_views.destinations, name="destination"),
     path("destination/<slug:slug>/", app_views.destination_detail, name="destination_detail"),
-    path("blogs/", app_views.posts_list, name="posts_list"),
+    path("blogs/", public_views.posts_list, name="posts_list"),
+    path("search/suggest/", app_views.search_suggest, name="search_suggest"),
+    path("blogs/more/", app_views.posts_more, name="posts_more"),
     path("blog/<slug:slug>/", app_views.post_detail, name="post_detail"),
-    path("category/<slug:slug>/", app_views.posts_by_category, name="posts_by_category"),
-    path("featured/", app_views.featured_list, name="featured_list"),
-    path("articles/", app_views.articles_list, name="articles_list"),
+    path("category/<slug:slug>/", public_views.posts_by_category, name="posts_by_category"),
+    path("featured/", public_views.featured_list, name="featured_list"),
+    path("articles/", public_views.articles_list, name="articles_list"),
     path("privacy-policy/", app_views.privacy_policy, name="privacy_policy"),
     path("terms/", app_views.terms_and_conditions, name="terms_and_conditions"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
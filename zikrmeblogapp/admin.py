@@ -4,7 +4,8 @@ from django.urls import path
 from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse
-from .models import Category, HeroImage, Post, Destination, City, CityMedia, PageHeroImage, PostLink
+from .models import Category, HeroImage, Post, Destination, City, CityMedia, PageHeroImage, PostLink, OutgoingEmail, PurgeEvent
+from . import view_counts
 
 
 class BulkHeroImageUploadForm:
@@ -106,22 +107,31 @@ class PostLinkInline(admin.TabularInline):
     model = PostLink
     extra = 1
 
+class ViewCountAdminMixin:
+    """Saving a change keeps the buffered ``view_count`` the row holds now."""
+
+    def save_model(self, request, obj, form, change):
+        view_counts.keep_stored(obj)
+        super().save_model(request, obj, form, change)
+
+
 @admin.register(Destination)
-class DestinationAdmin(admin.ModelAdmin):
+class DestinationAdmin(ViewCountAdminMixin, admin.ModelAdmin):
     list_display = ("title", "slug")
     prepopulated_fields = {"slug": ("title",)}
 
 
 @admin.register(City)
 class CityAdmin(admin.ModelAdmin):
-    list_display = ("name", "destination", "slug")
+    list_display = ("name", "destination", "slug", "order")
     list_filter = ("destination",)
+    list_editable = ("order",)
     inlines = [CityMediaInline]
     prepopulated_fields = {"slug": ("name",)}
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ViewCountAdminMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "is_published",
@@ -165,3 +175,18 @@ class PageHeroImageAdmin(admin.ModelAdmin):
         # Only allow adding if there are less than 4 page hero images
         return PageHeroImage.objects.count() < 4
 
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to", "from_email")
+    readonly_fields = ("attempts", "sent_at", "last_error")
+
+
+@admin.register(PurgeEvent)
+class PurgeEventAdmin(admin.ModelAdmin):
+    list_display = ("keys", "created_at", "processed_at", "attempts")
+    list_filter = (("processed_at", admin.EmptyFieldListFilter),)
+    search_fields = ("keys",)
+    readonly_fields = ("attempts", "processed_at", "last_error")
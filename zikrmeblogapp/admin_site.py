@@ -9,47 +9,16 @@ class ZikRmeAdminSite(AdminSite):
     index_template = "admin/panel/index.html"
 
     def index(self, request, extra_context=None):  # type: ignore[override]
-        try:
-            from .models import Post, Category, Destination, City, PageHeroImage
-            print(f"DEBUG: Successfully imported PageHeroImage: {PageHeroImage}")  # Debug print
-            
-            page_heroes = PageHeroImage.objects.all()
-            print(f"DEBUG: Found {page_heroes.count()} page heroes")  # Debug print
-            
-            stats = {
-                "posts": Post.objects.count(),
-                "published": Post.objects.filter(is_published=True).count(),
-                "featured": Post.objects.filter(is_featured=True).count(),
-                "articles": Post.objects.filter(is_article=True).count(),
-                "categories": Category.objects.count(),
-                "destinations": Destination.objects.count(),
-                "cities": City.objects.count(),
-                "recent_posts": Post.objects.order_by("-created_at")[:5],
-                "page_heroes": page_heroes,
-            }
-            extra = extra_context or {}
-            extra.update(stats)
-            return super().index(request, extra_context=extra)
-        except Exception as e:
-            print(f"DEBUG ERROR: {e}")  # Debug print
-            # Fallback if there's an error
-            from .models import Post, Category, Destination, City
-            
-            stats = {
-                "posts": Post.objects.count(),
-                "published": Post.objects.filter(is_published=True).count(),
-                "featured": Post.objects.filter(is_featured=True).count(),
-                "articles": Post.objects.filter(is_article=True).count(),
-                "categories": Category.objects.count(),
-                "destinations": Destination.objects.count(),
-                "cities": City.objects.count(),
-                "recent_posts": Post.objects.order_by("-created_at")[:5],
-                "page_heroes": [],
-                "debug_error": str(e),
-            }
-            extra = extra_context or {}
-            extra.update(stats)
-            return super().index(request, extra_context=extra)
+        from . import dashboard_stats
+        from .models import PageHeroImage, Post
+
+        extra = {
+            **dashboard_stats.get(),
+            "recent_posts": Post.objects.order_by("-created_at")[:5],
+            "page_heroes": PageHeroImage.objects.all(),
+            **(extra_context or {}),
+        }
+        return super().index(request, extra_context=extra)
 
 
 custom_admin_site = ZikRmeAdminSite(name="panel")
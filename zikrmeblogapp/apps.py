@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_cache_table(sender, using="default", **kwargs):
+    # The default cache is a database table (CACHE_URL=db://...); create it
+    # with the schema so `migrate` alone is enough. A no-op for other backends.
+    from django.core.management import call_command
+    call_command("createcachetable", database=using, verbosity=0)
 
 
 class ZikrmeblogappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'zikrmeblogapp'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(create_cache_table, sender=self, dispatch_uid="create_cache_table")
@@ -0,0 +1,181 @@
+"""Async variants of the home page and the post listings.
+
+How the queries run depends on ``ASYNC_VIEWS_CONCURRENT``, which defaults
+to on when the database has a connection pool (``DB_POOL``):
+
+* concurrent: the independent queries are awaited together with
+  ``asyncio.gather``, each on a worker thread with a pooled connection
+  that is handed back as soon as it finishes, so a page waits for its
+  slowest query rather than the sum of them;
+* otherwise (SQLite): every row is gathered in one ``sync_to_async`` call
+  on Django's thread-sensitive executor, so the queries share the
+  worker's persistent connection instead of opening (and tuning) a new
+  SQLite connection per query.
+
+The template is rendered in a separate call either way. Enabled with the
+``ASYNC_VIEWS`` setting; ``benchmark_async`` compares the paths.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, render
+
+from . import home_snapshot, surrogate
+from .models import Category, HeroImage, HomeMiniVideo, Post
+from .views import POSTS_PER_PAGE, _listing_posts
+
+
+def concurrent() -> bool:
+    return getattr(settings, "ASYNC_VIEWS_CONCURRENT", False)
+
+
+def _own_connection(func):
+    """``func`` as an awaitable that runs on its own thread and connection."""
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()  # returns pooled connections to the pool
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _home_posts(query, selected_category):
+    posts = Post.objects.filter(is_published=True).prefetch_related("categories", "links")
+    if query:
+        posts = posts.filter(
+            Q(title__icontains=query)
+            | Q(description__icontains=query)
+            | Q(categories__name__icontains=query)
+        ).distinct()
+    if selected_category is not None:
+        posts = posts.filter(categories=selected_category)
+    return posts
+
+
+def _home_context(query, category_slug):
+    if not query and not category_slug and home_snapshot.enabled():
+        return {**home_snapshot.get(), "selected_category": None, "query": ""}
+
+    selected_category = None
+    if category_slug:
+        selected_category = get_object_or_404(Category, slug=category_slug)
+    posts = _home_posts(query, selected_category)
+
+    return {
+        "hero_images": list(HeroImage.objects.filter(is_active=True)),
+        "categories": list(Category.objects.all()),
+        "selected_category": selected_category,
+        "posts_sample": list(posts[:15]),
+        "featured_posts": list(posts.filter(is_featured=True)[:12]),
+        "article_posts": list(posts.filter(is_article=True)[:12]),
+        "query": query,
+        "home_mini_video": HomeMiniVideo.objects.filter(is_active=True).first(),
+    }
+
+
+async def _gather_home_context(query, category_slug):
+    if not query and not category_slug and home_snapshot.enabled():
+        return await sync_to_async(_home_context)(query, category_slug)
+
+    selected_category = None
+    if category_slug:
+        selected_category = await _own_connection(get_object_or_404)(Category, slug=category_slug)
+    posts = _home_posts(query, selected_category)
+
+    hero_images, categories, posts_sample, featured_posts, article_posts, home_mini_video = await asyncio.gather(
+        _own_connection(list)(HeroImage.objects.filter(is_active=True)),
+        _own_connection(list)(Category.objects.all()),
+        _own_connection(list)(posts[:15]),
+        _own_connection(list)(posts.filter(is_featured=True)[:12]),
+        _own_connection(list)(posts.filter(is_article=True)[:12]),
+        _own_connection(HomeMiniVideo.objects.filter(is_active=True).first)(),
+    )
+    return {
+        "hero_images": hero_images,
+        "categories": categories,
+        "selected_category": selected_category,
+        "posts_sample": posts_sample,
+        "featured_posts": featured_posts,
+        "article_posts": article_posts,
+        "query": query,
+        "home_mini_video": home_mini_video,
+    }
+
+
+async def home(request):
+    query = request.GET.get("q", "").strip()
+    category_slug = request.GET.get("category")
+    if concurrent():
+        context = await _gather_home_context(query, category_slug)
+    else:
+        context = await sync_to_async(_home_context)(query, category_slug)
+    surrogate.tag(
+        request, "posts", "categories", "hero", "home-video",
+        context["posts_sample"], context["featured_posts"], context["article_posts"], context["categories"],
+    )
+    return await sync_to_async(render)(request, "home.html", context)
+
+
+def _listing_page(kind, slug, query, page):
+    """The listing's page, with its rows loaded, and the category if any."""
+    posts, category = _listing_posts(kind, slug=slug, query=query)
+    page_obj = Paginator(posts, POSTS_PER_PAGE).get_page(page)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj, category
+
+
+async def _gather_listing_page(kind, slug, query, page):
+    """``_listing_page()`` with the count and the page's rows fetched together."""
+    posts, category = await _own_connection(_listing_posts)(kind, slug=slug, query=query)
+    try:
+        number = max(1, int(page))
+    except (TypeError, ValueError):
+        number = 1
+    start = (number - 1) * POSTS_PER_PAGE
+    count, rows = await asyncio.gather(
+        _own_connection(posts.count)(),
+        _own_connection(list)(posts[start:start + POSTS_PER_PAGE]),
+    )
+    paginator = Paginator(posts, POSTS_PER_PAGE)
+    paginator.count = count
+    page_obj = paginator.get_page(number)
+    if page_obj.number == number:
+        page_obj.object_list = rows
+    else:  # out of range: get_page() fell back to the last page
+        page_obj.object_list = await _own_connection(list)(page_obj.object_list)
+    return page_obj, category
+
+
+async def _render_listing(request, kind, slug="", query="", **extra):
+    if concurrent():
+        page, category = await _gather_listing_page(kind, slug, query, request.GET.get("page"))
+    else:
+        page, category = await sync_to_async(_listing_page)(kind, slug, query, request.GET.get("page"))
+    if category is not None:
+        extra["category"] = category
+    surrogate.tag(request, "posts", category, page.object_list)
+    context = {"page_obj": page, "query": query, "list_kind": kind, **extra}
+    return await sync_to_async(render)(request, "posts_list.html", context)
+
+
+async def posts_list(request):
+    query = request.GET.get("q", "").strip()
+    return await _render_listing(request, "blogs", query=query)
+
+
+async def posts_by_category(request, slug: str):
+    return await _render_listing(request, "category", slug=slug)
+
+
+async def featured_list(request):
+    return await _render_listing(request, "featured", list_title="Featured Posts")
+
+
+async def articles_list(request):
+    return await _render_listing(request, "articles", list_title="Latest Articles")
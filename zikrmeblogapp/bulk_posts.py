@@ -0,0 +1,101 @@
+"""Set-based bulk actions for the panel's post list.
+
+Each action is one ``UPDATE``, one bulk insert or delete of category
+links, or one cascading ``DELETE``, inside a transaction. The per-row
+receivers in ``signals.py`` are skipped while it runs (``in_bulk()``), and
+``invalidate()`` does their work once for the whole selection: one purge
+event, one bump per cache generation, one search index reset and a
+related-posts refresh for the posts whose text or categories matter.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching
+from .home_snapshot import schedule_rebuild as schedule_home_rebuild
+from .models import Post
+from .related import listing_posts, schedule_refresh as schedule_related_refresh
+from .search_index import index as search_index
+from .surrogate import queue_purge
+
+FLAG_ACTIONS = {
+    "publish": {"is_published": True},
+    "unpublish": {"is_published": False},
+    "feature": {"is_featured": True},
+    "unfeature": {"is_featured": False},
+    "article": {"is_article": True},
+    "unarticle": {"is_article": False},
+}
+CATEGORY_ACTIONS = ("add_category", "remove_category")
+ACTIONS = (*FLAG_ACTIONS, *CATEGORY_ACTIONS, "delete")
+
+_bulk = ContextVar("bulk_post_action", default=False)
+
+
+def in_bulk() -> bool:
+    """True while a bulk action runs; per-row signal receivers return early."""
+    return _bulk.get()
+
+
+@contextmanager
+def _bulk_action():
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+def apply(action: str, pks, category=None) -> int:
+    """Run ``action`` on the posts in ``pks``; returns how many were affected."""
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown bulk action: {action}")
+    if action in CATEGORY_ACTIONS and category is None:
+        raise ValueError(f"{action} needs a category")
+
+    links = Post.categories.through
+    with transaction.atomic(), _bulk_action():
+        pks = list(Post.objects.filter(pk__in=pks).values_list("pk", flat=True))
+        if not pks:
+            return 0
+        listing = None
+        if action in FLAG_ACTIONS:
+            # update() skips auto_now, so stamp updated_at here.
+            count = Post.objects.filter(pk__in=pks).update(**FLAG_ACTIONS[action], updated_at=timezone.now())
+        elif action == "add_category":
+            linked = set(
+                links.objects.filter(post_id__in=pks, category_id=category.pk).values_list("post_id", flat=True)
+            )
+            new = [links(post_id=pk, category_id=category.pk) for pk in pks if pk not in linked]
+            links.objects.bulk_create(new)
+            count = len(new)
+        elif action == "remove_category":
+            count, _ = links.objects.filter(post_id__in=pks, category_id=category.pk).delete()
+        else:
+            listing = listing_posts(pks)
+            Post.objects.filter(pk__in=pks).delete()
+            count = len(pks)
+        invalidate(pks, action, category, listing)
+    return count
+
+
+def invalidate(pks, action, category=None, listing=None) -> None:
+    """What the per-row receivers would have done, once for all ``pks``."""
+    keys = ["posts", *(f"post-{pk}" for pk in pks)]
+    if category is not None:
+        keys += ["categories", f"category-{category.pk}"]
+    queue_purge(*keys)
+    for name in ("posts", "pages", "home", "dashboard-stats"):
+        caching.bump(name)
+    schedule_home_rebuild()
+    search_index.invalidate()
+    if action in ("publish", "unpublish", *CATEGORY_ACTIONS):
+        for pk in pks:
+            schedule_related_refresh(pk)
+    elif action == "delete":
+        # Drop the posts from the corpus and backfill the lists that held them.
+        for pk in pks:
+            schedule_related_refresh(pk, listing[pk])
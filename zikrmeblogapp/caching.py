@@ -0,0 +1,221 @@
+"""Stampede-safe cache reads for expensive pages, fragments and queries.
+
+``get_or_compute()`` stores ``(value, expires_at, compute_seconds)`` and
+keeps the entry for ``stale_seconds`` past its expiry. When an entry
+expires, or is probabilistically refreshed a little early (the XFetch
+rule: the slower the computation, the earlier), a single caller
+recomputes it:
+
+* within a process, concurrent callers for the same key share one
+  in-flight computation;
+* across processes, a ``cache.add()`` lock picks one recomputer; this
+  needs entries in a shared backend (Redis, Memcached) to span workers.
+
+Everyone else is served the stale value meanwhile. With nothing cached at
+all they wait for the recomputer, up to ``lock_seconds``. Entries live in
+the ``CACHE_ENTRIES_ALIAS`` cache.
+
+``generation()``/``bump()`` give cheap invalidation: build keys with the
+current generation of what they depend on and bump it when that changes.
+Generations always live in the default cache (``CACHE_URL``), so one bump
+invalidates every worker even when entries are kept per process. During a
+request the generations in ``GENERATIONS`` are read in one round trip on
+first use and remembered until the request finishes.
+"""
+
+import fcntl
+import math
+import os
+import random
+import threading
+import time
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.signals import request_finished, request_started
+from django.db import connections, router, transaction
+
+STALE_SECONDS = 60
+LOCK_SECONDS = 30
+EARLY_EXPIRY_BETA = 1.0
+_POLL_SECONDS = 0.05
+GENERATIONS = ("posts", "categories", "pages", "home", "dashboard-stats", "search", "related")
+
+_inflight = {}  # key -> Event set when this process's recomputation ends
+_inflight_lock = threading.Lock()
+
+
+def _needs_refresh(entry) -> bool:
+    _, expires_at, compute_seconds = entry
+    early = compute_seconds * EARLY_EXPIRY_BETA * -math.log(random.random() or 1e-12)
+    return time.time() + early >= expires_at
+
+
+def _store(cache, key, compute, timeout, stale_seconds, should_cache):
+    started = time.perf_counter()
+    value = compute()
+    elapsed = time.perf_counter() - started
+    if should_cache is None or should_cache(value):
+        cache.set(key, (value, time.time() + timeout, elapsed), timeout + stale_seconds)
+    return value
+
+
+def _wait_for_other_process(cache, key, lock_key, lock_seconds):
+    deadline = time.monotonic() + lock_seconds
+    while time.monotonic() < deadline and cache.get(lock_key) is not None:
+        time.sleep(_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return cache.get(key)
+
+
+def get_or_compute(
+    key,
+    compute,
+    timeout,
+    *,
+    stale_seconds=STALE_SECONDS,
+    lock_seconds=LOCK_SECONDS,
+    should_cache=None,
+    cache=None,
+):
+    """Return the cached value for ``key``, recomputing it at most once at a time.
+
+    ``should_cache(value)`` may veto storing a result (it is still returned).
+    """
+    cache = cache or caches[getattr(settings, "CACHE_ENTRIES_ALIAS", "default")]
+    entry = cache.get(key)
+    if entry is not None and not _needs_refresh(entry):
+        return entry[0]
+
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+
+    if not leader:
+        if entry is not None:
+            return entry[0]
+        event.wait(lock_seconds)
+        entry = cache.get(key)
+        return entry[0] if entry is not None else compute()
+
+    lock_key = f"{key}:lock"
+    try:
+        if cache.add(lock_key, 1, lock_seconds):
+            try:
+                return _store(cache, key, compute, timeout, stale_seconds, should_cache)
+            finally:
+                cache.delete(lock_key)
+        # Another process is recomputing.
+        if entry is None:
+            entry = _wait_for_other_process(cache, key, lock_key, lock_seconds)
+        if entry is not None:
+            return entry[0]
+        return _store(cache, key, compute, timeout, stale_seconds, should_cache)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def _seed() -> int:
+    # Distinct from any value an evicted generation could have held, so a
+    # lost counter starts a fresh namespace instead of reusing old entries.
+    return time.time_ns()
+
+
+_request = Local()  # .generations: the current request's memo, if any
+
+
+def _start_request(**kwargs):
+    _request.generations = {}
+
+
+def _finish_request(**kwargs):
+    _request.generations = None
+
+
+request_started.connect(_start_request, dispatch_uid="caching_generations_start")
+request_finished.connect(_finish_request, dispatch_uid="caching_generations_finish")
+
+
+def _read_generation(cache, key) -> int:
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _seed(), None)
+        value = cache.get(key, 0)
+    return value
+
+
+def generation(name, cache=None) -> int:
+    """Return the current generation of the ``name`` namespace."""
+    key = f"generation:{name}"
+    memo = getattr(_request, "generations", None) if cache is None else None
+    cache = cache or default_cache
+    if memo is None:
+        return _read_generation(cache, key)
+    if not memo:
+        keys = [f"generation:{known}" for known in GENERATIONS]
+        found = cache.get_many(keys)
+        memo.update({known: found.get(known) for known in keys})
+    if memo.get(key) is None:
+        memo[key] = _read_generation(cache, key)
+    return memo[key]
+
+
+def _incr(cache, key) -> int:
+    """``cache.incr(key)`` that concurrent workers cannot interleave.
+
+    Redis, Memcached and local memory increment atomically. The database
+    and file caches read and then write, so two workers could both land on
+    the same value; there the increment holds a lock until it is written.
+    """
+    if isinstance(cache, DatabaseCache):
+        db = router.db_for_write(cache.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(cache._table)
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            # A no-op write locks the row (SQLite: the database) until commit.
+            cursor.execute(
+                f"UPDATE {table} SET expires = expires WHERE cache_key = %s",
+                [cache.make_and_validate_key(key)],
+            )
+            return cache.incr(key)
+    if isinstance(cache, FileBasedCache):
+        os.makedirs(cache._dir, exist_ok=True)
+        with open(os.path.join(cache._dir, "generations.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            return cache.incr(key)
+    return cache.incr(key)
+
+
+def advance(name, cache=None) -> int:
+    """Move ``name`` to a new generation now and return it.
+
+    The result is exactly one more than the generation before this call's
+    increment, whatever other workers do at the same time, so a caller
+    that gets ``stamp + 1`` knows no other change came in between.
+    """
+    key = f"generation:{name}"
+    memo = getattr(_request, "generations", None) if cache is None else None
+    cache = cache or default_cache
+    try:
+        value = _incr(cache, key)
+    except ValueError:
+        cache.add(key, _seed(), None)
+        value = cache.get(key, 0)
+    if memo:
+        memo[key] = value
+    return value
+
+
+def bump(name, cache=None) -> None:
+    """Move ``name`` to a new generation once the current transaction commits."""
+    transaction.on_commit(lambda: advance(name, cache))
@@ -0,0 +1,86 @@
+"""Brotli/gzip encoding of dynamic responses.
+
+Used by ``CompressionMiddleware``. Brotli is offered only when the
+``brotli`` module is installed; gzip always works. Static files are
+compressed ahead of time by WhiteNoise and never reach this code.
+"""
+
+import gzip
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+BROTLI_QUALITY = 5  # fast enough per request, still well ahead of gzip
+GZIP_LEVEL = 6
+MIN_LENGTH = 200
+
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|javascript|xml|xhtml\+xml|rss\+xml|atom\+xml)|image/svg\+xml)"
+)
+_accept_encoding_re = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?")
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate(accept_encoding: str):
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None."""
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        match = _accept_encoding_re.match(part)
+        if not match:
+            continue
+        try:
+            weights[match.group(1).lower()] = float(match.group(2) or 1)
+        except ValueError:
+            continue
+    wildcard = weights.get("*", 0)
+    for encoding in available_encodings():
+        if weights.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(response) -> bool:
+    if response.has_header("Content-Encoding"):
+        return False
+    return bool(COMPRESSIBLE_TYPES.match(response.get("Content-Type", "")))
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _stream_encoder(encoding):
+    """Return (compress_chunk, finish) for incremental output."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return (lambda data: compressor.process(data) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    # Each chunk is flushed so streamed output still reaches the client early.
+    compress_chunk, finish = _stream_encoder(encoding)
+    for chunk in chunks:
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    compress_chunk, finish = _stream_encoder(encoding)
+    async for chunk in chunks:
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
@@ -1,9 +1,22 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import caching, surrogate
 from .models import Category
 
+FOOTER_CACHE_SECONDS = 300
+
+
+def _load_footer_categories():
+    return caching.get_or_compute(
+        f"query:footer-categories:{caching.generation('categories')}",
+        lambda: list(Category.objects.filter(show_in_footer=True).order_by("name")),
+        FOOTER_CACHE_SECONDS,
+    )
+
 
 def footer_categories(request):
-    return {
-        "footer_categories": Category.objects.filter(show_in_footer=True).order_by("name")
-    }
+    surrogate.tag(request, "footer")
+    # Lazy, so responses that never render the footer skip the cache lookup.
+    return {"footer_categories": SimpleLazyObject(_load_footer_categories)}
 
 
@@ -0,0 +1,56 @@
+"""Route public page reads to a read replica.
+
+``ReplicaRoutingMiddleware`` marks GET/HEAD requests handled by the
+public views as replica-safe; everything else (panel, admin, sessions,
+auth) stays on the primary. After a request that wrote to the primary,
+the middleware sets a short-lived cookie that pins that browser to the
+primary so an editor always sees their own save.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+STICKY_COOKIE = "db_primary"
+
+# Views whose GET requests may be served from the replica.
+REPLICA_VIEW_MODULES = frozenset({"zikrmeblogapp.views", "zikrmeblogapp.async_views"})
+
+# A mutable dict rather than flags so writes made in a view running on
+# another thread (ASGI) are still seen by the middleware.
+request_state = ContextVar("db_request_state", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+# Always read from the primary, even during a public GET: sessions and
+# users (the session and auth middleware load them lazily, inside the view)
+# must not lag behind a login or logout, and DatabaseCache's table would
+# hand out entries and locks that were already replaced.
+PRIMARY_APP_LABELS = frozenset({"sessions", "auth", "admin", "django_cache"})
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APP_LABELS:
+            return "default"
+        state = request_state.get()
+        if state and state["replica"] and replica_configured():
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        state = request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.password_validation import validate_password
 
 from .models import Category, Post, Destination, City, CityMedia, HeroImage, PageHeroImage, HomeMiniVideo
+from . import view_counts
 
 
 class BaseTailwindForm(forms.ModelForm):
@@ -19,13 +20,21 @@ class BaseTailwindForm(forms.ModelForm):
         self._apply_tailwind()
 
 
+class ViewCountFormMixin:
+    """Saving an edit keeps the buffered ``view_count`` the row holds now."""
+
+    def save(self, commit=True):
+        view_counts.keep_stored(self.instance)
+        return super().save(commit)
+
+
 class CategoryForm(BaseTailwindForm):
     class Meta:
         model = Category
         fields = ["name", "icon_class", "show_in_footer"]
 
 
-class PostForm(BaseTailwindForm):
+class PostForm(ViewCountFormMixin, BaseTailwindForm):
     published_at = forms.DateTimeField(
         required=False,
         widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
@@ -53,7 +62,7 @@ class PostForm(BaseTailwindForm):
         }
 
 
-class DestinationForm(BaseTailwindForm):
+class DestinationForm(ViewCountFormMixin, BaseTailwindForm):
     class Meta:
         model = Destination
         fields = ["title", "description", "hero_image", "mini_video"]
@@ -176,6 +185,31 @@ class PasswordChangeCustomForm(TailwindForm):
         return cleaned
 
 
+class PostBulkActionForm(forms.Form):
+    ACTION_CHOICES = [
+        ("publish", "Publish"),
+        ("unpublish", "Unpublish"),
+        ("feature", "Feature"),
+        ("unfeature", "Unfeature"),
+        ("article", "Mark as article"),
+        ("unarticle", "Unmark as article"),
+        ("add_category", "Add category"),
+        ("remove_category", "Remove category"),
+        ("delete", "Delete"),
+    ]
+    CATEGORY_ACTIONS = {"add_category", "remove_category"}
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    ids = forms.ModelMultipleChoiceField(queryset=Post.objects.only("pk"))
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("action") in self.CATEGORY_ACTIONS and not cleaned.get("category"):
+            raise forms.ValidationError("Choose a category for this action.")
+        return cleaned
+
+
 class ContactForm(TailwindForm):
     name = forms.CharField(max_length=120)
     email = forms.EmailField()
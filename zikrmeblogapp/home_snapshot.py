@@ -0,0 +1,80 @@
+"""Materialized context for the unfiltered home page.
+
+Without ``q`` or ``category`` the home page shows every visitor the same
+hero images, categories, posts and mini video, and they only change when
+an editor saves. ``get()`` returns them from one cache read. The snapshot
+is keyed on the ``home`` generation, which signals bump whenever one of
+its models changes; ``schedule_rebuild()`` then builds the new snapshot on
+a background thread right after the commit, so visitors rarely pay for
+it. Filtered requests keep using the live queries in ``views.home``.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from . import caching
+from .models import Category, HeroImage, HomeMiniVideo, Post
+
+logger = logging.getLogger(__name__)
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "HOME_SNAPSHOT_SECONDS", 0))
+
+
+def build() -> dict:
+    posts = Post.objects.filter(is_published=True).prefetch_related("categories", "links")
+    return {
+        "hero_images": list(HeroImage.objects.filter(is_active=True)),
+        "categories": list(Category.objects.all()),
+        "posts_sample": list(posts[:15]),
+        "featured_posts": list(posts.filter(is_featured=True)[:12]),
+        "article_posts": list(posts.filter(is_article=True)[:12]),
+        "home_mini_video": HomeMiniVideo.objects.filter(is_active=True).first(),
+    }
+
+
+def get() -> dict:
+    return caching.get_or_compute(
+        f"home-snapshot:{caching.generation('home')}",
+        build,
+        settings.HOME_SNAPSHOT_SECONDS,
+    )
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="home-snapshot")
+_scheduled = threading.Event()
+
+
+def _run():
+    _scheduled.clear()
+    close_old_connections()
+    try:
+        get()
+    except Exception:
+        logger.exception("Rebuilding the home snapshot failed")
+    finally:
+        connection.close()
+
+
+def schedule_rebuild() -> None:
+    """Build the snapshot for the current generation once the transaction commits.
+
+    Call after ``caching.bump("home")`` so the bump lands first. Saves in
+    quick succession coalesce into one rebuild. Set
+    ``HOME_SNAPSHOT_BACKGROUND = False`` to build inline.
+    """
+    def enqueue():
+        if not enabled():
+            return
+        if not getattr(settings, "HOME_SNAPSHOT_BACKGROUND", True):
+            get()
+        elif not _scheduled.is_set():
+            _scheduled.set()
+            _executor.submit(_run)
+
+    transaction.on_commit(enqueue)
@@ -0,0 +1,53 @@
+"""Jinja2 environment for the optional Jinja2 rendering of the public pages.
+
+Enabled with the ``JINJA2_TEMPLATES`` setting. The templates in ``jinja2/``
+mirror their counterparts in ``templates/``; pages without a Jinja2 version
+fall through to the Django engine. The filters are Django's own, so both
+engines produce the same HTML.
+"""
+
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from jinja2 import Environment, FileSystemBytecodeCache, Undefined
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def now():
+    return datetime.now(tz=timezone.get_current_timezone() if settings.USE_TZ else None)
+
+
+def date(value, arg=None):
+    # Like the Django filter, format in the current time zone.
+    return defaultfilters.date(timezone.template_localtime(value), arg)
+
+
+def linebreaks(value):
+    return defaultfilters.linebreaks_filter(value, autoescape=True)
+
+
+def environment(**options):
+    cache_dir = settings.JINJA2_BYTECODE_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    # Missing variables render as "", as they do in Django templates.
+    options["undefined"] = Undefined
+    options["bytecode_cache"] = FileSystemBytecodeCache(str(cache_dir))
+    env = Environment(**options)
+    env.globals.update(url=url, static=static, now=now)
+    env.filters.update(
+        cut=defaultfilters.cut,
+        date=date,
+        linebreaks=linebreaks,
+        truncatechars=defaultfilters.truncatechars,
+        truncatewords=defaultfilters.truncatewords,
+        urlencode=defaultfilters.urlencode,
+    )
+    return env
@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases
+
+from zikrmeblogapp import async_views, view_counts, views
+from zikrmeblogapp.models import Category
+from zikrmeblogapp.synthetic import seed
+
+
+class Command(BaseCommand):
+    help = 'Compare view latency of the sync (WSGI) and both async modes of the home/listing views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=2000, help='Synthetic posts to create')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed calls per view')
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0.0,
+            help='Sleep added to every query to simulate a network round trip to Postgres',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        latency = options['db_latency_ms'] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        if latency:
+            connection_created.connect(add_delay)
+            for conn in connections.all():
+                conn.execute_wrappers.append(delay)
+        try:
+            seed(posts=options['posts'], categories=20, destinations=5)
+            static = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+            with override_settings(STORAGES={**settings.STORAGES, 'staticfiles': static}):
+                self.compare(options['repeat'])
+            view_counts.flush()
+        finally:
+            connection_created.disconnect(add_delay)
+            teardown_databases(old_config, verbosity=0)
+
+    def compare(self, repeat):
+        category = Category.objects.order_by('id').first()
+        cases = [
+            ('home', '/', (), views.home, async_views.home),
+            ('posts_list', '/blogs/', (), views.posts_list, async_views.posts_list),
+            ('featured_list', '/featured/', (), views.featured_list, async_views.featured_list),
+            ('articles_list', '/articles/', (), views.articles_list, async_views.articles_list),
+            ('posts_by_category', f'/category/{category.slug}/', (category.slug,),
+             views.posts_by_category, async_views.posts_by_category),
+        ]
+        factory = RequestFactory()
+        # "one call": every query in one thread-sensitive call (the SQLite
+        # default); "gather": independent queries at once on their own
+        # connections (ASYNC_VIEWS_CONCURRENT, the default with DB_POOL).
+        modes = [('sync', True, False), ('one call', False, False), ('gather', False, True)]
+        self.stdout.write(f'{"view":<20}' + ''.join(f'{label + " ms":>13}' for label, _, _ in modes))
+        for name, path, args, sync_view, async_view in cases:
+            results = []
+            for _, is_sync, gather in modes:
+                call = sync_view if is_sync else async_to_sync(async_view)
+                with override_settings(ASYNC_VIEWS_CONCURRENT=gather):
+                    call(self.request(factory, path), *args)  # warm up
+                    timings = []
+                    for _ in range(repeat):
+                        request = self.request(factory, path)
+                        started = time.perf_counter()
+                        call(request, *args)
+                        timings.append((time.perf_counter() - started) * 1000)
+                results.append(statistics.median(timings))
+            self.stdout.write(f'{name:<20}' + ''.join(f'{result:>13.2f}' for result in results))
+
+    @staticmethod
+    def request(factory, path):
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        return request
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases
+
+from zikrmeblogapp import compression, view_counts
+from zikrmeblogapp.minify import minify_html
+from zikrmeblogapp.synthetic import seed
+
+from .benchmark_views import public_urls
+
+
+class Command(BaseCommand):
+    help = 'Report bytes saved and CPU time spent by HTML minification per public page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=500, help='Synthetic posts to create')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed minifications per page')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed(posts=options['posts'], categories=10, destinations=3)
+            static = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+            # Fetch the pages as rendered, not as HTMLMinifyMiddleware would store them.
+            with override_settings(STORAGES={**settings.STORAGES, 'staticfiles': static}, HTML_MINIFY=False):
+                self.compare(options['repeat'])
+            view_counts.flush()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def compare(self, repeat):
+        encoding = compression.available_encodings()[0]
+        client = Client()
+        self.stdout.write(
+            f'{"page":<20} {"raw B":>8} {"minified B":>11} {"saved":>6} '
+            f'{encoding + " raw":>9} {encoding + " min":>9} {"minify ms":>10}'
+        )
+        for name, url in public_urls().items():
+            response = client.get(url)
+            if not response['Content-Type'].startswith('text/html'):
+                continue
+            html = response.content.decode()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                minified = minify_html(html)
+                timings.append((time.perf_counter() - started) * 1000)
+            raw_bytes, min_bytes = html.encode(), minified.encode()
+            self.stdout.write(
+                f'{name:<20} {len(raw_bytes):>8} {len(min_bytes):>11} '
+                f'{1 - len(min_bytes) / len(raw_bytes):>6.0%} '
+                f'{len(compression.compress(raw_bytes, encoding)):>9} '
+                f'{len(compression.compress(min_bytes, encoding)):>9} '
+                f'{statistics.median(timings):>10.2f}'
+            )
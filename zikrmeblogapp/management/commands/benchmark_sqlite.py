@@ -0,0 +1,99 @@
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = """
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _connect(path, options):
+    conn = sqlite3.connect(path, timeout=options.get('timeout', 5), isolation_level=None)
+    for command in options.get('init_command', '').split(';'):
+        if command.strip():
+            conn.execute(command)
+    return conn
+
+
+def _worker(args):
+    """Run reads or writes against ``path`` until ``deadline``; returns (ops, errors)."""
+    path, options, role, deadline, rows = args
+    conn = _connect(path, options)
+    begin = f"BEGIN {options['transaction_mode']}" if options.get('transaction_mode') else 'BEGIN'
+    rng = random.Random()
+    ops = errors = 0
+    while time.time() < deadline:
+        try:
+            if role == 'read':
+                offset = rng.randrange(rows)
+                conn.execute('SELECT id, title FROM post ORDER BY id DESC LIMIT 15 OFFSET ?', (offset,)).fetchall()
+            else:
+                conn.execute(begin)
+                conn.execute('INSERT INTO post (title, body) VALUES (?, ?)', ('new post', 'x' * 500))
+                conn.execute('UPDATE post SET views = views + 1 WHERE id = ?', (rng.randrange(1, rows),))
+                conn.execute('COMMIT')
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+    conn.close()
+    return role, ops, errors
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent read/write throughput of default and tuned SQLite settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+        parser.add_argument('--writers', type=int, default=2, help='Writer processes')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+        parser.add_argument('--rows', type=int, default=10000, help='Rows to preload')
+
+    def handle(self, *args, **options):
+        configs = {
+            'default (rollback journal)': {},
+            'tuned (settings.SQLITE_OPTIONS)': settings.SQLITE_OPTIONS,
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            for n, (label, db_options) in enumerate(configs.items()):
+                path = str(Path(tmp) / f'bench-{n}.sqlite3')
+                self.prepare(path, options['rows'])
+                result = self.run(path, db_options, options)
+                self.stdout.write(
+                    f'{label:<32} reads/s {result["read"][0]:>9.0f}   writes/s {result["write"][0]:>7.0f}   '
+                    f'lock errors {result["read"][1] + result["write"][1]}'
+                )
+
+    def prepare(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            'INSERT INTO post (title, body) VALUES (?, ?)',
+            ((f'post {i}', 'x' * 500) for i in range(rows)),
+        )
+        conn.commit()
+        conn.close()
+
+    def run(self, path, db_options, options):
+        deadline = time.time() + options['seconds']
+        jobs = [(path, db_options, 'read', deadline, options['rows'])] * options['readers']
+        jobs += [(path, db_options, 'write', deadline, options['rows'])] * options['writers']
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        with multiprocessing.Pool(len(jobs)) as pool:
+            for role, ops, errors in pool.map(_worker, jobs):
+                totals[role][0] += ops
+                totals[role][1] += errors
+        seconds = options['seconds']
+        return {role: (ops / seconds, errors) for role, (ops, errors) in totals.items()}
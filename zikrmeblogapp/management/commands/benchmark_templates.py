@@ -0,0 +1,115 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.test import Client
+from django.test.signals import template_rendered
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases
+
+from zikrmeblogapp import view_counts
+from zikrmeblogapp.synthetic import seed
+
+from .benchmark_views import public_urls
+
+
+def _backend(cached):
+    config = next(t for t in settings.TEMPLATES if t['BACKEND'].endswith('DjangoTemplates'))
+    loaders = settings.TEMPLATE_LOADERS
+    options = {
+        **config['OPTIONS'],
+        'loaders': [('django.template.loaders.cached.Loader', loaders)] if cached else loaders,
+    }
+    return DjangoTemplates({
+        'NAME': 'cached' if cached else 'uncached',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': options,
+    })
+
+
+def _jinja2_backend():
+    try:
+        from django.template.backends.jinja2 import Jinja2
+    except ImportError:
+        return None
+    config = settings.JINJA2_TEMPLATE_ENGINE
+    return Jinja2({
+        'NAME': 'jinja2',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': dict(config['OPTIONS']),
+    })
+
+
+class Command(BaseCommand):
+    help = 'Compare template render time uncached, cached and (if installed) with Jinja2'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200, help='Synthetic posts to create')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed renders per template')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed(posts=options['posts'], categories=10, destinations=3)
+            static = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+            with override_settings(STORAGES={**settings.STORAGES, 'staticfiles': static}):
+                self.compare(self.capture(), options['repeat'])
+            view_counts.flush()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def capture(self):
+        """Request each public page once and keep its top-level template and context."""
+        pages = {}
+
+        def record(sender, template, context, **kwargs):
+            # The first render of a request is the page; later ones are includes.
+            pages.setdefault(current, (template.name, context.flatten()))
+
+        template_rendered.connect(record)
+        try:
+            client = Client()
+            for current, url in public_urls().items():
+                client.get(url)
+        finally:
+            template_rendered.disconnect(record)
+        return pages
+
+    def compare(self, pages, repeat):
+        backends = [_backend(cached=False), _backend(cached=True), _jinja2_backend()]
+        self.stdout.write(
+            f'{"page":<20} {"template":<24} {"uncached ms":>12} {"cached ms":>10} {"jinja2 ms":>10}'
+        )
+        totals = [0.0, 0.0, 0.0]
+        for page, (name, context) in pages.items():
+            results = []
+            for backend in backends:
+                try:
+                    template = backend.get_template(name) if backend else None
+                except TemplateDoesNotExist:
+                    template = None
+                if template is None:
+                    results.append(None)
+                    continue
+                template.render(context)  # fill the cache
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    backend.get_template(name).render(context)
+                    timings.append((time.perf_counter() - started) * 1000)
+                results.append(statistics.median(timings))
+            if results[2] is not None:
+                totals = [total + result for total, result in zip(totals, results)]
+            cells = ' '.join(
+                f'{"-" if result is None else f"{result:.2f}":>{width}}'
+                for result, width in zip(results, (12, 10, 10))
+            )
+            self.stdout.write(f'{page:<20} {name:<24} {cells}')
+        self.stdout.write(
+            f'{"total (pages with a Jinja2 template)":<45} {totals[0]:>12.2f} {totals[1]:>10.2f} {totals[2]:>10.2f}'
+        )
@@ -0,0 +1,116 @@
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases
+from django.urls import reverse
+
+from zikrmeblogapp import view_counts
+from zikrmeblogapp.models import Category, Destination, Post
+from zikrmeblogapp.synthetic import seed
+
+
+def public_urls():
+    """Every public page, pointed at real rows of the current data set."""
+    urls = {
+        "home": reverse("home"),
+        "home_search": reverse("home") + "?q=beach",
+        "posts_list": reverse("posts_list"),
+        "posts_list_page_2": reverse("posts_list") + "?page=2",
+        "posts_search": reverse("posts_list") + "?q=beach",
+        "featured_list": reverse("featured_list"),
+        "articles_list": reverse("articles_list"),
+        "posts_more": reverse("posts_more") + "?list=blogs&cursor=15",
+        "search_suggest": reverse("search_suggest") + "?q=bea",
+        "categories": reverse("categories"),
+        "destination": reverse("destination"),
+        "about": reverse("about"),
+        "contact": reverse("contact"),
+    }
+    category = Category.objects.order_by("id").first()
+    if category:
+        urls["posts_by_category"] = reverse("posts_by_category", args=[category.slug])
+    post = Post.objects.filter(is_published=True).order_by("id").first()
+    if post:
+        urls["post_detail"] = reverse("post_detail", args=[post.slug])
+    destination = Destination.objects.order_by("id").first()
+    if destination:
+        urls["destination_detail"] = reverse("destination_detail", args=[destination.slug])
+    return urls
+
+
+class Command(BaseCommand):
+    help = 'Time every public URL at several data sizes in a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+            help='Post counts to benchmark at (categories and destinations scale with them)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per URL')
+        parser.add_argument('--output', default='benchmark_report.json', help='Where to write the JSON report')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self.run(sorted(options['sizes']), options['repeat'])
+            view_counts.flush()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+    def run(self, sizes, repeat):
+        client = Client()
+        runs = []
+        for size in sizes:
+            missing = size - Post.objects.count()
+            if missing > 0:
+                seed(
+                    posts=missing,
+                    categories=max(1, missing // 500),
+                    destinations=max(1, missing // 200),
+                    seed=size,
+                )
+            self.stdout.write(f'\n{size} posts')
+            results = {}
+            for name, url in public_urls().items():
+                client.get(url)  # warm caches and lazy indexes
+                timings = []
+                for _ in range(repeat):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        timings.append((time.perf_counter() - started) * 1000)
+                results[name] = {
+                    "url": url,
+                    "status": response.status_code,
+                    "bytes": len(response.content),
+                    "queries": len(queries.captured_queries),
+                    "median_ms": round(statistics.median(timings), 2),
+                    "min_ms": round(min(timings), 2),
+                    "max_ms": round(max(timings), 2),
+                }
+                self.stdout.write(
+                    f'  {name:<20} {results[name]["median_ms"]:>8.2f} ms  '
+                    f'{results[name]["queries"]:>3} queries'
+                )
+            runs.append({"posts": size, "results": results})
+
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "runs": runs,
+        }
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+
+from zikrmeblogapp.warmup import template_sources
+
+
+class Command(BaseCommand):
+    help = 'Compile every template under templates/ (and jinja2/) and fail on syntax errors'
+
+    def handle(self, *args, **options):
+        count = 0
+        errors = []
+        for engine, name in template_sources():
+            count += 1
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist) as exc:
+                errors.append(f'{engine.name}:{name}: {exc}')
+        if errors:
+            for error in errors:
+                self.stderr.write(error)
+            raise CommandError(f'{len(errors)} of {count} templates failed to compile')
+        self.stdout.write(self.style.SUCCESS(f'Compiled {count} templates'))
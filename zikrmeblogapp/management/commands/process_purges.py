@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from zikrmeblogapp.surrogate import drain
+
+
+class Command(BaseCommand):
+    help = 'Send queued surrogate-key purges to the configured CDN purger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events per purger call')
+        parser.add_argument(
+            '--loop', type=int, default=0, metavar='SECONDS',
+            help='Keep running, polling the purge queue every SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = drain(batch_size=options['batch_size'])
+            if done:
+                self.stdout.write(self.style.SUCCESS(f'Purged {done} events'))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
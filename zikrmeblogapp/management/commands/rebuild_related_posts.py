@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from zikrmeblogapp import related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related posts table for every published post'
+
+    def handle(self, *args, **options):
+        engine = 'NumPy' if related.np is not None else 'pure Python'
+        self.stdout.write(f'Scoring posts with the {engine} engine...')
+        count = related.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} related post entries'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from zikrmeblogapp.synthetic import seed
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic categories, posts and destinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Number of posts to create')
+        parser.add_argument('--categories', type=int, default=20, help='Number of categories to create')
+        parser.add_argument('--destinations', type=int, default=50, help='Number of destinations to create')
+        parser.add_argument('--cities', type=int, default=3, help='Cities per destination')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = seed(
+            posts=options['posts'],
+            categories=options['categories'],
+            destinations=options['destinations'],
+            cities_per_destination=options['cities'],
+            seed=options['seed'],
+        )
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{count} {name}' for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} in {elapsed:.1f}s'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from zikrmeblogapp.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outgoing emails over a single mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages per connection')
+        parser.add_argument(
+            '--loop', type=int, default=0, metavar='SECONDS',
+            help='Keep running, polling the outbox every SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_pending(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails'))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -1,5 +1,20 @@
+import hashlib
+import logging
+import threading
+import time
+from contextlib import ExitStack
 from typing import Callable
 
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import has_vary_header, patch_cache_control, patch_vary_headers
+
+from . import caching, compression, db_routers
+from .minify import minify_html
+
+logger = logging.getLogger(__name__)
+
 
 class ProxyHeaderMiddleware:
     """Normalize host and scheme from reverse proxy headers.
@@ -26,3 +41,303 @@ class ProxyHeaderMiddleware:
         return self.get_response(request)
 
 
+class PageCacheMiddleware:
+    """Whole-page cache for anonymous GET requests (``PAGE_CACHE_SECONDS``).
+
+    Entries go through ``caching.get_or_compute()``, so when a page expires
+    one request re-renders it while concurrent ones get the stale copy.
+    Sits above ``CompressionMiddleware`` and keys on the negotiated
+    encoding, so each stored variant is already minified and compressed.
+    Responses that set cookies, vary on them or are marked private are
+    never stored. Keys carry the ``pages`` generation, which any content
+    change bumps, so an edit drops every stored page in all workers.
+    """
+
+    def __init__(self, get_response: Callable):
+        self.seconds = getattr(settings, "PAGE_CACHE_SECONDS", 0)
+        if not self.seconds:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method != "GET" or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return self.get_response(request)
+        encoding = compression.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", "")) or "identity"
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return caching.get_or_compute(
+            f"page:{caching.generation('pages')}:{url}:{encoding}",
+            lambda: self.render(request),
+            self.seconds,
+            should_cache=self.cacheable,
+        )
+
+    def render(self, request):
+        # Tells HTMLMinifyMiddleware this response is about to be stored.
+        request._cache_update_cache = True
+        return self.get_response(request)
+
+    @staticmethod
+    def cacheable(response) -> bool:
+        cache_control = response.get("Cache-Control", "")
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not has_vary_header(response, "Cookie")
+            and "private" not in cache_control
+            and "no-store" not in cache_control
+        )
+
+
+class CompressionMiddleware:
+    """Compress HTML/JSON responses with brotli (if installed) or gzip.
+
+    The request's ``Accept-Encoding`` is rewritten to the negotiated
+    encoding before the view runs, so a page cache keyed on
+    ``Vary: Accept-Encoding`` stores at most one entry per encoding
+    rather than one per browser header. Streaming responses are compressed
+    chunk by chunk; responses that already carry a ``Content-Encoding``
+    are left alone. Disabled with ``RESPONSE_COMPRESSION=False``.
+    """
+
+    def __init__(self, get_response: Callable):
+        if not getattr(settings, "RESPONSE_COMPRESSION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        encoding = compression.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding:
+            request.META["HTTP_ACCEPT_ENCODING"] = encoding
+        else:
+            request.META.pop("HTTP_ACCEPT_ENCODING", None)
+        response = self.get_response(request)
+        if not compression.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < compression.MIN_LENGTH:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not encoding:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.compress_async_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compression.compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compression.compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The body changed, so a strong ETag no longer identifies it.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class HTMLMinifyMiddleware:
+    """Minify HTML pages that are about to be stored by a cache.
+
+    ``PageCacheMiddleware`` (like Django's ``FetchFromCacheMiddleware``)
+    marks a cache miss that will be stored with
+    ``request._cache_update_cache``; only those responses are minified, so
+    the work happens once per cache entry and cache hits are served as
+    stored. With ``HTML_MINIFY_FOR_CDN=True`` pages given ``s-maxage`` by
+    ``SurrogateKeyMiddleware`` are minified too; that runs on every origin
+    hit, so only enable it when a CDN actually sits in front. Must sit
+    below ``CompressionMiddleware`` so it sees the uncompressed body, and
+    above ``SurrogateKeyMiddleware`` so it sees the CDN headers. Disabled
+    with ``HTML_MINIFY=False``.
+    """
+
+    def __init__(self, get_response: Callable):
+        if not getattr(settings, "HTML_MINIFY", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.for_cdn = getattr(settings, "HTML_MINIFY_FOR_CDN", False)
+
+    def stored(self, request, response) -> bool:
+        if getattr(request, "_cache_update_cache", False):
+            return True
+        return self.for_cdn and "s-maxage" in response.get("Cache-Control", "")
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            self.stored(request, response)
+            and response.status_code == 200
+            and not response.streaming
+            and not response.has_header("Content-Encoding")
+            and response.get("Content-Type", "").startswith("text/html")
+        ):
+            charset = response.charset
+            response.content = minify_html(response.content.decode(charset)).encode(charset)
+            if response.has_header("Content-Length"):
+                response.headers["Content-Length"] = str(len(response.content))
+        return response
+
+
+class SurrogateKeyMiddleware:
+    """Add surrogate keys and CDN ``Cache-Control`` to tagged public responses.
+
+    Only GET/HEAD 200 responses that a view tagged (``surrogate.tag()``) are
+    marked cacheable, and only when they cannot differ per visitor: no
+    session cookie, no ``Set-Cookie`` and no ``Vary: Cookie``. Those get
+    ``s-maxage=CDN_S_MAXAGE`` and ``stale-while-revalidate``; the rest are
+    marked private. Disabled with ``CDN_S_MAXAGE=0``.
+    """
+
+    def __init__(self, get_response: Callable):
+        self.s_maxage = getattr(settings, "CDN_S_MAXAGE", 300)
+        if not self.s_maxage:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.stale_seconds = getattr(settings, "CDN_STALE_WHILE_REVALIDATE", 60)
+        self.header = getattr(settings, "SURROGATE_KEY_HEADER", "Surrogate-Key")
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        keys = getattr(request, "surrogate_keys", None)
+        if not keys or request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        if (
+            settings.SESSION_COOKIE_NAME in request.COOKIES
+            or response.cookies
+            or has_vary_header(response, "Cookie")
+        ):
+            patch_cache_control(response, private=True)
+            return response
+        response.headers[self.header] = " ".join(sorted(keys))
+        patch_cache_control(
+            response, public=True, s_maxage=self.s_maxage, stale_while_revalidate=self.stale_seconds
+        )
+        return response
+
+
+class _RequestStats(threading.local):
+    """Per-thread timing accumulators for the request being served."""
+
+    active = False
+    template_depth = 0
+    template_time = 0.0
+    sql_time = 0.0
+    sql_count = 0
+
+
+_stats = _RequestStats()
+
+
+def timed_render(render, *args):
+    """Call ``render(*args)`` and add its time to the request's template total.
+
+    Used by the backends in ``template_backends``. Only the outermost
+    render is timed; includes and nested ``render_to_string()`` calls are
+    part of it.
+    """
+    if not _stats.active or _stats.template_depth:
+        return render(*args)
+    _stats.template_depth += 1
+    start = time.perf_counter()
+    try:
+        return render(*args)
+    finally:
+        _stats.template_time += time.perf_counter() - start
+        _stats.template_depth -= 1
+
+
+def _sql_timer(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        _stats.sql_time += time.perf_counter() - start
+        _stats.sql_count += 1
+
+
+class RequestTimingMiddleware:
+    """Measure view, template and SQL time for each request.
+
+    Adds a ``Server-Timing`` header (visible in the browser dev tools) and
+    logs requests slower than ``REQUEST_TIMING_SLOW_MS``. Enabled with the
+    ``REQUEST_TIMING`` setting; when off, Django drops the middleware.
+    Template time comes from the backends in ``template_backends``. Sits
+    above ``PageCacheMiddleware`` so a cached page reports its own timing.
+    """
+
+    def __init__(self, get_response: Callable):
+        if not getattr(settings, "REQUEST_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_TIMING_SLOW_MS", 500)
+
+    def __call__(self, request):
+        _stats.active = True
+        _stats.template_depth = 0
+        _stats.template_time = _stats.sql_time = 0.0
+        _stats.sql_count = 0
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_sql_timer))
+                response = self.get_response(request)
+        finally:
+            _stats.active = False
+        total_ms = (time.perf_counter() - start) * 1000
+        tpl_ms = _stats.template_time * 1000
+        sql_ms = _stats.sql_time * 1000
+
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={total_ms:.1f}",
+            f"tpl;dur={tpl_ms:.1f}",
+            f'db;dur={sql_ms:.1f};desc="{_stats.sql_count} queries"',
+        ])
+        if total_ms >= self.slow_ms:
+            logger.warning(
+                "Slow request %s %s: %.0fms total, %.0fms templates, %d queries in %.0fms",
+                request.method, request.path, total_ms, tpl_ms, _stats.sql_count, sql_ms,
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Send public GET traffic to the read replica (see ``db_routers``)."""
+
+    def __init__(self, get_response: Callable):
+        if not db_routers.replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+    def __call__(self, request):
+        state = {"replica": False, "wrote": False}
+        token = db_routers.request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_routers.request_state.reset(token)
+        if state["wrote"] and request.method not in ("GET", "HEAD", "OPTIONS"):
+            response.set_cookie(
+                db_routers.STICKY_COOKIE, "1", max_age=self.sticky_seconds, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = db_routers.request_state.get()
+        if state is not None:
+            state["replica"] = (
+                request.method in ("GET", "HEAD")
+                and view_func.__module__ in db_routers.REPLICA_VIEW_MODULES
+                and db_routers.STICKY_COOKIE not in request.COOKIES
+            )
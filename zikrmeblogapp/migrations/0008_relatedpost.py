@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zikrmeblogapp', '0007_homeminivideo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='zikrmeblogapp.post')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='zikrmeblogapp.post')),
+            ],
+            options={
+                'ordering': ['post', '-score'],
+                'indexes': [models.Index(fields=['post', '-score'], name='related_post_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'related'), name='unique_related_post')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zikrmeblogapp', '0008_relatedpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='destination',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zikrmeblogapp', '0009_post_view_count_destination_view_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='heroimage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'created_at'], name='hero_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-created_at'], name='post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_featured', True), ('is_published', True)), fields=['-published_at', '-created_at'], name='post_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_article', True), ('is_published', True)), fields=['-published_at', '-created_at'], name='post_article_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zikrmeblogapp', '0013_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='city',
+            options={'ordering': ['order', 'name']},
+        ),
+        migrations.AddField(
+            model_name='city',
+            name='order',
+            field=models.PositiveIntegerField(default=0, help_text='Order within the destination (lower numbers appear first)'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['destination', 'order', 'name'], name='city_destination_order_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+"""Whitespace and comment minification for rendered HTML.
+
+Runs once per page cache entry (``HTMLMinifyMiddleware``), not per request.
+Whitespace runs collapse to a single space, or a single newline when they
+contained one, which renders identically. Inside tags only the whitespace
+between attributes is collapsed; quoted attribute values (``title``,
+``alt``, ``value``, ``data-*``...) are kept byte for byte. The contents of
+``<pre>``, ``<textarea>``, ``<script>`` and ``<style>`` are left untouched,
+as are conditional comments.
+"""
+
+import re
+
+_RAW_BLOCK = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--(?!\[if|<!\[endif).*?-->", re.DOTALL)
+_TAG_OR_WHITESPACE = re.compile(r"""(<[A-Za-z](?:"[^"]*"|'[^']*'|[^>"'])*>)|\s+""")
+_VALUE_OR_WHITESPACE = re.compile(r"""("[^"]*"|'[^']*')|\s+""")
+
+
+def _collapse(match):
+    if match.group(1):
+        return match.group(1)
+    return "\n" if "\n" in match.group() else " "
+
+
+def _minify_piece(match):
+    if match.group(1):
+        return _VALUE_OR_WHITESPACE.sub(_collapse, match.group(1))
+    return _collapse(match)
+
+
+def _minify_text(text):
+    return _TAG_OR_WHITESPACE.sub(_minify_piece, _COMMENT.sub("", text))
+
+
+def minify_html(html: str) -> str:
+    out = []
+    pos = 0
+    for block in _RAW_BLOCK.finditer(html):
+        out.append(_minify_text(html[pos:block.start()]))
+        out.append(block.group())
+        pos = block.end()
+    out.append(_minify_text(html[pos:]))
+    return "".join(out).strip()
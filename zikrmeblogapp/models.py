@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 import math
 
@@ -41,6 +42,13 @@ class HeroImage(TimeStampedModel):
 
     class Meta:
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(
+                fields=["order", "created_at"],
+                condition=models.Q(is_active=True),
+                name="hero_active_order_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.caption or f"Hero {self.pk}"
@@ -94,9 +102,31 @@ class Post(TimeStampedModel):
     is_featured = models.BooleanField(default=False)
     is_article = models.BooleanField(default=False)
     published_at = models.DateTimeField(blank=True, null=True)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-published_at", "-created_at"]
+        # Partial indexes matching the public listings: each filters on the
+        # flags in ``condition`` and reads rows in the default ordering.
+        indexes = [
+            models.Index(
+                fields=["-published_at", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="post_published_idx",
+            ),
+            models.Index(
+                fields=["-published_at", "-created_at"],
+                condition=models.Q(is_published=True, is_featured=True),
+                name="post_featured_idx",
+            ),
+            models.Index(
+                fields=["-published_at", "-created_at"],
+                condition=models.Q(is_published=True, is_article=True),
+                name="post_article_idx",
+            ),
+            # The panel's post list, newest first, drafts included.
+            models.Index(fields=["-created_at"], name="post_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -131,12 +161,31 @@ class PostLink(TimeStampedModel):
         return f"{self.label}"
 
 
+class RelatedPost(models.Model):
+    """Precomputed similarity between two posts, refreshed by ``related.py``."""
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="related_entries")
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["post", "-score"]
+        constraints = [
+            models.UniqueConstraint(fields=["post", "related"], name="unique_related_post"),
+        ]
+        indexes = [models.Index(fields=["post", "-score"], name="related_post_score_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
+
+
 class Destination(TimeStampedModel):
     title = models.CharField(max_length=160)
     slug = models.SlugField(max_length=180, unique=True, blank=True)
     description = models.TextField(blank=True)
     hero_image = models.FileField(upload_to="destinations/hero/", blank=True, null=True)
     mini_video = models.FileField(upload_to="destinations/video/", blank=True, null=True)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Destination"
@@ -159,10 +208,12 @@ class City(TimeStampedModel):
     name = models.CharField(max_length=140)
     slug = models.SlugField(max_length=160, blank=True)
     description = models.TextField(blank=True)
+    order = models.PositiveIntegerField(default=0, help_text="Order within the destination (lower numbers appear first)")
 
     class Meta:
         unique_together = ("destination", "slug")
-        ordering = ["name"]
+        ordering = ["order", "name"]
+        indexes = [models.Index(fields=["destination", "order", "name"], name="city_destination_order_idx")]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.destination.title})"
@@ -181,3 +232,61 @@ class CityMedia(TimeStampedModel):
     def __str__(self) -> str:
         return f"Media for {self.city.name}"
 
+
+class OutgoingEmail(TimeStampedModel):
+    """A queued message, delivered by ``outbox.send_pending()``."""
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField(help_text="Comma-separated recipient addresses")
+    reply_to = models.CharField(max_length=254, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} ({self.get_status_display()})"
+
+
+class PurgeEvent(TimeStampedModel):
+    """Surrogate keys to purge from the CDN, consumed by ``surrogate.process_purges()``."""
+
+    keys = models.TextField(help_text="Space-separated surrogate keys")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(processed_at__isnull=True),
+                name="purge_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.keys
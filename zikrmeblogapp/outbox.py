@@ -0,0 +1,186 @@
+"""Persistent outbox for outgoing mail.
+
+Views call ``enqueue()``, which only inserts an ``OutgoingEmail`` row, so a
+slow SMTP server never holds up a request. ``send_pending()`` delivers due
+messages over a single backend connection. A failure, including failing to
+connect at all, counts as an attempt for each message involved; they are
+retried with exponential backoff and marked failed after ``MAX_ATTEMPTS``.
+
+It runs on a background thread after each enqueue and when each gunicorn
+worker starts (``EMAIL_OUTBOX_BACKGROUND``). After a run the thread sets a
+timer for the next message that falls due, so retries and batches beyond
+the first go out without waiting for new mail. ``manage.py send_outbox``
+does the same by hand or from a cron job.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+# While a sender holds a message it is pushed this far into the future, so
+# other workers skip it; if the sender dies the message simply falls due again.
+CLAIM_SECONDS = 300
+
+
+def enqueue(subject, body, from_email, to, reply_to=""):
+    message = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        to=", ".join(to),
+        reply_to=reply_to,
+    )
+    schedule_send()
+    return message
+
+
+def _claim(message, now):
+    return OutgoingEmail.objects.filter(
+        pk=message.pk, status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now
+    ).update(next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS)) == 1
+
+
+def _as_email(message):
+    headers = {"Reply-To": message.reply_to} if message.reply_to else None
+    return EmailMessage(
+        message.subject,
+        message.body,
+        message.from_email,
+        [addr.strip() for addr in message.to.split(",") if addr.strip()],
+        headers=headers,
+    )
+
+
+def retry_delay(attempts: int) -> int:
+    """Seconds to wait after the ``attempts``-th failed attempt."""
+    return RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+
+def _record_failure(message, exc):
+    message.attempts += 1
+    message.last_error = str(exc)
+    if message.attempts >= MAX_ATTEMPTS:
+        message.status = OutgoingEmail.STATUS_FAILED
+        logger.error("Giving up on outgoing email %s: %s", message.pk, exc)
+    else:
+        message.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(message.attempts))
+        logger.warning("Outgoing email %s failed (attempt %s): %s", message.pk, message.attempts, exc)
+
+
+def send_pending(batch_size: int = 50) -> int:
+    """Send due messages over one connection; returns how many were sent."""
+    now = timezone.now()
+    due = list(
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now
+        ).order_by("next_attempt_at")[:batch_size]
+    )
+    claimed = [message for message in due if _claim(message, now)]
+    if not claimed:
+        return 0
+
+    sent = 0
+    mail = get_connection(fail_silently=False)
+    try:
+        mail.open()
+    except Exception as exc:
+        # Could not connect at all: an attempt for every claimed message,
+        # so a broken mail setup ends in STATUS_FAILED, not endless retries.
+        logger.warning("Outbox connection failed: %s", exc)
+        for message in claimed:
+            _record_failure(message, exc)
+    else:
+        try:
+            for message in claimed:
+                try:
+                    mail.send_messages([_as_email(message)])
+                except Exception as exc:
+                    _record_failure(message, exc)
+                else:
+                    message.attempts += 1
+                    message.status = OutgoingEmail.STATUS_SENT
+                    message.sent_at = timezone.now()
+                    message.last_error = ""
+                    sent += 1
+        finally:
+            try:
+                mail.close()
+            except Exception:
+                pass
+
+    stamp = timezone.now()
+    for message in claimed:
+        message.updated_at = stamp  # bulk_update() skips auto_now
+    OutgoingEmail.objects.bulk_update(
+        claimed, ["status", "attempts", "next_attempt_at", "last_error", "sent_at", "updated_at"]
+    )
+    return sent
+
+
+def next_due_in():
+    """Seconds until the next pending message falls due, or None if there is none."""
+    next_at = (
+        OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING)
+        .order_by("next_attempt_at")
+        .values_list("next_attempt_at", flat=True)
+        .first()
+    )
+    if next_at is None:
+        return None
+    return max(0.0, (next_at - timezone.now()).total_seconds())
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+_scheduled = threading.Event()
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def _set_timer(delay):
+    global _timer
+    with _timer_lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(delay, drain)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _run():
+    _scheduled.clear()
+    close_old_connections()
+    try:
+        send_pending()
+        delay = next_due_in()
+        if delay is not None:
+            _set_timer(delay)
+    except Exception:
+        logger.exception("Sending the outbox failed")
+    finally:
+        connection.close()
+
+
+def drain() -> None:
+    """Send due messages on the background thread (if ``EMAIL_OUTBOX_BACKGROUND``)."""
+    if not getattr(settings, "EMAIL_OUTBOX_BACKGROUND", True):
+        return
+    if not _scheduled.is_set():
+        _scheduled.set()
+        _executor.submit(_run)
+
+
+def schedule_send() -> None:
+    """Drain the outbox on a background thread once the transaction commits."""
+    transaction.on_commit(drain)
@@ -1,34 +1,66 @@
+import json
+
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import logout
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.http import require_GET
 
-from .models import Post, Category, Destination, City, PageHeroImage, HomeMiniVideo, HeroImage
-from .forms import CategoryForm, PostForm, DestinationForm, HeroImageForm, PageHeroImageForm, HomeMiniVideoForm, PasswordChangeCustomForm
+from .models import Post, Category, Destination, PageHeroImage, HomeMiniVideo, HeroImage
+from . import bulk_posts, dashboard_stats, reorder
+from .forms import CategoryForm, PostForm, DestinationForm, HeroImageForm, PageHeroImageForm, HomeMiniVideoForm, PasswordChangeCustomForm, PostBulkActionForm
 
 
 staff_required = user_passes_test(lambda u: u.is_active and u.is_staff)
 
+PANEL_PAGE_SIZE = 25
+
+
+def _paginate(request, queryset):
+    return Paginator(queryset, PANEL_PAGE_SIZE).get_page(request.GET.get("page"))
+
+
+def _search(request) -> str:
+    return (request.GET.get("q") or "").strip()
+
+
+def _reorder_response(request, apply):
+    """Run ``apply(ids)`` with the ids posted as ``{"ids": [...]}``."""
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "The request body is not valid JSON."}, status=400)
+    ids = payload.get("ids") if isinstance(payload, dict) else None
+    if not isinstance(ids, list):
+        return JsonResponse({"ok": False, "error": 'Expected a JSON object like {"ids": [...]}.'}, status=400)
+    try:
+        changed = apply(ids)
+    except ValueError as exc:
+        return JsonResponse({"ok": False, "error": str(exc)}, status=400)
+    return JsonResponse({"ok": True, "changed": changed})
+
+
+def _active_filter(queryset, request):
+    """Apply the ``?status=active|inactive`` filter shared by the media lists."""
+    status = request.GET.get("status")
+    if status in ("active", "inactive"):
+        queryset = queryset.filter(is_active=status == "active")
+    return queryset
+
 
 @staff_required
 def dashboard(request):
-    try:
-        page_heroes = PageHeroImage.objects.all()
-    except:
-        page_heroes = []
-    
     stats = {
-        "posts": Post.objects.count(),
-        "published": Post.objects.filter(is_published=True).count(),
-        "featured": Post.objects.filter(is_featured=True).count(),
-        "articles": Post.objects.filter(is_article=True).count(),
-        "categories": Category.objects.count(),
-        "destinations": Destination.objects.count(),
-        "cities": City.objects.count(),
+        **dashboard_stats.get(),
         "recent_posts": Post.objects.order_by("-created_at")[:7],
-        "page_heroes": page_heroes,
+        "top_posts": Post.objects.filter(view_count__gt=0).order_by("-view_count")[:7],
+        "top_destinations": Destination.objects.filter(view_count__gt=0).order_by("-view_count")[:5],
+        "page_heroes": PageHeroImage.objects.all(),
         "home_mini_video": HomeMiniVideo.objects.filter(is_active=True).first(),
     }
     return render(request, "panel/dashboard.html", stats)
@@ -52,9 +84,17 @@ def admin_logout_get(request):
 # -------- Tailwind CRUD: Categories ---------
 @staff_required
 def category_list(request):
-    items = Category.objects.order_by("name")
+    query = _search(request)
+    items = Category.objects.annotate(post_count=Count("posts")).order_by("name")
+    if query:
+        items = items.filter(name__icontains=query)
+    page_obj = _paginate(request, items)
     form = CategoryForm()
-    return render(request, "panel/categories/list.html", {"items": items, "form": form})
+    return render(
+        request,
+        "panel/categories/list.html",
+        {"items": page_obj, "page_obj": page_obj, "query": query, "form": form},
+    )
 
 
 @staff_required
@@ -90,11 +130,63 @@ def category_delete(request, pk: int):
 # -------- Tailwind CRUD: Posts ---------
 @staff_required
 def post_list(request):
-    query = (request.GET.get("q") or "").strip()
-    items_qs = Post.objects.order_by("-created_at")
+    query = _search(request)
+    status = request.GET.get("status", "")
+    featured = request.GET.get("featured", "")
+    category = request.GET.get("category", "")
+
+    # Newest first via post_created_idx; only the columns the table shows.
+    items_qs = (
+        Post.objects.order_by("-created_at")
+        .only("title", "is_published", "is_featured", "is_article", "created_at")
+        .prefetch_related("categories")
+    )
     if query:
         items_qs = items_qs.filter(title__icontains=query)
-    return render(request, "panel/posts/list.html", {"items": items_qs, "query": query})
+    if status in ("published", "draft"):
+        items_qs = items_qs.filter(is_published=status == "published")
+    if featured in ("yes", "no"):
+        items_qs = items_qs.filter(is_featured=featured == "yes")
+    if category:
+        items_qs = items_qs.filter(categories__slug=category)
+
+    page_obj = _paginate(request, items_qs)
+    context = {
+        "items": page_obj,
+        "page_obj": page_obj,
+        "query": query,
+        "status": status,
+        "featured": featured,
+        "category": category,
+        "categories": Category.objects.annotate(post_count=Count("posts")).order_by("name"),
+        "bulk_actions": PostBulkActionForm.ACTION_CHOICES,
+        "success_message": request.session.pop("success_message", None),
+        "error_message": request.session.pop("error_message", None),
+    }
+    return render(request, "panel/posts/list.html", context)
+
+
+@staff_required
+@require_http_methods(["POST"])
+def post_bulk(request):
+    form = PostBulkActionForm(request.POST)
+    if form.is_valid():
+        action = form.cleaned_data["action"]
+        count = bulk_posts.apply(
+            action,
+            [post.pk for post in form.cleaned_data["ids"]],
+            category=form.cleaned_data["category"],
+        )
+        label = dict(PostBulkActionForm.ACTION_CHOICES)[action]
+        request.session["success_message"] = f"{label}: {count} post{'s' if count != 1 else ''} updated."
+    else:
+        request.session["error_message"] = "; ".join(
+            error for errors in form.errors.values() for error in errors
+        )
+    next_url = request.POST.get("next", "")
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse("panel_post_list")
+    return redirect(next_url)
 
 
 @staff_required
@@ -133,9 +225,17 @@ def post_delete(request, pk: int):
 # -------- Tailwind CRUD: Destinations ---------
 @staff_required
 def destination_list(request):
-    items = Destination.objects.order_by("title")
+    query = _search(request)
+    items = Destination.objects.annotate(city_count=Count("cities")).order_by("title")
+    if query:
+        items = items.filter(title__icontains=query)
+    page_obj = _paginate(request, items)
     form = DestinationForm()
-    return render(request, "panel/destinations/list.html", {"items": items, "form": form})
+    return render(
+        request,
+        "panel/destinations/list.html",
+        {"items": page_obj, "page_obj": page_obj, "query": query, "form": form},
+    )
 
 
 @staff_required
@@ -157,7 +257,18 @@ def destination_edit(request, pk: int):
             return redirect("panel_destination_list")
     else:
         form = DestinationForm(instance=item)
-    return render(request, "panel/destinations/edit.html", {"form": form, "item": item})
+    return render(
+        request,
+        "panel/destinations/edit.html",
+        {"form": form, "item": item, "cities": item.cities.only("pk", "name", "order")},
+    )
+
+
+@staff_required
+@require_http_methods(["POST"])
+def destination_city_reorder(request, pk: int):
+    destination = get_object_or_404(Destination, pk=pk)
+    return _reorder_response(request, lambda ids: reorder.reorder_cities(destination, ids))
 
 
 @staff_required
@@ -171,14 +282,33 @@ def destination_delete(request, pk: int):
 # -------- Tailwind CRUD: Hero Images ---------
 @staff_required
 def hero_list(request):
-    items = HeroImage.objects.order_by("order")
+    query = _search(request)
+    items = _active_filter(HeroImage.objects.order_by("order", "created_at"), request)
+    if query:
+        items = items.filter(caption__icontains=query)
+    # Reordering posts the full list, so the unfiltered list is shown whole.
+    sortable = not query and not request.GET.get("status")
+    if sortable:
+        items = list(items)
+        page_obj = Paginator(items, max(len(items), 1)).get_page(1)
+    else:
+        page_obj = _paginate(request, items)
     form = HeroImageForm()
     success_message = request.session.pop('success_message', None)
     error_message = request.session.pop('error_message', None)
     return render(
         request,
         "panel/hero/list.html",
-        {"items": items, "form": form, "success_message": success_message, "error_message": error_message},
+        {
+            "items": page_obj,
+            "page_obj": page_obj,
+            "query": query,
+            "status": request.GET.get("status", ""),
+            "sortable": sortable,
+            "form": form,
+            "success_message": success_message,
+            "error_message": error_message,
+        },
     )
 
 
@@ -204,10 +334,16 @@ def hero_create(request):
 def hero_toggle(request, pk: int):
     item = get_object_or_404(HeroImage, pk=pk)
     item.is_active = not item.is_active
-    item.save()
+    item.save(update_fields=["is_active", "updated_at"])
     return redirect("panel_hero_list")
 
 
+@staff_required
+@require_http_methods(["POST"])
+def hero_reorder(request):
+    return _reorder_response(request, reorder.reorder_hero_images)
+
+
 @staff_required
 def hero_edit(request, pk: int):
     item = get_object_or_404(HeroImage, pk=pk)
@@ -232,8 +368,12 @@ def hero_delete(request, pk: int):
 # -------- Tailwind CRUD: Page Hero Images ---------
 @staff_required
 def page_hero_list(request):
-    items = PageHeroImage.objects.order_by("page")
-    
+    query = _search(request)
+    items = _active_filter(PageHeroImage.objects.order_by("page"), request)
+    if query:
+        items = items.filter(title__icontains=query)
+    page_obj = _paginate(request, items)
+
     # Get messages and clear them
     success_message = request.session.pop('success_message', None)
     error_message = request.session.pop('error_message', None)
@@ -242,7 +382,10 @@ def page_hero_list(request):
     form = PageHeroImageForm()
     
     context = {
-        "items": items, 
+        "items": page_obj,
+        "page_obj": page_obj,
+        "query": query,
+        "status": request.GET.get("status", ""),
         "form": form,
         "success_message": success_message,
         "error_message": error_message,
@@ -294,9 +437,14 @@ def page_hero_delete(request, pk: int):
 # -------- Home Mini Video Management ---------
 @staff_required
 def home_mini_video_list(request):
-    items = HomeMiniVideo.objects.order_by("-created_at")
+    items = _active_filter(HomeMiniVideo.objects.order_by("-created_at"), request)
+    page_obj = _paginate(request, items)
     form = HomeMiniVideoForm()
-    return render(request, "panel/home_mini_video/list.html", {"items": items, "form": form})
+    return render(
+        request,
+        "panel/home_mini_video/list.html",
+        {"items": page_obj, "page_obj": page_obj, "status": request.GET.get("status", ""), "form": form},
+    )
 
 
 @staff_required
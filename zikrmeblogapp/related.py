@@ -0,0 +1,335 @@
+"""Precomputed "related posts" for ``views.post_detail``.
+
+Two published posts are similar when they share categories (Jaccard
+overlap) and when their title/description text is close (cosine of
+TF-IDF vectors, with the title counted twice). Scores are accumulated
+through inverted postings so only posts sharing a term or category are
+touched; when NumPy is installed the accumulation is vectorized.
+
+The top ``RELATED_LIMIT`` matches per post are stored in ``RelatedPost``
+and read by the detail view with one indexed query. A post save schedules
+an incremental refresh on a background thread once the transaction
+commits: the worker keeps its ``Corpus`` between refreshes and patches in
+just the saved post, then rewrites only the lists that change.
+``manage.py rebuild_related_posts`` recomputes the whole table exactly.
+"""
+
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from . import caching
+from .models import Post, RelatedPost
+from .search_index import normalize
+from .surrogate import queue_purge
+
+try:  # NumPy is optional; the pure Python path gives identical scores.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+RELATED_LIMIT = 6
+CATEGORY_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+MIN_SCORE = 0.05
+# A refresh checks at most this many of the saved post's best matches for
+# a list it should now enter; the rebuild command catches any it misses.
+NEIGHBOUR_LIMIT = 50
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our "
+    "that the their this to was we were will with you your".split()
+)
+
+
+def _terms(post):
+    words = normalize(post.title) * 2 + normalize(post.description)
+    return Counter(w for w in words if len(w) > 2 and w not in STOPWORDS)
+
+
+class Corpus:
+    """TF-IDF vectors and category postings for every published post.
+
+    ``update()`` replaces one post in place. Its vector uses the current
+    document frequencies while other posts keep the weights they were
+    built with; the drift is small and ``rebuild_all()`` starts over.
+    """
+
+    def __init__(self, posts):
+        self.ids = []         # slot -> post id (None once removed)
+        self.position = {}    # post id -> slot
+        self.categories = []  # slot -> frozenset of category ids
+        self.vectors = []     # slot -> {term: weight}, unit length
+        self.text_postings = defaultdict(dict)      # term -> {slot: weight}
+        self.category_postings = defaultdict(set)   # category id -> slots
+        self._arrays = {}     # NumPy copies of postings, dropped on change
+        self._category_sizes = None
+        docs = [(post.pk, frozenset(c.pk for c in post.categories.all()), _terms(post)) for post in posts]
+        self.df = Counter(term for _, _, counts in docs for term in counts)
+        for pk, categories, counts in docs:
+            self._put(pk, categories, counts, len(docs))
+
+    @classmethod
+    def load(cls):
+        return cls(_published().prefetch_related("categories"))
+
+    # -- maintenance -----------------------------------------------------
+    def _put(self, pk, categories, counts, size):
+        vec = {
+            term: tf * (math.log((1 + size) / (1 + self.df[term])) + 1)
+            for term, tf in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        vec = {term: w / norm for term, w in vec.items()}
+
+        i = self.position.get(pk)
+        if i is None:
+            i = self.position[pk] = len(self.ids)
+            self.ids.append(pk)
+            self.categories.append(frozenset())
+            self.vectors.append({})
+        self.ids[i], self.categories[i], self.vectors[i] = pk, categories, vec
+        for term, w in vec.items():
+            self.text_postings[term][i] = w
+            self._arrays.pop(term, None)
+        for cat in categories:
+            self.category_postings[cat].add(i)
+            self._arrays.pop(("category", cat), None)
+        self._category_sizes = None
+
+    def _drop(self, i):
+        for term in self.vectors[i]:
+            del self.text_postings[term][i]
+            self._arrays.pop(term, None)
+        for cat in self.categories[i]:
+            self.category_postings[cat].discard(i)
+            self._arrays.pop(("category", cat), None)
+        self.categories[i], self.vectors[i] = frozenset(), {}
+        self._category_sizes = None
+
+    def update(self, pk, post=None):
+        """Re-read ``pk`` from ``post``, or remove it when ``post`` is None."""
+        i = self.position.get(pk)
+        if i is not None:
+            self.df.subtract(self.vectors[i].keys())
+            self._drop(i)
+        if post is None:
+            if i is not None:
+                del self.position[pk]
+                self.ids[i] = None
+            return
+        counts = _terms(post)
+        self.df.update(counts.keys())
+        size = len(self.position) + (pk not in self.position)
+        self._put(pk, frozenset(c.pk for c in post.categories.all()), counts, size)
+
+    # -- scoring ---------------------------------------------------------
+    def scores(self, pk):
+        """Return ``{other_pk: score}`` for posts scoring at least ``MIN_SCORE``."""
+        i = self.position.get(pk)
+        if i is None:
+            return {}
+        if np is not None:
+            return self._scores_numpy(i)
+        return self._scores_python(i)
+
+    def _text_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.text_postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.intp, count=len(postings)),
+                np.fromiter(postings.values(), dtype=float, count=len(postings)),
+            )
+        return arrays
+
+    def _category_array(self, cat):
+        idx = self._arrays.get(("category", cat))
+        if idx is None:
+            postings = self.category_postings[cat]
+            idx = self._arrays[("category", cat)] = np.fromiter(postings, dtype=np.intp, count=len(postings))
+        return idx
+
+    def _scores_numpy(self, i):
+        size = len(self.ids)
+        text = np.zeros(size)
+        for term, w in self.vectors[i].items():
+            idx, weights = self._text_arrays(term)
+            np.add.at(text, idx, weights * w)
+
+        shared = np.zeros(size)
+        for cat in self.categories[i]:
+            np.add.at(shared, self._category_array(cat), 1.0)
+        if self._category_sizes is None:
+            self._category_sizes = np.array([len(c) for c in self.categories], dtype=float)
+        union = self._category_sizes + len(self.categories[i]) - shared
+        jaccard = np.divide(shared, union, out=np.zeros(size), where=union > 0)
+
+        total = CATEGORY_WEIGHT * jaccard + TEXT_WEIGHT * text
+        total[i] = 0.0
+        hits = np.nonzero(total >= MIN_SCORE)[0]
+        return {self.ids[j]: float(total[j]) for j in hits}
+
+    def _scores_python(self, i):
+        text = defaultdict(float)
+        for term, w in self.vectors[i].items():
+            for j, wj in self.text_postings[term].items():
+                text[j] += w * wj
+
+        shared = Counter()
+        for cat in self.categories[i]:
+            shared.update(self.category_postings[cat])
+
+        own = len(self.categories[i])
+        result = {}
+        for j in set(text) | set(shared):
+            if j == i:
+                continue
+            union = len(self.categories[j]) + own - shared[j]
+            jaccard = shared[j] / union if union else 0.0
+            score = CATEGORY_WEIGHT * jaccard + TEXT_WEIGHT * text[j]
+            if score >= MIN_SCORE:
+                result[self.ids[j]] = score
+        return result
+
+
+def _published():
+    return Post.objects.filter(is_published=True).only("id", "title", "description")
+
+
+def _top(scores):
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:RELATED_LIMIT]
+
+
+def rebuild_all(batch_size: int = 500) -> int:
+    """Recompute the whole table; returns the number of rows written."""
+    corpus = Corpus.load()
+    rows = [
+        RelatedPost(post_id=pk, related_id=other, score=score)
+        for pk in corpus.ids
+        for other, score in _top(corpus.scores(pk))
+    ]
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=batch_size)
+        queue_purge("related")
+        caching.bump("pages")
+    return len(rows)
+
+
+# The worker's corpus, stamped with the shared "related" generation it
+# reflects. A refresh in another worker bumps it, and this copy reloads.
+_corpus = None
+_corpus_generation = None
+_corpus_lock = threading.Lock()
+
+
+def refresh_post(pk: int, listing=()) -> None:
+    """Patch ``pk`` into the corpus and rewrite the lists it changes.
+
+    Those are ``pk``'s own list, the lists that hold it now, and the lists
+    of its best matches that it now beats the weakest entry of. Each is
+    recomputed in full from the corpus, so a list that loses ``pk`` (say it
+    was unpublished) is backfilled. ``listing`` adds posts known to have
+    listed ``pk`` before their rows were deleted with it.
+    """
+    global _corpus, _corpus_generation
+    with _corpus_lock:
+        generation = caching.generation("related")
+        if _corpus is None or _corpus_generation != generation:
+            _corpus, _corpus_generation = Corpus.load(), generation
+        corpus = _corpus
+        corpus.update(pk, _published().filter(pk=pk).prefetch_related("categories").first())
+        if caching.advance("related") == generation + 1:
+            _corpus_generation = generation + 1
+        else:
+            _corpus = None
+
+        scores = corpus.scores(pk)
+        best = [other for other, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:NEIGHBOUR_LIMIT]]
+        holders = set(listing) | set(
+            RelatedPost.objects.filter(related_id=pk).values_list("post_id", flat=True)
+        )
+        current = defaultdict(dict)
+        for post_id, related_id, score in RelatedPost.objects.filter(
+            post_id__in=holders.union(best, {pk})
+        ).values_list("post_id", "related_id", "score"):
+            current[post_id][related_id] = score
+
+        affected = holders | {pk} | {
+            other for other in best
+            if len(current[other]) < RELATED_LIMIT or scores[other] > min(current[other].values())
+        }
+        changed = {}
+        for post_id in affected:
+            top = _top(corpus.scores(post_id))
+            if [o for o, _ in top] != [o for o, _ in _top(current[post_id])]:
+                changed[post_id] = top
+
+    if not changed:
+        return
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=changed).delete()
+        RelatedPost.objects.bulk_create(
+            RelatedPost(post_id=post_id, related_id=other, score=score)
+            for post_id, top in changed.items()
+            for other, score in top
+        )
+        queue_purge(*(f"post-{post_id}" for post_id in changed))
+        caching.bump("pages")
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="related-posts")
+_pending = {}  # pk -> posts that listed it before it was deleted
+_pending_lock = threading.Lock()
+
+
+def _run_refresh(pk):
+    with _pending_lock:
+        listing = _pending.pop(pk, ())
+    close_old_connections()
+    try:
+        refresh_post(pk, listing)
+    except Exception:
+        logger.exception("Refreshing related posts for post %s failed", pk)
+    finally:
+        connection.close()
+
+
+def schedule_refresh(pk: int, listing=()) -> None:
+    """Refresh ``pk`` after the current transaction commits.
+
+    Repeated calls for the same post (save plus M2M changes) coalesce into
+    one refresh. Set ``RELATED_POSTS_BACKGROUND = False`` to run inline.
+    """
+    def enqueue():
+        if not getattr(settings, "RELATED_POSTS_BACKGROUND", True):
+            refresh_post(pk, listing)
+            return
+        with _pending_lock:
+            if pk in _pending:
+                _pending[pk] |= set(listing)
+                return
+            _pending[pk] = set(listing)
+        _executor.submit(_run_refresh, pk)
+
+    transaction.on_commit(enqueue)
+
+
+def listing_posts(pks) -> dict:
+    """Map each of ``pks`` to the posts whose lists hold it.
+
+    Deleting a post deletes those rows too, so callers collect them first
+    and pass them to ``schedule_refresh()`` to backfill the lists.
+    """
+    holders = defaultdict(set)
+    for post_id, related_id in RelatedPost.objects.filter(related_id__in=pks).values_list("post_id", "related_id"):
+        holders[related_id].add(post_id)
+    return holders
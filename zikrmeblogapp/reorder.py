@@ -0,0 +1,60 @@
+"""Drag-and-drop ordering for the panel.
+
+The panel posts the complete list of ids in their new order; ``reorder()``
+writes every changed ``order`` value with one ``bulk_update`` inside a
+transaction. ``bulk_update`` sends no model signals, so each wrapper
+queues the purge and cache bumps the save receivers would have, once.
+"""
+
+from django.db import transaction
+
+from . import caching
+from .home_snapshot import schedule_rebuild as schedule_home_rebuild
+from .models import HeroImage
+from .surrogate import queue_purge
+
+
+def reorder(queryset, ids, field="order") -> int:
+    """Number the rows of ``queryset`` 0, 1, 2... in the order of ``ids``.
+
+    ``ids`` must list every row of ``queryset`` exactly once, otherwise
+    ``ValueError`` is raised and nothing is written. Returns how many rows
+    changed.
+    """
+    try:
+        ids = [int(pk) for pk in ids]
+    except (TypeError, ValueError):
+        raise ValueError("ids must be integers") from None
+    with transaction.atomic():
+        rows = {obj.pk: obj for obj in queryset.select_for_update().only("pk", field)}
+        if len(ids) != len(set(ids)) or set(ids) != set(rows):
+            raise ValueError("ids must list every item exactly once")
+        changed = []
+        for position, pk in enumerate(ids):
+            obj = rows[pk]
+            if getattr(obj, field) != position:
+                setattr(obj, field, position)
+                changed.append(obj)
+        # updated_at is left alone: moving a row does not edit it.
+        queryset.model.objects.bulk_update(changed, [field])
+        return len(changed)
+
+
+def reorder_hero_images(ids) -> int:
+    with transaction.atomic():
+        changed = reorder(HeroImage.objects.all(), ids)
+        if changed:
+            queue_purge("hero")
+            caching.bump("pages")
+            caching.bump("home")
+            schedule_home_rebuild()
+    return changed
+
+
+def reorder_cities(destination, ids) -> int:
+    with transaction.atomic():
+        changed = reorder(destination.cities.all(), ids)
+        if changed:
+            queue_purge(f"destination-{destination.pk}")
+            caching.bump("pages")
+    return changed
@@ -0,0 +1,168 @@
+"""In-memory prefix index backing the search-as-you-type endpoint.
+
+Each published post contributes the normalized tokens of its title and of
+its category names. Tokens are kept in one sorted list of
+``(token, post_id)`` pairs so a prefix lookup is two bisects, and results
+are ranked by recency with a boost for featured posts.
+
+Each worker holds its own copy, stamped with the shared ``search`` cache
+generation it was built from. The receivers in ``signals.py`` apply a
+change to the saving worker's copy once the transaction commits and bump
+the generation. Lookups compare the stamp with the shared generation at
+most every ``GENERATION_CHECK_SECONDS``, so a keystroke normally costs no
+cache round trip; other workers pick up a change within that interval and
+rebuild.
+"""
+
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.db import transaction
+from django.urls import reverse
+
+from . import caching
+from .models import Post
+
+# A featured post ranks as if it had been published this many seconds later.
+FEATURED_BOOST_SECONDS = 30 * 24 * 3600
+MAX_RESULTS = 8
+GENERATION_CHECK_SECONDS = 2.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> list:
+    """Lowercase, strip accents and split ``text`` into alphanumeric tokens."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return _TOKEN_RE.findall(text)
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tokens = []   # sorted (token, post_id)
+        self._entries = {}  # post_id -> (score, title, slug, url, tokens)
+        self._built = False
+        self._generation = None  # shared "search" generation this copy reflects
+        self._checked_at = float("-inf")  # time.monotonic() of the last comparison
+
+    # -- building -------------------------------------------------------
+    def build(self):
+        posts = (
+            Post.objects.filter(is_published=True)
+            .only("id", "title", "slug", "is_featured", "published_at", "created_at")
+            .prefetch_related("categories")
+        )
+        entries = {p.pk: self._entry_for(p) for p in posts}
+        tokens = sorted((tok, pk) for pk, entry in entries.items() for tok in entry[4])
+        with self._lock:
+            self._entries = entries
+            self._tokens = tokens
+            self._built = True
+
+    def ensure_built(self):
+        now = time.monotonic()
+        if self._built and now - self._checked_at < GENERATION_CHECK_SECONDS:
+            return
+        # Read the generation first: a bump during build() leaves this copy
+        # stamped older than the data, so it is rebuilt again, never missed.
+        current = caching.generation("search")
+        self._checked_at = now
+        if self._built and self._generation == current:
+            return
+        with self._lock:
+            if not (self._built and self._generation == current):
+                self.build()
+                self._generation = current
+
+    def _after_commit(self, change=None):
+        """Bump the shared generation after the commit and apply ``change`` here.
+
+        If no other worker bumped since this copy was stamped, applying the
+        change keeps it current; otherwise it is rebuilt on the next lookup.
+        """
+        def apply():
+            current = caching.advance("search")
+            with self._lock:
+                if change is not None and self._built and self._generation == current - 1:
+                    change()
+                    self._generation = current
+                else:
+                    self._built = False
+
+        transaction.on_commit(apply)
+
+    def invalidate(self):
+        """Drop the index in every worker; each rebuilds on its next lookup."""
+        self._after_commit()
+
+    @staticmethod
+    def _entry_for(post):
+        stamp = post.published_at or post.created_at
+        score = stamp.timestamp() if stamp else 0.0
+        if post.is_featured:
+            score += FEATURED_BOOST_SECONDS
+        words = normalize(post.title)
+        for category in post.categories.all():
+            words.extend(normalize(category.name))
+        url = reverse("post_detail", args=[post.slug])
+        return (score, post.title, post.slug, url, frozenset(words))
+
+    # -- incremental updates ---------------------------------------------
+    def _remove(self, post_id):
+        entry = self._entries.pop(post_id, None)
+        if entry is None:
+            return
+        for tok in entry[4]:
+            i = bisect_left(self._tokens, (tok, post_id))
+            if i < len(self._tokens) and self._tokens[i] == (tok, post_id):
+                del self._tokens[i]
+
+    def _update(self, post):
+        self._remove(post.pk)
+        if post.is_published and post.slug:
+            entry = self._entry_for(post)
+            self._entries[post.pk] = entry
+            for tok in entry[4]:
+                insort(self._tokens, (tok, post.pk))
+
+    def update_post(self, post):
+        self._after_commit(lambda: self._update(post))
+
+    def remove_post(self, post_id):
+        self._after_commit(lambda: self._remove(post_id))
+
+    # -- lookups ----------------------------------------------------------
+    def _prefix_ids(self, prefix):
+        # Tokens are ASCII alphanumerics, so "\x7f" sorts after any extension.
+        lo = bisect_left(self._tokens, (prefix,))
+        hi = bisect_left(self._tokens, (prefix + "\x7f",), lo)
+        return {pk for _, pk in self._tokens[lo:hi]}
+
+    def suggest(self, query: str, limit: int = MAX_RESULTS) -> list:
+        """Return up to ``limit`` posts whose tokens prefix-match every query word."""
+        words = normalize(query)
+        if not words:
+            return []
+        self.ensure_built()
+        with self._lock:
+            # Match the longest (most selective) word first.
+            words.sort(key=len, reverse=True)
+            ids = self._prefix_ids(words[0])
+            for word in words[1:]:
+                if not ids:
+                    break
+                ids &= self._prefix_ids(word)
+            best = heapq.nlargest(limit, ids, key=lambda pk: self._entries[pk][0])
+            return [
+                dict(zip(("title", "slug", "url"), self._entries[pk][1:4]))
+                for pk in best
+            ]
+
+
+index = PrefixIndex()
@@ -0,0 +1,52 @@
+"""Periodic purge of expired sessions.
+
+Only the panel and the admin use sessions. Expired rows stay in
+``django_session`` until something deletes them, so after a request
+finishes each process runs the session backend's ``clear_expired()`` on a
+background thread, at most once every ``SESSION_PURGE_SECONDS``.
+``manage.py clearsessions`` does the same by hand.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-purge")
+_lock = threading.Lock()
+_last_purge = time.monotonic()
+
+
+def purge_expired() -> None:
+    engine = import_module(settings.SESSION_ENGINE)
+    engine.SessionStore.clear_expired()
+
+
+def _run():
+    close_old_connections()
+    try:
+        purge_expired()
+    except Exception:
+        logger.exception("Purging expired sessions failed")
+    finally:
+        connection.close()
+
+
+def schedule_purge(**kwargs) -> None:
+    """``request_finished`` receiver: purge in the background when one is due."""
+    global _last_purge
+    interval = getattr(settings, "SESSION_PURGE_SECONDS", 3600)
+    if not interval:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_purge < interval:
+            return
+        _last_purge = now
+    _executor.submit(_run)
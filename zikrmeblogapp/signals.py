@@ -0,0 +1,262 @@
+from functools import wraps
+
+from django.core.signals import request_finished
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    Category,
+    City,
+    CityMedia,
+    Destination,
+    HeroImage,
+    HomeMiniVideo,
+    PageHeroImage,
+    Post,
+    PostLink,
+)
+from .bulk_posts import in_bulk
+from .caching import bump as bump_cache_generation
+from .home_snapshot import schedule_rebuild as schedule_home_rebuild
+from .surrogate import queue_purge
+from .related import listing_posts, schedule_refresh as schedule_related_refresh
+from .search_index import index as search_index
+from .session_purge import schedule_purge as schedule_session_purge
+
+
+def unless_bulk(receiver_func):
+    """Make a post receiver a no-op during a panel bulk action.
+
+    The action invalidates once for the whole selection instead
+    (``bulk_posts.invalidate()``).
+    """
+    @wraps(receiver_func)
+    def wrapper(*args, **kwargs):
+        if not in_bulk():
+            return receiver_func(*args, **kwargs)
+    return wrapper
+
+
+# -------- Search autocomplete index ---------
+@receiver(post_save, sender=Post)
+@unless_bulk
+def index_post_on_save(sender, instance, **kwargs):
+    search_index.update_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+@unless_bulk
+def unindex_post_on_delete(sender, instance, **kwargs):
+    search_index.remove_post(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@unless_bulk
+def index_post_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # Posts were (un)linked from a category: reindex the affected posts.
+        if pk_set is None:
+            search_index.invalidate()
+            return
+        posts = Post.objects.filter(pk__in=pk_set).prefetch_related("categories")
+        for post in posts:
+            search_index.update_post(post)
+    else:
+        search_index.update_post(instance)
+
+
+@receiver(post_save, sender=Category)
+def index_category_posts_on_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    for post in instance.posts.prefetch_related("categories"):
+        search_index.update_post(post)
+
+
+@receiver(post_delete, sender=Category)
+def index_after_category_delete(sender, instance, **kwargs):
+    # The M2M rows are already gone, so the affected posts are unknown here.
+    search_index.invalidate()
+
+
+# -------- Related posts ---------
+@receiver(post_save, sender=Post)
+@unless_bulk
+def refresh_related_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_related_refresh(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+@unless_bulk
+def refresh_related_on_delete(sender, instance, **kwargs):
+    # The rows of the lists that hold this post are deleted with it.
+    schedule_related_refresh(instance.pk, listing_posts([instance.pk])[instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@unless_bulk
+def refresh_related_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    if not reverse:
+        schedule_related_refresh(instance.pk)
+    else:
+        for pk in pk_set or ():
+            schedule_related_refresh(pk)
+
+
+# -------- CDN purges ---------
+# Keys match the ones public views pass to surrogate.tag().
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@unless_bulk
+def purge_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_purge(f"post-{instance.pk}", "posts")
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@unless_bulk
+def purge_post_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    if reverse:
+        queue_purge(f"category-{instance.pk}", "posts", "categories")
+    else:
+        queue_purge(f"post-{instance.pk}", "posts", "categories")
+
+
+@receiver(post_save, sender=PostLink)
+@receiver(post_delete, sender=PostLink)
+@unless_bulk
+def purge_post_link(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_purge(f"post-{instance.post_id}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category(sender, instance, raw=False, **kwargs):
+    # Category names appear on every post card and in the footer.
+    if not raw:
+        queue_purge(f"category-{instance.pk}", "categories", "posts", "footer")
+
+
+@receiver(post_save, sender=Destination)
+@receiver(post_delete, sender=Destination)
+def purge_destination(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_purge(f"destination-{instance.pk}", "destinations")
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def purge_city(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_purge(f"destination-{instance.destination_id}")
+
+
+@receiver(post_save, sender=CityMedia)
+@receiver(post_delete, sender=CityMedia)
+def purge_city_media(sender, instance, raw=False, **kwargs):
+    # Destination pages are tagged with their cities, so no lookup is needed.
+    if not raw:
+        queue_purge(f"city-{instance.city_id}")
+
+
+@receiver(post_save, sender=HeroImage)
+@receiver(post_delete, sender=HeroImage)
+def purge_hero(sender, raw=False, **kwargs):
+    if not raw:
+        queue_purge("hero")
+
+
+@receiver(post_save, sender=PageHeroImage)
+@receiver(post_delete, sender=PageHeroImage)
+def purge_page_hero(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_purge(f"page-hero-{instance.page}")
+
+
+@receiver(post_save, sender=HomeMiniVideo)
+@receiver(post_delete, sender=HomeMiniVideo)
+def purge_home_video(sender, raw=False, **kwargs):
+    if not raw:
+        queue_purge("home-video")
+
+
+# -------- Cache generations ---------
+# Fragment and query caches key on these (see caching.generation()).
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=PostLink)
+@receiver(post_delete, sender=PostLink)
+@receiver(m2m_changed, sender=Post.categories.through)
+@unless_bulk
+def bump_posts_generation(sender, raw=False, **kwargs):
+    if not raw and kwargs.get("action", "post_").startswith("post_"):
+        bump_cache_generation("posts")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_categories_generation(sender, raw=False, **kwargs):
+    if not raw:
+        bump_cache_generation("categories")
+        bump_cache_generation("posts")  # cards show category names
+
+
+# The home snapshot (home_snapshot.get()) keys on "home" and is rebuilt
+# right after the change commits.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=PostLink)
+@receiver(post_delete, sender=PostLink)
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=HeroImage)
+@receiver(post_delete, sender=HeroImage)
+@receiver(post_save, sender=HomeMiniVideo)
+@receiver(post_delete, sender=HomeMiniVideo)
+@unless_bulk
+def refresh_home_snapshot(sender, raw=False, **kwargs):
+    if not raw and kwargs.get("action", "post_").startswith("post_"):
+        bump_cache_generation("home")
+        schedule_home_rebuild()
+
+
+# Dashboard counts (dashboard_stats.get()) key on "dashboard-stats".
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Destination)
+@receiver(post_delete, sender=Destination)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@unless_bulk
+def bump_dashboard_stats_generation(sender, raw=False, **kwargs):
+    if not raw:
+        bump_cache_generation("dashboard-stats")
+
+
+# Whole-page cache entries (PageCacheMiddleware) key on "pages", which any
+# model rendered on a public page bumps.
+@unless_bulk
+def bump_pages_generation(sender, raw=False, **kwargs):
+    if not raw and kwargs.get("action", "post_").startswith("post_"):
+        bump_cache_generation("pages")
+
+
+for _model in (Category, City, CityMedia, Destination, HeroImage, HomeMiniVideo, PageHeroImage, Post, PostLink):
+    post_save.connect(bump_pages_generation, sender=_model, dispatch_uid=f"pages_generation_save_{_model.__name__}")
+    post_delete.connect(bump_pages_generation, sender=_model, dispatch_uid=f"pages_generation_delete_{_model.__name__}")
+m2m_changed.connect(bump_pages_generation, sender=Post.categories.through, dispatch_uid="pages_generation_m2m")
+
+
+# -------- Expired sessions ---------
+request_finished.connect(schedule_session_purge, dispatch_uid="session_purge")
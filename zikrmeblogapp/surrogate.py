@@ -0,0 +1,169 @@
+"""Surrogate keys for CDN caching, and the purge queue that invalidates them.
+
+Public views call ``tag()`` with the objects they render. The keys are
+``<model>-<pk>`` for single rows, plus collection keys such as ``posts`` or
+``hero`` for pages whose membership changes when rows are added or removed.
+``SurrogateKeyMiddleware`` sends them in the ``SURROGATE_KEY_HEADER`` header
+with a shared-cache ``Cache-Control``.
+
+Model signals call ``queue_purge()``, which stores a ``PurgeEvent`` once the
+transaction commits (nothing is stored while ``SURROGATE_PURGER`` is the
+default ``NullPurger``). ``process_purges()`` hands the keys of pending
+events to the purger named by ``SURROGATE_PURGER`` (a class with a
+``purge(keys)`` method) and deletes them once purged; events that keep
+failing are kept for ``FAILED_RETENTION`` for inspection. The queue is
+drained on a background thread after each event
+(``SURROGATE_PURGE_BACKGROUND``) and by ``manage.py process_purges``.
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import PurgeEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+FAILED_RETENTION = timedelta(days=7)
+
+
+def key_for(instance) -> str:
+    return f"{instance._meta.model_name}-{instance.pk}"
+
+
+def tag(request, *items) -> None:
+    """Record surrogate keys for the response to ``request``.
+
+    Each item is a key string, a model instance, or an iterable of
+    instances (querysets are evaluated, filling their result cache).
+    """
+    keys = getattr(request, "surrogate_keys", None)
+    if keys is None:
+        keys = request.surrogate_keys = set()
+    for item in items:
+        if item is None:
+            continue
+        if isinstance(item, str):
+            keys.add(item)
+        elif isinstance(item, models.Model):
+            keys.add(key_for(item))
+        elif isinstance(item, Iterable):
+            keys.update(key_for(obj) for obj in item)
+
+
+# -------- Purgers ---------
+class NullPurger:
+    """Drops purges; the default when no CDN is configured."""
+
+    def purge(self, keys):
+        pass
+
+
+class FilePurger:
+    """Appends one JSON line per purge to ``SURROGATE_PURGE_LOG``."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.SURROGATE_PURGE_LOG
+
+    def purge(self, keys):
+        line = json.dumps({"at": timezone.now().isoformat(), "keys": sorted(keys)})
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+def get_purger():
+    return import_string(settings.SURROGATE_PURGER)()
+
+
+def purging_enabled() -> bool:
+    return import_string(settings.SURROGATE_PURGER) is not NullPurger
+
+
+# -------- Queue ---------
+def queue_purge(*keys) -> None:
+    """Store a purge event for ``keys`` after the current transaction commits."""
+    keys = " ".join(sorted(set(keys)))
+    if not keys or not purging_enabled():
+        return
+
+    def write():
+        PurgeEvent.objects.create(keys=keys)
+        schedule_process()
+
+    transaction.on_commit(write)
+
+
+def process_purges(batch_size: int = 100) -> int:
+    """Purge the keys of up to ``batch_size`` pending events in one purger call.
+
+    Returns how many events were purged (and deleted), 0 when the queue is
+    empty or the purger failed.
+    """
+    now = timezone.now()
+    pending = list(PurgeEvent.objects.filter(processed_at__isnull=True).order_by("created_at")[:batch_size])
+    # Claim each row so concurrent workers never purge the same event twice.
+    claimed = [
+        event for event in pending
+        if PurgeEvent.objects.filter(pk=event.pk, processed_at__isnull=True).update(processed_at=now)
+    ]
+    if not claimed:
+        return 0
+
+    keys = set()
+    for event in claimed:
+        keys.update(event.keys.split())
+    try:
+        get_purger().purge(keys)
+    except Exception as exc:
+        logger.warning("Purging %d surrogate keys failed: %s", len(keys), exc)
+        for event in claimed:
+            event.attempts += 1
+            event.last_error = str(exc)
+            # Leave it pending for the next run unless it keeps failing.
+            event.processed_at = now if event.attempts >= MAX_ATTEMPTS else None
+            event.updated_at = now  # bulk_update() skips auto_now
+        PurgeEvent.objects.bulk_update(claimed, ["attempts", "last_error", "processed_at", "updated_at"])
+        return 0
+    PurgeEvent.objects.filter(pk__in=[event.pk for event in claimed]).delete()
+    return len(claimed)
+
+
+def drain(batch_size: int = 100) -> int:
+    """Process batches until the queue is empty or the purger fails; returns events done."""
+    total = 0
+    while done := process_purges(batch_size):
+        total += done
+    PurgeEvent.objects.filter(processed_at__lt=timezone.now() - FAILED_RETENTION).delete()
+    return total
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="surrogate-purge")
+_scheduled = threading.Event()
+
+
+def _run():
+    _scheduled.clear()
+    close_old_connections()
+    try:
+        drain()
+    except Exception:
+        logger.exception("Processing surrogate key purges failed")
+    finally:
+        connection.close()
+
+
+def schedule_process() -> None:
+    if not getattr(settings, "SURROGATE_PURGE_BACKGROUND", True):
+        return
+    if not _scheduled.is_set():
+        _scheduled.set()
+        _executor.submit(_run)
@@ -0,0 +1,116 @@
+"""Synthetic content generator for benchmarks and query-budget tests.
+
+Rows are written with ``bulk_create`` (including the post/category M2M
+through table), so no model signals fire and large data sets load in
+seconds. Posts and their category links are generated and written
+``batch_size`` at a time, so memory stays flat however many are asked
+for. Generation is deterministic for a given ``seed``.
+"""
+
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, City, Destination, Post
+
+WORDS = (
+    "travel guide hidden gem beach mountain temple market street food local "
+    "culture history island lake river desert forest city village festival "
+    "museum sunset sunrise trek trail camp road trip budget luxury family "
+    "solo weekend itinerary tips stories photos season monsoon winter summer"
+).split()
+
+
+def _sentence(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+@transaction.atomic
+def seed(posts=1000, categories=20, destinations=50, cities_per_destination=3,
+         categories_per_post=2, batch_size=2000, seed=0):
+    """Append synthetic rows; returns a dict of how many of each were created.
+
+    Slugs are suffixed with the row number so repeated calls keep adding
+    rows after the existing ones.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    start = Category.objects.count()
+    Category.objects.bulk_create(
+        [
+            Category(
+                name=f"Category {start + i}",
+                slug=f"category-{start + i}",
+                show_in_footer=(start + i) < 5,
+            )
+            for i in range(categories)
+        ],
+        batch_size=batch_size,
+    )
+    category_ids = list(Category.objects.values_list("id", flat=True))
+
+    start = Post.objects.count()
+    per_post = min(categories_per_post, len(category_ids))
+    Through = Post.categories.through
+    for offset in range(0, posts, batch_size):
+        numbers = range(start + offset, start + min(offset + batch_size, posts))
+        Post.objects.bulk_create(
+            [
+                Post(
+                    title=f"{_sentence(rng, 5).title()} {n}",
+                    slug=f"synthetic-post-{n}",
+                    description=_sentence(rng, rng.randint(40, 400)),
+                    is_published=rng.random() < 0.9,
+                    is_featured=rng.random() < 0.15,
+                    is_article=rng.random() < 0.3,
+                    published_at=now - timedelta(minutes=n),
+                )
+                for n in numbers
+            ]
+        )
+        if per_post:
+            new_post_ids = Post.objects.order_by("-id").values_list("id", flat=True)[:len(numbers)]
+            Through.objects.bulk_create(
+                [
+                    Through(post_id=post_id, category_id=category_id)
+                    for post_id in new_post_ids
+                    for category_id in rng.sample(category_ids, per_post)
+                ]
+            )
+
+    start = Destination.objects.count()
+    Destination.objects.bulk_create(
+        [
+            Destination(
+                title=f"Destination {start + i}",
+                slug=f"destination-{start + i}",
+                description=_sentence(rng, 60),
+            )
+            for i in range(destinations)
+        ],
+        batch_size=batch_size,
+    )
+    new_destination_ids = Destination.objects.order_by("-id").values_list("id", flat=True)[:destinations]
+    City.objects.bulk_create(
+        [
+            City(
+                destination_id=destination_id,
+                name=f"City {n}",
+                slug=f"city-{n}",
+                description=_sentence(rng, 30),
+            )
+            for destination_id in new_destination_ids
+            for n in range(cities_per_destination)
+        ],
+        batch_size=batch_size,
+    )
+
+    return {
+        "categories": categories,
+        "posts": posts,
+        "destinations": destinations,
+        "cities": destinations * cities_per_destination,
+    }
@@ -0,0 +1,44 @@
+"""Template backends that report render time to ``RequestTimingMiddleware``.
+
+These are the stock Django and Jinja2 backends, except that the templates
+they return time their outermost ``render()`` while a timed request is
+being served. Both engines are measured and nothing is patched.
+"""
+
+from django.template.backends.django import DjangoTemplates as BaseDjangoTemplates
+
+from .middleware import timed_render
+
+
+class TimedTemplate:
+    """Wraps a backend template; everything except ``render()`` passes through."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        return timed_render(self.template.render, context, request)
+
+
+class TimedTemplatesMixin:
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class DjangoTemplates(TimedTemplatesMixin, BaseDjangoTemplates):
+    pass
+
+
+try:
+    from django.template.backends.jinja2 import Jinja2 as BaseJinja2
+except ImportError:  # optional: only needed with JINJA2_TEMPLATES
+    pass
+else:
+    class Jinja2(TimedTemplatesMixin, BaseJinja2):
+        pass
@@ -1,3 +1,1805 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core import mail
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.template.loader import get_template
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+try:
+    import jinja2
+except ImportError:  # optional: only needed with JINJA2_TEMPLATES
+    jinja2 = None
+
+from . import async_views, bulk_posts, caching, compression, dashboard_stats, home_snapshot, outbox, panel_views, related, reorder, session_purge, surrogate, view_counts, views
+from zikrmeblog.settings import cache_from_url, session_engine
+
+from .admin_site import custom_admin_site
+from .forms import PostForm
+from .db_routers import STICKY_COOKIE, PrimaryReplicaRouter
+from .management.commands.benchmark_views import public_urls
+from .middleware import CompressionMiddleware, ReplicaRoutingMiddleware
+from .minify import minify_html
+from .search_index import GENERATION_CHECK_SECONDS, PrefixIndex, index as search_index
+from .models import (
+    Category,
+    City,
+    CityMedia,
+    Destination,
+    HeroImage,
+    HomeMiniVideo,
+    OutgoingEmail,
+    PageHeroImage,
+    Post,
+    PostLink,
+    PurgeEvent,
+    RelatedPost,
+)
+from .synthetic import seed
+
+# Maximum queries per public page. The counts must not depend on how many
+# posts exist, so a template or view change that adds an N+1 fails here.
+QUERY_BUDGETS = {
+    "home": 1,  # served from the home snapshot
+    "home_search": 13,
+    "posts_list": 5,
+    "posts_list_page_2": 5,
+    "posts_search": 5,
+    "featured_list": 5,
+    "articles_list": 5,
+    "posts_more": 3,
+    "search_suggest": 0,
+    "categories": 3,
+    "destination": 3,
+    "about": 2,
+    "contact": 2,
+    "posts_by_category": 6,
+    "post_detail": 6,
+    "destination_detail": 4,
+}
+
+# The manifest storage needs collectstatic; tests render with plain storage.
+PLAIN_STATIC_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+class TemplateCompilationTests(SimpleTestCase):
+    def test_every_template_compiles(self):
+        out = StringIO()
+        call_command("compile_templates", stdout=out)
+        self.assertIn("Compiled", out.getvalue())
+
+
+class SeedSyntheticTests(TestCase):
+    def test_command_creates_rows_and_m2m_links(self):
+        call_command(
+            "seed_synthetic", posts=50, categories=5, destinations=4, cities=2, stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(Category.objects.count(), 5)
+        self.assertEqual(Destination.objects.count(), 4)
+        self.assertEqual(City.objects.count(), 8)
+        self.assertEqual(Post.categories.through.objects.count(), 100)
+
+    def test_repeated_seeding_appends(self):
+        seed(posts=10, categories=2, destinations=1)
+        seed(posts=10, categories=2, destinations=1)
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(Category.objects.count(), 4)
+
+    def test_posts_are_written_in_batches(self):
+        with mock.patch.object(Post.objects, "bulk_create", wraps=Post.objects.bulk_create) as bulk_create:
+            seed(posts=25, categories=3, destinations=1, batch_size=10)
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [10, 10, 5])
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertEqual(Post.objects.filter(categories=None).count(), 0)
+        self.assertEqual(Post.categories.through.objects.count(), 50)
+
+# Keeps cache reads out of the database for tests that count queries or
+# share one cache between simulated workers.
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"},
+    "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-entries"},
+}
+
+
+# Buffered view counts are flushed explicitly so a timed flush cannot land
+# inside a measured request. Budgets include the configured cache's own
+# queries (the database cache by default).
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+)
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["local"].clear()
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def measure(self):
+        counts = {}
+        for name, url in public_urls().items():
+            self.client.get(url)  # build lazy per-process state first
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, name)
+            counts[name] = len(queries.captured_queries)
+        return counts
+
+    def test_public_pages_stay_within_budget(self):
+        seed(posts=60, categories=6, destinations=3)
+        for name, count in self.measure().items():
+            with self.subTest(page=name):
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
+
+    def test_query_counts_do_not_grow_with_data(self):
+        seed(posts=30, categories=4, destinations=2)
+        small = self.measure()
+        seed(posts=90, categories=4, destinations=2, seed=1)
+        self.assertEqual(self.measure(), small)
+
+
+@override_settings(CACHES=LOCAL_CACHES, RELATED_POSTS_BACKGROUND=False, SURROGATE_PURGE_BACKGROUND=False, HOME_SNAPSHOT_BACKGROUND=False)
+class SearchIndexTests(TestCase):
+    """Each worker's copy of the index follows saves made in any worker."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Mountains", slug="mountains")
+        cls.post = Post.objects.create(title="Hidden Waterfall Trail", slug="hidden-waterfall", is_published=True)
+        cls.post.categories.add(cls.category)
+        Post.objects.create(title="Harbour Walk", slug="harbour-walk", is_published=True)
+        Post.objects.create(title="Hidden Draft", slug="hidden-draft", is_published=False)
+
+    def setUp(self):
+        cache.clear()  # a fresh "search" generation makes the shared index rebuild
+        search_index._checked_at = float("-inf")
+        self.other_worker = PrefixIndex()
+
+    def slugs(self, query, index=search_index):
+        return [r["slug"] for r in index.suggest(query)]
+
+    def later(self, index):
+        """Let ``index``'s next lookup compare generations again."""
+        index._checked_at -= GENERATION_CHECK_SECONDS
+
+    def save(self, obj):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save()
+
+    def test_suggest_matches_every_word_prefix(self):
+        self.assertEqual(self.slugs("hid"), ["hidden-waterfall"])
+        self.assertEqual(self.slugs("mount hidd"), ["hidden-waterfall"])
+        self.assertEqual(self.slugs("waterfall harbour"), [])
+        self.assertEqual(self.slugs("  "), [])
+        response = self.client.get(reverse("search_suggest"), {"q": "harb"})
+        self.assertEqual(response.json()["results"][0]["url"], reverse("post_detail", args=["harbour-walk"]))
+
+    def test_publish_and_unpublish_reach_every_worker(self):
+        self.assertEqual(self.slugs("hidden", self.other_worker), ["hidden-waterfall"])
+        draft = Post.objects.get(slug="hidden-draft")
+        draft.is_published = True
+        self.save(draft)
+        self.post.is_published = False
+        self.save(self.post)
+        self.assertEqual(self.slugs("hidden"), ["hidden-draft"])
+        self.later(self.other_worker)
+        self.assertEqual(self.slugs("hidden", self.other_worker), ["hidden-draft"])
+
+    def test_rename_and_delete_reach_every_worker(self):
+        self.slugs("hidden", self.other_worker)
+        self.post.title = "Secret Cascade"
+        self.save(self.post)
+        self.later(self.other_worker)
+        self.assertEqual(self.slugs("cascade", self.other_worker), ["hidden-waterfall"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(self.slugs("cascade"), [])
+        self.later(self.other_worker)
+        self.assertEqual(self.slugs("cascade", self.other_worker), [])
+
+    def test_lookups_check_the_shared_generation_only_now_and_then(self):
+        self.slugs("hidden", self.other_worker)
+        self.post.title = "Secret Cascade"
+        self.save(self.post)
+        with mock.patch.object(caching, "generation", wraps=caching.generation) as generation:
+            self.assertEqual(self.slugs("cascade", self.other_worker), [])  # stale until the next check
+            generation.assert_not_called()
+            self.later(self.other_worker)
+            self.assertEqual(self.slugs("cascade", self.other_worker), ["hidden-waterfall"])
+        generation.assert_called_once_with("search")
+
+    def test_saving_worker_updates_in_place(self):
+        self.slugs("hidden")
+        self.post.title = "Hidden Falls"
+        with mock.patch.object(search_index, "build") as build:
+            self.save(self.post)
+            self.assertEqual(self.slugs("falls"), ["hidden-waterfall"])
+        build.assert_not_called()
+
+    def test_changes_wait_for_the_commit(self):
+        self.slugs("hidden")
+        with self.captureOnCommitCallbacks(execute=False):
+            self.post.title = "Never Saved"
+            self.post.save()
+        self.assertEqual(self.slugs("never"), [])
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    RELATED_POSTS_BACKGROUND=False,
+    SURROGATE_PURGE_BACKGROUND=False,
+    HOME_SNAPSHOT_BACKGROUND=False,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+)
+class RelatedPostsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        beach = Category.objects.create(name="Beaches", slug="beaches")
+        hills = Category.objects.create(name="Hills", slug="hills")
+        for i, place in enumerate(["Sandy", "Golden", "Coral", "Palm", "Shell", "Lagoon", "Dune", "Surf", "Pearl", "Reef"]):
+            post = Post.objects.create(
+                title=f"{place} beach escape",
+                slug=f"beach-{i}",
+                description=f"Swimming and sunsets on the {place.lower()} coast.",
+                is_published=True,
+            )
+            post.categories.add(beach)
+        for i in range(3):
+            post = Post.objects.create(title=f"Hill walk {i}", slug=f"hill-{i}", description="Ridges and trails.", is_published=True)
+            post.categories.add(hills)
+
+    def setUp(self):
+        cache.clear()
+        related._corpus = None
+        related.rebuild_all()
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def lists(self):
+        result = defaultdict(list)
+        for post_id, related_id in RelatedPost.objects.values_list("post_id", "related_id"):
+            result[post_id].append(related_id)
+        return dict(result)
+
+    def held_beach_posts(self):
+        """Beach posts that appear in at least one list."""
+        return list(Post.objects.filter(slug__startswith="beach-", pk__in=RelatedPost.objects.values("related_id")))
+
+    def holders(self, pk):
+        return set(RelatedPost.objects.filter(related_id=pk).values_list("post_id", flat=True))
+
+    def test_detail_page_shows_related_posts(self):
+        response = self.client.get(reverse("post_detail", args=["beach-0"]))
+        shown = {p.slug for p in response.context["related_posts"]}
+        self.assertEqual(len(shown), related.RELATED_LIMIT)
+        self.assertTrue(all(slug.startswith("beach-") for slug in shown))
+
+    def test_unpublished_post_leaves_lists_and_they_are_backfilled(self):
+        post = self.held_beach_posts()[0]
+        holders = self.holders(post.pk)
+        self.assertTrue(holders)
+        post.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertFalse(self.holders(post.pk))
+        for pk in holders:
+            self.assertEqual(RelatedPost.objects.filter(post_id=pk).count(), related.RELATED_LIMIT)
+
+    def test_deleted_post_lists_are_backfilled(self):
+        post = self.held_beach_posts()[1]
+        holders = self.holders(post.pk)
+        self.assertTrue(holders)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        for pk in holders:
+            self.assertEqual(RelatedPost.objects.filter(post_id=pk).count(), related.RELATED_LIMIT)
+
+    def test_bulk_delete_backfills_too(self):
+        pks = [post.pk for post in self.held_beach_posts()[:2]]
+        holders = self.holders(pks[0]) | self.holders(pks[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_posts.apply("delete", pks)
+        for pk in holders - set(pks):
+            self.assertEqual(RelatedPost.objects.filter(post_id=pk).count(), related.RELATED_LIMIT)
+
+    def test_new_post_enters_its_neighbours_lists(self):
+        post = Post.objects.create(
+            title="Coral beach escape", slug="coral-again", description="Swimming on the coral coast.", is_published=True
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            post.categories.add(Category.objects.get(slug="beaches"))
+        self.assertIn(post.pk, self.lists()[Post.objects.get(slug="beach-2").pk])
+        self.assertEqual(len(self.lists()[post.pk]), related.RELATED_LIMIT)
+
+    def test_refresh_reuses_the_corpus_and_skips_unchanged_lists(self):
+        post = Post.objects.get(slug="hill-0")
+        related.refresh_post(post.pk)  # loads this worker's corpus
+        with mock.patch.object(related.Corpus, "load") as load:
+            with CaptureQueriesContext(connection) as queries:
+                related.refresh_post(post.pk)
+        load.assert_not_called()
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith(("DELETE", "INSERT"))])
+
+    def test_refresh_in_another_worker_reloads_the_corpus(self):
+        post = Post.objects.get(slug="hill-0")
+        related.refresh_post(post.pk)
+        caching.advance("related")  # another worker refreshed a post
+        with mock.patch.object(related.Corpus, "load", wraps=related.Corpus.load) as load:
+            related.refresh_post(post.pk)
+        load.assert_called_once()
+
+    def test_incremental_update_matches_a_fresh_corpus(self):
+        post = Post.objects.get(slug="hill-1")
+        corpus = related.Corpus.load()
+        post.title = "Coral beach hill walk"
+        post.save()
+        corpus.update(post.pk, Post.objects.prefetch_related("categories").get(pk=post.pk))
+        fresh = related.Corpus.load()
+        self.assertEqual(
+            [pk for pk, _ in related._top(corpus.scores(post.pk))],
+            [pk for pk, _ in related._top(fresh.scores(post.pk))],
+        )
+        corpus.update(post.pk, None)
+        self.assertEqual(corpus.scores(post.pk), {})
+        self.assertNotIn(post.pk, corpus.scores(Post.objects.get(slug="hill-2").pk))
+
+    @skipUnless(related.np, "NumPy is not installed")
+    def test_numpy_and_python_scores_agree(self):
+        corpus = related.Corpus.load()
+
+        def assert_agree():
+            for pk, i in corpus.position.items():
+                fast, slow = corpus._scores_numpy(i), corpus._scores_python(i)
+                self.assertEqual(fast.keys(), slow.keys())
+                for other in slow:
+                    self.assertAlmostEqual(fast[other], slow[other])
+
+        assert_agree()
+        post = Post.objects.get(slug="hill-1")  # drops the cached arrays
+        post.title = "Coral beach hill walk"
+        post.save()
+        corpus.update(post.pk, Post.objects.prefetch_related("categories").get(pk=post.pk))
+        corpus.update(Post.objects.get(slug="beach-0").pk, None)
+        assert_agree()
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    VIEW_COUNT_FLUSH_EVERY=3,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+    VIEW_COUNT_FLUSH_BACKGROUND=False,
+)
+class ViewCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Post.objects.create(title="Counted", slug="counted", is_published=True)
+        cls.destination = Destination.objects.create(title="Somewhere", slug="somewhere")
+
+    def setUp(self):
+        view_counts.flush()
+
+    def counts(self):
+        return (
+            Post.objects.get(pk=self.post.pk).view_count,
+            Destination.objects.get(pk=self.destination.pk).view_count,
+        )
+
+    def test_hits_are_written_in_one_batch(self):
+        view_counts.record(self.post)
+        view_counts.record(self.destination)
+        self.assertEqual(self.counts(), (0, 0))
+        with CaptureQueriesContext(connection) as queries:
+            view_counts.record(self.post)  # the third hit flushes
+        self.assertEqual(len([q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]), 2)
+        self.assertEqual(self.counts(), (2, 1))
+
+    def test_flushes_add_to_the_stored_count(self):
+        Post.objects.filter(pk=self.post.pk).update(view_count=10)  # another worker's flush
+        view_counts.record(self.post)
+        self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(self.counts(), (11, 0))
+
+    def test_failed_flush_keeps_the_hits(self):
+        view_counts.record(self.post)
+        with mock.patch.object(Post.objects, "bulk_update", side_effect=RuntimeError("locked")):
+            with self.assertLogs("zikrmeblogapp.view_counts", "ERROR"):
+                self.assertEqual(view_counts.flush(), 0)
+        self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(self.counts(), (1, 0))
+
+    @override_settings(VIEW_COUNT_FLUSH_BACKGROUND=True)
+    def test_due_flush_runs_off_the_request_thread(self):
+        with mock.patch.object(view_counts._executor, "submit") as submit:
+            for _ in range(4):
+                view_counts.record(self.post)
+        submit.assert_called_once_with(view_counts._run)
+        view_counts._scheduled.clear()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_editing_keeps_hits_flushed_since_the_form_loaded(self):
+        post = Post.objects.get(pk=self.post.pk)
+        form = PostForm({"title": "Renamed", "description": "Still counted.", "is_published": True}, instance=post)
+        Post.objects.filter(pk=self.post.pk).update(view_count=7)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.title, post.view_count), ("Renamed", 7))
+
+    def test_plain_saves_keep_default_semantics(self):
+        post = Post.objects.get(pk=self.post.pk)
+        Post.objects.filter(pk=post.pk).delete()
+        post.save()  # an instance whose row is gone is inserted again
+        self.assertTrue(Post.objects.filter(pk=post.pk).exists())
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, CACHES=LOCAL_CACHES)
+class PostsMoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=40, categories=3, destinations=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_through_the_whole_listing(self):
+        url = reverse("posts_more")
+        expected = list(views._listing_posts("blogs")[0].values_list("slug", flat=True))
+        slugs, cursor, batches = [], 0, 0
+        while cursor is not None:
+            response = self.client.get(url, {"list": "blogs", "cursor": cursor})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            slugs += re.findall(r'href="/blog/([^/"]+)/"', data["html"])
+            cursor = data["cursor"]
+            batches += 1
+        self.assertEqual(slugs, expected)
+        self.assertEqual(batches, -(-len(expected) // views.POSTS_PER_PAGE))
+
+    def test_last_batch_has_no_cursor(self):
+        total = views._listing_posts("blogs")[0].count()
+        data = self.client.get(reverse("posts_more"), {"cursor": total - 1}).json()
+        self.assertIsNone(data["cursor"])
+        data = self.client.get(reverse("posts_more"), {"cursor": total}).json()
+        self.assertEqual((data["html"].strip(), data["cursor"]), ("", None))
+
+    def test_bad_requests(self):
+        url = reverse("posts_more")
+        self.assertEqual(self.client.get(url, {"cursor": "ten"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"list": "drafts"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"list": "category", "slug": "missing"}).status_code, 404)
+
+    def test_fragment_skips_context_processors(self):
+        response = self.client.get(reverse("posts_more"))
+        self.assertNotIn("footer", response["Surrogate-Key"].split())
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, VIEW_COUNT_FLUSH_EVERY=10**6, VIEW_COUNT_FLUSH_SECONDS=10**6)
+class SessionUsageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=20, categories=3, destinations=1)
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def session_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return [q["sql"] for q in queries.captured_queries if "django_session" in q["sql"]]
+
+    def test_anonymous_public_gets_do_not_touch_sessions(self):
+        for name, url in public_urls().items():
+            with self.subTest(page=name):
+                self.assertEqual(self.session_queries(url), [])
+                self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_logged_in_visitor_on_public_pages_does_not_read_sessions(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+        for name, url in public_urls().items():
+            with self.subTest(page=name):
+                self.assertEqual(self.session_queries(url), [])
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_panel_reads_session_from_cache(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+        self.assertEqual(self.session_queries(reverse("panel_dashboard")), [])
+
+    def test_purge_deletes_only_expired_sessions(self):
+        now = timezone.now()
+        Session.objects.create(session_key="expired", session_data="", expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key="current", session_data="", expire_date=now + timedelta(days=1))
+        session_purge.purge_expired()
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["current"])
+
+
+def normalize_html(html):
+    """Drop whitespace differences and equivalent entity spellings."""
+    html = html.replace("&#39;", "&#x27;").replace("&#34;", "&quot;")
+    html = re.sub(r">\s+<", "><", html)
+    return re.sub(r"\s+", " ", html).strip()
+
+
+@skipUnless(jinja2, "Jinja2 is not installed")
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, VIEW_COUNT_FLUSH_EVERY=10**6, VIEW_COUNT_FLUSH_SECONDS=10**6)
+class Jinja2ParityTests(TestCase):
+    """The jinja2/ templates must render the same HTML as templates/."""
+
+    PAGES = (
+        "home", "posts_list", "posts_list_page_2", "posts_search", "featured_list",
+        "articles_list", "posts_more", "posts_by_category", "post_detail",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=40, categories=4, destinations=1)
+        post = Post.objects.filter(is_published=True).order_by("id").first()
+        post.title = 'Tom\'s "best" <beach> & bay'
+        post.youtube_url = "https://youtu.be/abcdefghijk"
+        post.external_link = "https://www.example.com/a-rather-long-path/"
+        post.description = "First paragraph.\n\nSecond & last."
+        post.save()
+        PostLink.objects.create(post=post, label="Map", url="https://maps.example.com/")
+        HeroImage.objects.create(image="hero/1.jpg", caption="Sunrise")
+        HomeMiniVideo.objects.create(youtube_url="https://www.youtube.com/shorts/abcdefghijk", muted=False)
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def render(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        if response["Content-Type"].startswith("application/json"):
+            return response.json()["html"]
+        return response.content.decode()
+
+    def test_public_pages_match_django_templates(self):
+        urls = public_urls()
+        jinja_templates = [settings.JINJA2_TEMPLATE_ENGINE, *settings.TEMPLATES]
+        for name in self.PAGES:
+            with self.subTest(page=name):
+                django_html = self.render(urls[name])
+                with override_settings(TEMPLATES=jinja_templates):
+                    self.assertEqual(get_template("home.html").backend.name, "jinja2")
+                    jinja_html = self.render(urls[name])
+                self.assertEqual(normalize_html(jinja_html), normalize_html(django_html))
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+)
+class AsyncViewTests(TestCase):
+    """The async variants render what the sync views do, on the same connection."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=40, categories=3, destinations=1)
+        HeroImage.objects.create(image="hero/1.jpg", caption="Sunrise")
+        cls.category = Category.objects.order_by("id").first()
+
+    def setUp(self):
+        cache.clear()
+
+    def cases(self):
+        slug = self.category.slug
+        return [
+            ("/", {}, (), views.home, async_views.home),
+            ("/", {"q": "the"}, (), views.home, async_views.home),
+            ("/", {"category": slug}, (), views.home, async_views.home),
+            ("/blogs/", {"page": 2}, (), views.posts_list, async_views.posts_list),
+            ("/blogs/", {"q": "the"}, (), views.posts_list, async_views.posts_list),
+            ("/featured/", {}, (), views.featured_list, async_views.featured_list),
+            ("/articles/", {"page": 99}, (), views.articles_list, async_views.articles_list),
+            (f"/category/{slug}/", {}, (slug,), views.posts_by_category, async_views.posts_by_category),
+        ]
+
+    def call(self, view, path, params, args):
+        request = RequestFactory().get(path, params)
+        request.user = AnonymousUser()
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return view(request, *args)
+
+    def test_async_views_match_the_sync_views(self):
+        for path, params, args, sync_view, async_view in self.cases():
+            with self.subTest(path=path, params=params):
+                expected = self.call(sync_view, path, params, args).content.decode()
+                html = self.call(async_view, path, params, args).content.decode()
+                self.assertEqual(normalize_html(html), normalize_html(expected))
+
+    def test_queries_reuse_the_request_connection(self):
+        opened = []
+
+        def record(sender, connection, **kwargs):
+            opened.append(connection)
+
+        connection_created.connect(record)
+        try:
+            for path, params, args, sync_view, async_view in self.cases():
+                self.call(async_view, path, params, args)
+                with CaptureQueriesContext(connection) as sync_queries:
+                    self.call(sync_view, path, params, args)
+                with CaptureQueriesContext(connection) as async_queries:
+                    self.call(async_view, path, params, args)
+                self.assertEqual(len(async_queries), len(sync_queries), path)
+        finally:
+            connection_created.disconnect(record)
+        self.assertEqual(opened, [])
+
+    def test_unknown_category_is_404(self):
+        with self.assertRaises(Http404):
+            self.call(async_views.posts_by_category, "/category/missing/", {}, ("missing",))
+        with self.assertRaises(Http404):
+            self.call(async_views.home, "/", {"category": "missing"}, ())
+
+
+# A TransactionTestCase: the concurrent path runs each query on another
+# thread's connection, which cannot see rows inside a test transaction.
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+    ASYNC_VIEWS_CONCURRENT=True,
+)
+class ConcurrentAsyncViewTests(TransactionTestCase):
+    cases = AsyncViewTests.cases
+    call = AsyncViewTests.call
+
+    def setUp(self):
+        cache.clear()
+        seed(posts=40, categories=3, destinations=1)
+        HeroImage.objects.create(image="hero/1.jpg", caption="Sunrise")
+        self.category = Category.objects.order_by("id").first()
+
+    def test_concurrent_views_match_the_sync_views(self):
+        for path, params, args, sync_view, async_view in self.cases():
+            with self.subTest(path=path, params=params):
+                expected = self.call(sync_view, path, params, args).content.decode()
+                html = self.call(async_view, path, params, args).content.decode()
+                self.assertEqual(normalize_html(html), normalize_html(expected))
+
+    def test_independent_queries_overlap(self):
+        running, overlapped, lock = [0], threading.Event(), threading.Lock()
+        own_connection = async_views._own_connection
+
+        def tracked(func):
+            def run(*args, **kwargs):
+                with lock:
+                    running[0] += 1
+                    if running[0] > 1:
+                        overlapped.set()
+                overlapped.wait(0.5)  # a serial path would wait here in vain
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with lock:
+                        running[0] -= 1
+            return own_connection(run)
+
+        for path, params, args, view in (
+            ("/blogs/", {"page": 2}, (), async_views.posts_list),
+            ("/", {"q": "the"}, (), async_views.home),
+        ):
+            with self.subTest(path=path):
+                overlapped.clear()
+                with mock.patch.object(async_views, "_own_connection", tracked):
+                    self.call(view, path, params, args)
+                self.assertTrue(overlapped.is_set())
+
+
+class BrokenMailConnection:
+    """A mail backend whose server refuses connections, or every message."""
+
+    def __init__(self, refuse_connection=True):
+        self.refuse_connection = refuse_connection
+
+    def open(self):
+        if self.refuse_connection:
+            raise ConnectionRefusedError("SMTP server unreachable")
+
+    def send_messages(self, messages):
+        raise ValueError("Recipient rejected")
+
+    def close(self):
+        pass
+
+
+@override_settings(EMAIL_OUTBOX_BACKGROUND=False)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.message = outbox.enqueue("Hello", "Body", "visitor@example.com", ["owner@example.com"], reply_to="visitor@example.com")
+
+    def reload(self):
+        self.message.refresh_from_db()
+        return self.message
+
+    def make_due(self):
+        OutgoingEmail.objects.filter(pk=self.message.pk).update(next_attempt_at=timezone.now())
+
+    def send_with(self, mail_connection):
+        with mock.patch.object(outbox, "get_connection", return_value=mail_connection):
+            with self.assertLogs("zikrmeblogapp.outbox", "WARNING"):
+                return outbox.send_pending()
+
+    def test_sends_queued_mail(self):
+        self.assertEqual(outbox.send_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].extra_headers["Reply-To"], "visitor@example.com")
+        self.assertEqual((self.reload().status, self.message.attempts), (OutgoingEmail.STATUS_SENT, 1))
+        self.assertEqual(outbox.send_pending(), 0)
+
+    def test_connection_failures_count_as_attempts_with_backoff(self):
+        for attempt in range(1, outbox.MAX_ATTEMPTS):
+            self.make_due()
+            before = timezone.now()
+            self.assertEqual(self.send_with(BrokenMailConnection()), 0)
+            message = self.reload()
+            self.assertEqual((message.status, message.attempts), (OutgoingEmail.STATUS_PENDING, attempt))
+            self.assertIn("unreachable", message.last_error)
+            delay = (message.next_attempt_at - before).total_seconds()
+            self.assertAlmostEqual(delay, outbox.retry_delay(attempt), delta=5)
+        self.assertEqual(outbox.retry_delay(2), 2 * outbox.retry_delay(1))
+
+    def test_gives_up_after_max_attempts(self):
+        for _ in range(outbox.MAX_ATTEMPTS):
+            self.make_due()
+            self.send_with(BrokenMailConnection(refuse_connection=False))
+        self.assertEqual(self.reload().status, OutgoingEmail.STATUS_FAILED)
+        self.make_due()
+        self.assertEqual(outbox.send_pending(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failed_message_waits_for_its_retry(self):
+        self.send_with(BrokenMailConnection(refuse_connection=False))
+        self.assertEqual(outbox.send_pending(), 0)  # not due yet
+        self.assertAlmostEqual(outbox.next_due_in(), outbox.retry_delay(1), delta=5)
+
+    def test_claimed_messages_are_skipped_by_other_workers(self):
+        now = timezone.now()
+        self.assertTrue(outbox._claim(self.message, now))
+        self.assertFalse(outbox._claim(self.message, now))
+        self.assertEqual(outbox.send_pending(), 0)
+        self.assertAlmostEqual(outbox.next_due_in(), outbox.CLAIM_SECONDS, delta=5)
+
+    @override_settings(EMAIL_OUTBOX_BACKGROUND=True)
+    def test_background_run_sets_a_timer_for_the_next_retry(self):
+        OutgoingEmail.objects.filter(pk=self.message.pk).update(next_attempt_at=timezone.now() + timedelta(seconds=90))
+        with mock.patch.object(outbox, "close_old_connections"), mock.patch.object(outbox, "connection"):
+            with mock.patch.object(outbox.threading, "Timer") as timer:
+                outbox._run()
+        delay, callback = timer.call_args.args
+        self.assertAlmostEqual(delay, 90, delta=5)
+        self.assertIs(callback, outbox.drain)
+        timer.return_value.start.assert_called_once()
+        outbox._timer = None
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+    SURROGATE_PURGE_BACKGROUND=False,
+    RELATED_POSTS_BACKGROUND=False,
+    HOME_SNAPSHOT_BACKGROUND=False,
+)
+class HomeSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=30, categories=3, destinations=1)
+        HeroImage.objects.create(image="hero/1.jpg", caption="Sunrise")
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def test_snapshot_renders_like_the_live_queries(self):
+        snapshot_html = self.client.get(reverse("home")).content.decode()
+        with override_settings(HOME_SNAPSHOT_SECONDS=0):
+            live_html = self.client.get(reverse("home")).content.decode()
+        self.assertEqual(normalize_html(snapshot_html), normalize_html(live_html))
+
+    def test_unfiltered_home_is_one_cache_read(self):
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("home"))
+
+    def test_save_rebuilds_the_snapshot(self):
+        self.client.get(reverse("home"))
+        post = Post.objects.filter(is_published=True).order_by("-published_at", "-created_at").first()
+        post.title = "Freshly renamed post"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        with self.assertNumQueries(0):  # rebuilt on commit, before any visitor
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "Freshly renamed post")
+
+    def test_filtered_requests_use_live_queries(self):
+        category = Category.objects.order_by("id").first()
+        with mock.patch.object(home_snapshot, "get") as get:
+            self.client.get(reverse("home"), {"q": "beach"})
+            self.client.get(reverse("home"), {"category": category.slug})
+        get.assert_not_called()
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    SURROGATE_PURGE_BACKGROUND=False,
+    RELATED_POSTS_BACKGROUND=False,
+    HOME_SNAPSHOT_BACKGROUND=False,
+)
+class DashboardStatsTests(TestCase):
+    EXPECTED_KEYS = {"posts", "published", "featured", "articles", "categories", "destinations", "cities"}
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=25, categories=3, destinations=2)
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_match_the_models(self):
+        posts = Post.objects.all()
+        self.assertEqual(dashboard_stats.compute(), {
+            "posts": posts.count(),
+            "published": posts.filter(is_published=True).count(),
+            "featured": posts.filter(is_featured=True).count(),
+            "articles": posts.filter(is_article=True).count(),
+            "categories": Category.objects.count(),
+            "destinations": Destination.objects.count(),
+            "cities": City.objects.count(),
+        })
+
+    def test_post_counts_are_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            dashboard_stats.compute()
+        post_queries = [q["sql"] for q in queries.captured_queries if "zikrmeblogapp_post" in q["sql"]]
+        self.assertEqual(len(post_queries), 1)
+
+    def test_cached_until_a_counted_model_changes(self):
+        first = dashboard_stats.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard_stats.get(), first)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Brand new", slug="brand-new")
+        self.assertEqual(dashboard_stats.get()["categories"], first["categories"] + 1)
+
+    def test_panel_and_admin_read_the_shared_stats(self):
+        self.client.force_login(self.user)
+        stats = dashboard_stats.get()
+        response = self.client.get(reverse("panel_dashboard"))
+        self.assertEqual({key: response.context[key] for key in self.EXPECTED_KEYS}, stats)
+
+        request = RequestFactory().get("/panel-admin/")
+        request.user = self.user
+        with mock.patch.object(dashboard_stats, "compute") as compute:
+            response = custom_admin_site.index(request)
+        compute.assert_not_called()
+        self.assertEqual({key: response.context_data[key] for key in self.EXPECTED_KEYS}, stats)
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, CACHES=LOCAL_CACHES)
+class PanelListTests(TestCase):
+    LISTS = (
+        "panel_post_list", "panel_category_list", "panel_destination_list",
+        "panel_hero_list", "panel_page_hero_list", "panel_home_mini_video_list",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=60, categories=4, destinations=2)
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def query_counts(self):
+        counts = {}
+        for name in self.LISTS:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+            counts[name] = len(queries.captured_queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_data(self):
+        small = self.query_counts()
+        seed(posts=120, categories=4, destinations=2, seed=1)
+        self.assertEqual(self.query_counts(), small)
+
+    def test_post_list_is_paginated(self):
+        response = self.client.get(reverse("panel_post_list"), {"page": 2})
+        page = response.context["page_obj"]
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page.object_list), panel_views.PANEL_PAGE_SIZE)
+        self.assertEqual(page.paginator.count, Post.objects.count())
+
+    def test_post_list_filters(self):
+        category = Category.objects.annotate(n=Count("posts")).filter(n__gt=0).first()
+        cases = {
+            "status=published": ({"status": "published"}, Post.objects.filter(is_published=True)),
+            "status=draft": ({"status": "draft"}, Post.objects.filter(is_published=False)),
+            "featured=yes": ({"featured": "yes"}, Post.objects.filter(is_featured=True)),
+            "category": ({"category": category.slug}, Post.objects.filter(categories=category)),
+            "q": ({"q": "beach", "featured": "no"}, Post.objects.filter(title__icontains="beach", is_featured=False)),
+        }
+        for label, (params, expected) in cases.items():
+            with self.subTest(filter=label):
+                page = self.client.get(reverse("panel_post_list"), params).context["page_obj"]
+                self.assertEqual(page.paginator.count, expected.count())
+
+    def test_pagination_links_keep_the_filters(self):
+        response = self.client.get(reverse("panel_post_list"), {"status": "published"})
+        self.assertContains(response, "?status=published&amp;page=2")
+
+    def test_category_list_counts_posts(self):
+        response = self.client.get(reverse("panel_category_list"), {"q": Category.objects.first().name})
+        category = response.context["page_obj"][0]
+        self.assertEqual(category.post_count, category.posts.count())
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    SURROGATE_PURGE_BACKGROUND=False,
+    SURROGATE_PURGER="zikrmeblogapp.tests.RecordingPurger",
+    RELATED_POSTS_BACKGROUND=False,
+    HOME_SNAPSHOT_BACKGROUND=False,
+)
+class BulkPostActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=30, categories=3, destinations=1)
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        cache.clear()
+        self.pks = list(Post.objects.order_by("pk").values_list("pk", flat=True)[:10])
+
+    def run_action(self, action, category=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                count = bulk_posts.apply(action, self.pks, category=category)
+        return count, [q["sql"] for q in queries.captured_queries]
+
+    def test_flag_actions_are_one_update(self):
+        Post.objects.filter(pk__in=self.pks).update(is_published=False)
+        count, sql = self.run_action("publish")
+        self.assertEqual(count, 10)
+        self.assertEqual(len([q for q in sql if q.startswith('UPDATE "zikrmeblogapp_post"')]), 1)
+        self.assertEqual(Post.objects.filter(pk__in=self.pks, is_published=True).count(), 10)
+
+    def test_category_actions(self):
+        category = Category.objects.create(name="Bulk", slug="bulk")
+        Post.objects.get(pk=self.pks[0]).categories.add(category)
+        count, sql = self.run_action("add_category", category)
+        self.assertEqual(count, 9)  # the first post already had it
+        self.assertEqual(len([q for q in sql if q.startswith('INSERT INTO "zikrmeblogapp_post_categories"')]), 1)
+        self.assertEqual(category.posts.count(), 10)
+        count, _ = self.run_action("remove_category", category)
+        self.assertEqual(count, 10)
+        self.assertFalse(category.posts.exists())
+
+    def test_delete(self):
+        count, _ = self.run_action("delete")
+        self.assertEqual(count, 10)
+        self.assertFalse(Post.objects.filter(pk__in=self.pks).exists())
+
+    def test_invalidation_is_coalesced(self):
+        before = {name: caching.generation(name) for name in ("posts", "pages", "home", "dashboard-stats")}
+        PurgeEvent.objects.all().delete()
+        self.run_action("feature")
+        after = {name: caching.generation(name) for name in before}
+        self.assertEqual(after, {name: value + 1 for name, value in before.items()})
+        event = PurgeEvent.objects.get()
+        self.assertEqual(set(event.keys.split()), {"posts", *(f"post-{pk}" for pk in self.pks)})
+
+    def test_panel_endpoint(self):
+        self.client.force_login(self.user)
+        url = reverse("panel_post_bulk")
+        next_url = reverse("panel_post_list") + "?status=published"
+        response = self.client.post(url, {"action": "article", "ids": self.pks[:3], "next": next_url})
+        self.assertRedirects(response, next_url)
+        self.assertEqual(Post.objects.filter(pk__in=self.pks[:3], is_article=True).count(), 3)
+
+        response = self.client.post(url, {"action": "add_category", "ids": self.pks[:3]}, follow=True)
+        self.assertContains(response, "Choose a category for this action.")
+
+        response = self.client.post(url, {"action": "delete", "ids": self.pks[:1], "next": "https://evil.example/"})
+        self.assertRedirects(response, reverse("panel_post_list"))
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    SURROGATE_PURGE_BACKGROUND=False,
+    SURROGATE_PURGER="zikrmeblogapp.tests.RecordingPurger",
+    HOME_SNAPSHOT_BACKGROUND=False,
+)
+class ReorderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=0, categories=0, destinations=2, cities_per_destination=4)
+        cls.heroes = HeroImage.objects.bulk_create(
+            [HeroImage(image=f"hero/{i}.jpg", order=i) for i in range(5)]
+        )
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def post_ids(self, url, ids):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, json.dumps({"ids": ids}), content_type="application/json")
+
+    def test_hero_order_is_one_bulk_update(self):
+        ids = [h.pk for h in reversed(self.heroes)]
+        with CaptureQueriesContext(connection) as queries:
+            changed = reorder.reorder(HeroImage.objects.all(), ids)
+        self.assertEqual(changed, 4)  # the middle image keeps its place
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(HeroImage.objects.values_list("pk", flat=True)), ids)
+
+    def test_hero_endpoint_coalesces_invalidation(self):
+        before = {name: caching.generation(name) for name in ("pages", "home")}
+        PurgeEvent.objects.all().delete()
+        ids = [h.pk for h in self.heroes]
+        ids[0], ids[1] = ids[1], ids[0]
+        response = self.post_ids(reverse("panel_hero_reorder"), ids)
+        self.assertEqual(response.json(), {"ok": True, "changed": 2})
+        self.assertEqual({name: caching.generation(name) for name in before}, {k: v + 1 for k, v in before.items()})
+        self.assertEqual(PurgeEvent.objects.get().keys, "hero")
+        self.assertEqual([h.pk for h in home_snapshot.get()["hero_images"]], ids)
+
+    def test_incomplete_or_duplicate_ids_are_rejected(self):
+        url = reverse("panel_hero_reorder")
+        ids = [h.pk for h in self.heroes]
+        for bad in (ids[:-1], ids + ids[:1], ids[:-1] + ids[:1], "nope"):
+            with self.subTest(ids=bad):
+                self.assertEqual(self.post_ids(url, bad).status_code, 400)
+        self.assertEqual(self.client.post(url, "{", content_type="application/json").status_code, 400)
+        self.assertEqual(list(HeroImage.objects.values_list("pk", flat=True)), ids)
+
+    def test_malformed_payloads_get_a_readable_error(self):
+        url = reverse("panel_hero_reorder")
+        for body in ({"order": [1]}, [1, 2], {"ids": ["a"]}):
+            with self.subTest(body=body):
+                response = self.client.post(url, json.dumps(body), content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertGreater(len(response.json()["error"]), 10)
+        response = self.client.post(url, json.dumps({"order": [1]}), content_type="application/json")
+        self.assertIn('{"ids": [...]}', response.json()["error"])
+
+    def test_city_order_is_scoped_to_the_destination(self):
+        destination, other = Destination.objects.order_by("pk")[:2]
+        cities = list(destination.cities.values_list("pk", flat=True))
+        url = reverse("panel_destination_city_reorder", args=[destination.pk])
+        self.assertEqual(self.post_ids(url, cities + [other.cities.first().pk]).status_code, 400)
+        response = self.post_ids(url, cities[::-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(destination.cities.values_list("pk", flat=True)), cities[::-1])
+
+        page = self.client.get(reverse("panel_destination_edit", args=[destination.pk]))
+        self.assertContains(page, f'data-reorder-url="{url}"')
+
+    def test_hero_list_is_sortable_only_unfiltered(self):
+        url = reverse("panel_hero_list")
+        self.assertTrue(self.client.get(url).context["sortable"])
+        self.assertFalse(self.client.get(url, {"status": "active"}).context["sortable"])
+
+    def test_long_hero_list_is_shown_whole_for_sorting(self):
+        HeroImage.objects.bulk_create(
+            [HeroImage(image=f"hero/extra-{i}.jpg", order=10 + i) for i in range(panel_views.PANEL_PAGE_SIZE)]
+        )
+        response = self.client.get(reverse("panel_hero_list"))
+        self.assertTrue(response.context["sortable"])
+        self.assertEqual(len(response.context["items"]), HeroImage.objects.count())
+        self.assertContains(response, 'data-reorder-url="')
+
+
+class ListingQueryPlanTests(TestCase):
+    """The public listing queries must be served from an index in order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=300, categories=5, destinations=1)
+        HeroImage.objects.bulk_create(
+            [HeroImage(image=f"hero/{i}.jpg", order=i, is_active=i % 2 == 0) for i in range(20)]
+        )
+        PageHeroImage.objects.create(page="about", image="page_hero/about.jpg")
+
+    def plan(self, queryset):
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise always be scanned sequentially.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        elif connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        else:
+            self.skipTest(f"No plan expectations for {connection.vendor}")
+        return queryset.explain()
+
+    def assertIndexedInOrder(self, queryset, index_name):
+        plan = self.plan(queryset)
+        self.assertIn(index_name, plan)
+        if connection.vendor == "sqlite":
+            self.assertNotIn("TEMP B-TREE", plan)
+        else:
+            self.assertNotIn("Sort", plan)
+
+    def test_published_listing(self):
+        self.assertIndexedInOrder(Post.objects.filter(is_published=True)[:15], "post_published_idx")
+
+    def test_featured_listing(self):
+        self.assertIndexedInOrder(
+            Post.objects.filter(is_published=True, is_featured=True)[:12], "post_featured_idx"
+        )
+
+    def test_article_listing(self):
+        self.assertIndexedInOrder(
+            Post.objects.filter(is_published=True, is_article=True)[:12], "post_article_idx"
+        )
+
+    def test_panel_post_list(self):
+        self.assertIndexedInOrder(Post.objects.order_by("-created_at")[:25], "post_created_idx")
+
+    def test_active_hero_images(self):
+        self.assertIndexedInOrder(HeroImage.objects.filter(is_active=True), "hero_active_order_idx")
+
+    def test_page_hero_lookup_uses_unique_page_index(self):
+        plan = self.plan(PageHeroImage.objects.filter(page="about", is_active=True))
+        self.assertRegex(plan, "USING INDEX|Index Scan")
+
+
+# Routing decisions only: no query is sent, so the replica alias does not
+# need a live connection.
+@override_settings(DATABASES={**settings.DATABASES, "replica": settings.DATABASES["default"]})
+class ReplicaRoutingTests(SimpleTestCase):
+    def route(self, method, view, cookies=None, write=False):
+        router = PrimaryReplicaRouter()
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen["read"] = router.db_for_read(Post)
+            if write:
+                router.db_for_write(Post)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies or {})
+        response = middleware(request)
+        return seen["read"], response
+
+    def test_public_get_reads_from_replica(self):
+        self.assertEqual(self.route("get", views.posts_list)[0], "replica")
+
+    def test_panel_reads_from_primary(self):
+        self.assertEqual(self.route("get", panel_views.post_list)[0], "default")
+
+    def test_write_pins_browser_to_primary(self):
+        _, response = self.route("post", panel_views.category_create, write=True)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        read, _ = self.route("get", views.posts_list, cookies={STICKY_COOKIE: "1"})
+        self.assertEqual(read, "default")
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Post), "default")
+
+    def test_sessions_and_auth_stay_on_primary(self):
+        router = PrimaryReplicaRouter()
+
+        def get_response(request):
+            middleware.process_view(request, views.posts_list, (), {})
+            return HttpResponse(" ".join(router.db_for_read(model) for model in (Post, Session, get_user_model())))
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        self.assertEqual(middleware(RequestFactory().get("/")).content, b"replica default default")
+
+
+@override_settings(STORAGES=PLAIN_STATIC_STORAGES, VIEW_COUNT_FLUSH_EVERY=10**6, VIEW_COUNT_FLUSH_SECONDS=10**6)
+class ReplicaDatabaseTests(TestCase):
+    """A real second SQLite database as the replica, holding different rows."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The alias is added here rather than declared on the class, because
+        # the test runner would try to set up a "replica" test database that
+        # settings do not define.
+        cls.databases = {"default", "replica"}
+        tmp = cls.enterClassContext(tempfile.TemporaryDirectory())
+        name = f"{tmp}/replica.sqlite3"
+        default = connections.settings["default"]
+        connections.settings["replica"] = {**default, "NAME": name, "TEST": {**default["TEST"], "NAME": name}}
+        cls.addClassCleanup(cls.remove_replica)
+        # Migrations skip the replica (it mirrors the primary in production),
+        # so give this empty database the same tables directly.
+        with connections["replica"].schema_editor() as editor:
+            for model in apps.get_models():
+                editor.create_model(model)
+        cls.enterClassContext(override_settings(DATABASES={**settings.DATABASES, "replica": connections.settings["replica"]}))
+        super().setUpClass()
+
+    @staticmethod
+    def remove_replica():
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        Post.objects.using("replica").create(title="Only On The Replica", slug="replica-only", is_published=True)
+
+    def setUp(self):
+        cache.clear()
+        caches["local"].clear()
+
+    def test_public_reads_replica_and_saves_pin_the_editor_to_primary(self):
+        self.assertContains(self.client.get(reverse("posts_list")), "Only On The Replica")
+
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("panel_category_create"), {"name": "Fresh Snow"})
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        category = Category.objects.get(name="Fresh Snow")
+        self.assertFalse(Category.objects.using("replica").exists())
+
+        # The pinned editor reads the primary, which has the new category
+        # and not the replica's post; other visitors still read the replica.
+        pinned = self.client.get(reverse("posts_by_category", args=[category.slug]))
+        self.assertEqual(pinned.status_code, 200)
+        self.assertNotContains(self.client.get(reverse("posts_list")), "Only On The Replica")
+        visitor = Client()
+        self.assertEqual(visitor.get(reverse("posts_by_category", args=[category.slug])).status_code, 404)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = "<article class=\"card post-card\">" * 100
+
+    def get(self, response, accept_encoding=None):
+        request = RequestFactory().get("/")
+        if accept_encoding is not None:
+            request.META["HTTP_ACCEPT_ENCODING"] = accept_encoding
+        seen = {}
+
+        def get_response(request):
+            seen["accept_encoding"] = request.META.get("HTTP_ACCEPT_ENCODING")
+            return response
+
+        return CompressionMiddleware(get_response)(request), seen["accept_encoding"]
+
+    def test_negotiation_prefers_brotli_and_honours_q_values(self):
+        best = "br" if compression.brotli else "gzip"
+        self.assertEqual(compression.negotiate("gzip, deflate, br"), best)
+        self.assertEqual(compression.negotiate("br;q=0, gzip"), "gzip")
+        self.assertEqual(compression.negotiate("*"), best)
+        self.assertIsNone(compression.negotiate("identity"))
+        self.assertIsNone(compression.negotiate("gzip;q=0, br;q=0"))
+
+    def test_gzip_response(self):
+        response, seen = self.get(HttpResponse(self.BODY), "gzip, deflate")
+        self.assertEqual(seen, "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(response.content).decode(), self.BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_response(self):
+        response, _ = self.get(HttpResponse(self.BODY), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content).decode(), self.BODY)
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        chunks = [self.BODY[:1000], self.BODY[1000:]]
+        response, _ = self.get(StreamingHttpResponse(iter(chunks)), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        body = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body).decode(), self.BODY)
+
+    def test_without_accept_encoding_only_vary_is_added(self):
+        response, seen = self.get(HttpResponse(self.BODY))
+        self.assertIsNone(seen)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response.content.decode(), self.BODY)
+
+    def test_skips_encoded_small_and_binary_responses(self):
+        encoded = HttpResponse(b"x" * 1000, headers={"Content-Encoding": "gzip"})
+        small = HttpResponse("<p>hi</p>")
+        binary = HttpResponse(b"\x89PNG" * 500, content_type="image/png")
+        for original in (encoded, small, binary):
+            response, _ = self.get(original, "gzip")
+            self.assertIs(response, original)
+            self.assertFalse(response.has_header("Vary"))
+
+    def test_strong_etag_becomes_weak(self):
+        response, _ = self.get(HttpResponse(self.BODY, headers={"ETag": '"abc"'}), "gzip")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+
+
+class MinifyHTMLTests(SimpleTestCase):
+    def test_collapses_whitespace_and_strips_comments(self):
+        html = "<div>\n    <!-- Desktop overlay meta -->\n    <a>x</a>   <a>y</a>\n</div>\n"
+        self.assertEqual(minify_html(html), "<div>\n<a>x</a> <a>y</a>\n</div>")
+
+    def test_keeps_raw_blocks_and_conditional_comments(self):
+        html = (
+            "<pre>  a\n   b</pre>  <textarea>  x  </textarea>"
+            "<script>\n  if (a  <  b) {}  // <!-- x -->\n</script>"
+            "<!--[if IE]><p>old</p><![endif]-->"
+        )
+        self.assertEqual(minify_html(html), html.replace("</pre>  <", "</pre> <"))
+
+    def test_keeps_quoted_attribute_values(self):
+        html = (
+            '<img\n   alt="Two  spaces"   title=\'line\n  two\'>  '
+            '<input value="a   b" data-caption="x\t y"  class="c">  text'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<img\nalt="Two  spaces" title=\'line\n  two\'> '
+            '<input value="a   b" data-caption="x\t y" class="c"> text',
+        )
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+    PAGE_CACHE_SECONDS=60,
+)
+class HTMLMinifyMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def test_pages_are_minified_once_when_cached(self):
+        seed(posts=20, categories=3, destinations=1)
+        with mock.patch("zikrmeblogapp.middleware.minify_html", wraps=minify_html) as minify:
+            first = self.client.get(reverse("home"))
+            second = self.client.get(reverse("home"))
+        self.assertEqual(minify.call_count, 1)
+        self.assertNotIn(b"<!--", first.content)
+        self.assertNotIn(b"\n  ", first.content)
+        self.assertEqual(second.content, first.content)
+
+    @override_settings(PAGE_CACHE_SECONDS=0, HTML_MINIFY_FOR_CDN=True)
+    def test_pages_for_the_cdn_are_minified_when_enabled(self):
+        seed(posts=5, categories=2, destinations=1)
+        response = self.client.get(reverse("home"))
+        self.assertIn("s-maxage", response["Cache-Control"])
+        self.assertNotIn(b"\n  ", response.content)
+
+    @override_settings(PAGE_CACHE_SECONDS=0)
+    def test_uncached_pages_are_not_minified(self):
+        seed(posts=5, categories=2, destinations=1)
+        with mock.patch("zikrmeblogapp.middleware.minify_html") as minify:
+            self.client.get(reverse("home"))
+        minify.assert_not_called()
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    CACHES=LOCAL_CACHES,
+    REQUEST_TIMING=True,
+    REQUEST_TIMING_SLOW_MS=10**6,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+)
+class RequestTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=20, categories=2, destinations=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def timings(self, response):
+        return {
+            name: float(duration)
+            for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+        }
+
+    def test_header_reports_templates_and_queries(self):
+        response = self.client.get(reverse("posts_list"))
+        timing = self.timings(response)
+        self.assertGreater(timing["tpl"], 0)
+        self.assertGreaterEqual(timing["total"], timing["tpl"])
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+    def test_template_classes_are_not_patched(self):
+        from django.template.base import Template
+        self.client.get(reverse("posts_list"))
+        self.assertEqual(Template.render.__module__, "django.template.base")
+
+    @skipUnless(jinja2, "Jinja2 is not installed")
+    def test_jinja2_renders_are_timed(self):
+        with override_settings(TEMPLATES=[settings.JINJA2_TEMPLATE_ENGINE, *settings.TEMPLATES]):
+            response = self.client.get(reverse("posts_list"))
+        self.assertGreater(self.timings(response)["tpl"], 0)
+
+    @override_settings(PAGE_CACHE_SECONDS=60)
+    def test_cached_pages_report_their_own_timing(self):
+        first = self.client.get(reverse("about"))
+        second = self.client.get(reverse("about"))
+        self.assertGreater(self.timings(first)["tpl"], 0)
+        self.assertEqual(self.timings(second)["tpl"], 0)
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs("zikrmeblogapp.middleware", "WARNING") as logs:
+            self.client.get(reverse("about"))
+        self.assertIn("Slow request GET /about/", logs.output[0])
+
+
+class RecordingPurger:
+    calls = []
+
+    def purge(self, keys):
+        self.calls.append(set(keys))
+
+
+class FailingPurger:
+    def purge(self, keys):
+        raise ConnectionError("CDN unreachable")
+
+
+@override_settings(
+    STORAGES=PLAIN_STATIC_STORAGES,
+    VIEW_COUNT_FLUSH_EVERY=10**6,
+    VIEW_COUNT_FLUSH_SECONDS=10**6,
+    CDN_S_MAXAGE=300,
+    CDN_STALE_WHILE_REVALIDATE=60,
+    SURROGATE_PURGE_BACKGROUND=False,
+    SURROGATE_PURGER="zikrmeblogapp.tests.RecordingPurger",
+    RELATED_POSTS_BACKGROUND=False,
+    HOME_SNAPSHOT_BACKGROUND=False,
+)
+class SurrogateKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(posts=20, categories=3, destinations=1)
+        cls.post = Post.objects.filter(is_published=True).order_by("id").first()
+
+    def tearDown(self):
+        view_counts.flush()
+
+    def test_public_pages_carry_keys_and_shared_cache_headers(self):
+        response = self.client.get(reverse("post_detail", args=[self.post.slug]))
+        keys = response["Surrogate-Key"].split()
+        self.assertIn(f"post-{self.post.pk}", keys)
+        self.assertIn("footer", keys)
+        for category in self.post.categories.all():
+            self.assertIn(f"category-{category.pk}", keys)
+        cache_control = response["Cache-Control"]
+        self.assertIn("public", cache_control)
+        self.assertIn("s-maxage=300", cache_control)
+        self.assertIn("stale-while-revalidate=60", cache_control)
+
+        listing = self.client.get(reverse("posts_list"))
+        self.assertIn("posts", listing["Surrogate-Key"].split())
+
+    def test_per_visitor_responses_are_private(self):
+        contact = self.client.get(reverse("contact"))  # CSRF cookie
+        self.assertNotIn("Surrogate-Key", contact)
+        self.assertIn("private", contact["Cache-Control"])
+
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+        home = self.client.get(reverse("home"))
+        self.assertNotIn("Surrogate-Key", home)
+        self.assertIn("private", home["Cache-Control"])
+
+    def test_saves_queue_purges_that_the_purger_consumes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = "Renamed"
+            self.post.save()
+            HeroImage.objects.create(image="hero/new.jpg")
+        queued = " ".join(PurgeEvent.objects.values_list("keys", flat=True)).split()
+        self.assertIn(f"post-{self.post.pk}", queued)
+        self.assertIn("posts", queued)
+        self.assertIn("hero", queued)
+
+        pending = PurgeEvent.objects.count()
+        with tempfile.NamedTemporaryFile("r", suffix=".log") as log:
+            with override_settings(
+                SURROGATE_PURGER="zikrmeblogapp.surrogate.FilePurger", SURROGATE_PURGE_LOG=log.name
+            ):
+                self.assertEqual(surrogate.process_purges(), pending)
+            entries = [json.loads(line) for line in log]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(set(entries[0]["keys"]), set(queued))
+        self.assertFalse(PurgeEvent.objects.exists())
+        self.assertEqual(surrogate.process_purges(), 0)
+
+    @override_settings(SURROGATE_PURGER="zikrmeblogapp.surrogate.NullPurger")
+    def test_nothing_is_queued_without_a_purger(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            HeroImage.objects.create(image="hero/new.jpg")
+        self.assertFalse(PurgeEvent.objects.exists())
+
+    def test_drain_empties_the_queue_in_batches(self):
+        RecordingPurger.calls = []
+        PurgeEvent.objects.bulk_create([PurgeEvent(keys=f"post-{i}") for i in range(25)])
+        self.assertEqual(surrogate.drain(batch_size=10), 25)
+        self.assertEqual(len(RecordingPurger.calls), 3)
+        self.assertEqual(set().union(*RecordingPurger.calls), {f"post-{i}" for i in range(25)})
+        self.assertFalse(PurgeEvent.objects.exists())
+
+    def test_drain_prunes_events_given_up_long_ago(self):
+        now = timezone.now()
+        PurgeEvent.objects.create(keys="hero", attempts=5, processed_at=now - timedelta(days=8))
+        recent = PurgeEvent.objects.create(keys="hero", attempts=5, processed_at=now - timedelta(days=1))
+        surrogate.drain()
+        self.assertEqual(list(PurgeEvent.objects.values_list("pk", flat=True)), [recent.pk])
+
+    def test_city_media_purges_the_destination_page_through_its_city(self):
+        destination = Destination.objects.prefetch_related("cities").first()
+        city = destination.cities.all()[0]
+        response = self.client.get(reverse("destination_detail", args=[destination.slug]))
+        self.assertIn(f"city-{city.pk}", response["Surrogate-Key"].split())
+
+        PurgeEvent.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                CityMedia.objects.create(city_id=city.pk, youtube_url="https://youtu.be/x")
+        self.assertEqual(PurgeEvent.objects.get().keys, f"city-{city.pk}")
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith("SELECT")])
+
+    @override_settings(SURROGATE_PURGER="zikrmeblogapp.tests.FailingPurger")
+    def test_failed_purges_stay_pending(self):
+        PurgeEvent.objects.create(keys="hero")
+        self.assertEqual(surrogate.process_purges(), 0)
+        event = PurgeEvent.objects.get()
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("CDN unreachable", event.last_error)
+
+
+class StampedeCacheTests(TestCase):
+    def setUp(self):
+        self.cache = LocMemCache(self.id(), {})
+        self.calls = 0
+
+    def compute(self, value="fresh", delay=0.0):
+        def run():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return run
+
+    def get(self, compute, timeout=60, **kwargs):
+        return caching.get_or_compute("key", compute, timeout, cache=self.cache, **kwargs)
+
+    def store(self, value, expires_in, compute_seconds=0.0):
+        self.cache.set("key", (value, time.time() + expires_in, compute_seconds), 300)
+
+    def test_concurrent_misses_compute_once(self):
+        results = []
+        compute = self.compute(delay=0.2)
+        threads = [threading.Thread(target=lambda: results.append(self.get(compute))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["fresh"] * 8)
+
+    def test_stale_value_is_served_while_one_caller_recomputes(self):
+        self.store("stale", expires_in=-1)
+        leader = threading.Thread(target=self.get, args=(self.compute(delay=0.3),))
+        leader.start()
+        time.sleep(0.05)
+        started = time.perf_counter()
+        self.assertEqual(self.get(self.compute()), "stale")
+        self.assertLess(time.perf_counter() - started, 0.2)
+        leader.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.get(self.compute()), "fresh")
+
+    def test_other_process_recomputing_serves_stale(self):
+        self.store("stale", expires_in=-1)
+        self.cache.add("key:lock", 1, 30)  # held by another worker
+        self.assertEqual(self.get(self.compute()), "stale")
+        self.assertEqual(self.calls, 0)
+
+    def test_slow_entries_refresh_early(self):
+        self.store("old", expires_in=5, compute_seconds=2.0)
+        with mock.patch("zikrmeblogapp.caching.random.random", return_value=0.01):
+            self.assertEqual(self.get(self.compute()), "fresh")  # 2s * -ln(0.01) > 5s
+        self.store("old", expires_in=5, compute_seconds=0.001)
+        with mock.patch("zikrmeblogapp.caching.random.random", return_value=0.01):
+            self.assertEqual(self.get(self.compute()), "old")
+
+    def test_should_cache_can_veto(self):
+        self.get(self.compute("error"), should_cache=lambda value: value != "error")
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_generations(self):
+        first = caching.generation("posts", cache=self.cache)
+        self.assertEqual(caching.generation("posts", cache=self.cache), first)
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.bump("posts", cache=self.cache)
+            self.assertEqual(caching.generation("posts", cache=self.cache), first)
+        self.assertEqual(caching.generation("posts", cache=self.cache), first + 1)
+
+    def test_evicted_generation_starts_a_new_namespace(self):
+        first = caching.generation("posts", cache=self.cache)
+        self.cache.delete("generation:posts")
+        self.assertNotEqual(caching.generation("posts", cache=self.cache), first)
+
+
+class SharedCacheTests(TestCase):
+    """Two backend instances on one location stand in for two workers."""
+
+    def workers(self, url):
+        config = cache_from_url(url)
+        return [import_string(config["BACKEND"])(config["LOCATION"], config) for _ in range(2)]
+
+    def local_backends(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return {"db": self.workers("db://django_cache"), "file": self.workers(f"file://{tmp.name}")}
+
+    def test_cache_urls(self):
+        self.assertEqual(cache_from_url("redis://cache:6379/1")["LOCATION"], "redis://cache:6379/1")
+        self.assertEqual(cache_from_url("memcached://a:11211,b:11211")["LOCATION"], ["a:11211", "b:11211"])
+        self.assertEqual(cache_from_url("db://page_cache")["LOCATION"], "page_cache")
+        self.assertEqual(cache_from_url("file:///var/cache/zikrme")["LOCATION"], "/var/cache/zikrme")
+        self.assertIsInstance(self.workers("db://django_cache")[0], DatabaseCache)
+        with self.assertRaises(ValueError):
+            cache_from_url("mongodb://cache")
+
+    def test_sessions_use_the_cache_only_when_it_is_shared(self):
+        cached_db = "django.contrib.sessions.backends.cached_db"
+        self.assertEqual(session_engine(cache_from_url("redis://cache:6379/1")), cached_db)
+        self.assertEqual(session_engine(cache_from_url("memcached://a:11211")), cached_db)
+        for url in ("db://django_cache", "file:///var/cache/zikrme", "locmem://"):
+            with self.subTest(url=url):
+                self.assertEqual(session_engine(cache_from_url(url)), "django.contrib.sessions.backends.db")
+        signed = "django.contrib.sessions.backends.signed_cookies"
+        self.assertEqual(session_engine(cache_from_url("locmem://"), signed), signed)
+        for engine in (cached_db, "django.contrib.sessions.backends.cache"):
+            with self.subTest(engine=engine), self.assertRaises(ValueError):
+                session_engine(cache_from_url("locmem://"), engine)
+
+    def test_entries_are_shared_between_workers(self):
+        for name, (first, second) in self.local_backends().items():
+            with self.subTest(backend=name):
+                first.set("greeting", "hello", 60)
+                self.assertEqual(second.get("greeting"), "hello")
+                second.delete("greeting")
+                self.assertIsNone(first.get("greeting"))
+
+    def test_one_bump_invalidates_every_worker(self):
+        for name, (first, second) in self.local_backends().items():
+            with self.subTest(backend=name):
+                before = caching.generation("posts", cache=first)
+                self.assertEqual(caching.generation("posts", cache=second), before)
+                with self.captureOnCommitCallbacks(execute=True):
+                    caching.bump("posts", cache=second)
+                self.assertNotEqual(caching.generation("posts", cache=first), before)
+
+    def test_interleaved_advances_get_distinct_generations(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        first, second = self.workers(f"file://{tmp.name}")
+        start = caching.generation("posts", cache=first)
+        results = []
+        other = threading.Thread(target=lambda: results.append(caching.advance("posts", cache=second)))
+        read = first.get
+
+        def read_then_let_the_other_worker_advance(*args, **kwargs):
+            value = read(*args, **kwargs)
+            if not other.is_alive() and not results:
+                other.start()
+                other.join(0.2)  # blocks on the lock; without it this would finish first
+            return value
+
+        with mock.patch.object(first, "get", read_then_let_the_other_worker_advance):
+            results.append(caching.advance("posts", cache=first))
+        other.join()
+        self.assertEqual(sorted(results), [start + 1, start + 2])
+        self.assertEqual(caching.generation("posts", cache=second), start + 2)
+
+    def test_database_advance_locks_the_row_first(self):
+        first, _ = self.workers("db://django_cache")
+        start = caching.generation("posts", cache=first)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(caching.advance("posts", cache=first), start + 1)
+        statements = [q["sql"] for q in queries.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertTrue(statements[0].startswith("UPDATE") and "expires = expires" in statements[0], statements)
+
+    def test_recompute_lock_spans_workers(self):
+        for name, (first, second) in self.local_backends().items():
+            with self.subTest(backend=name):
+                first.set("page", ("stale", time.time() - 1, 0.0), 300)
+                first.add("page:lock", 1, 30)  # the first worker is recomputing
+                self.assertEqual(caching.get_or_compute("page", lambda: "fresh", 60, cache=second), "stale")
+
+    @override_settings(SURROGATE_PURGE_BACKGROUND=False, HOME_SNAPSHOT_BACKGROUND=False)
+    def test_content_change_drops_cached_pages(self):
+        before = caching.generation("pages")
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Travel", slug="travel")
+        self.assertNotEqual(caching.generation("pages"), before)
+
+    def test_entries_stay_out_of_the_database_cache(self):
+        self.assertIsInstance(caches["default"], DatabaseCache)
+        caching.get_or_compute("query:example", lambda: "value", 60)
+        self.assertIsNotNone(caches["local"].get("query:example"))
+        self.assertIsNone(cache.get("query:example"))
+
+    def test_a_request_reads_generations_in_one_query(self):
+        cache.clear()
+        for name in caching.GENERATIONS:
+            caching.generation(name)
+        caching._start_request()
+        self.addCleanup(caching._finish_request)
+        with CaptureQueriesContext(connection) as queries:
+            first = {name: caching.generation(name) for name in caching.GENERATIONS}
+            self.assertEqual({name: caching.generation(name) for name in caching.GENERATIONS}, first)
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        self.assertEqual(caching.advance("posts"), first["posts"] + 1)
+        self.assertEqual(caching.generation("posts"), first["posts"] + 1)
+        cache.incr("generation:categories")  # another worker's bump
+        self.assertEqual(caching.generation("categories"), first["categories"])
+        caching._finish_request()
+        self.assertEqual(caching.generation("categories"), first["categories"] + 1)
@@ -0,0 +1,103 @@
+"""Buffered page view counters for posts and destinations.
+
+Detail views call ``record()``, which only bumps an in-process counter.
+The buffer is written out with one ``bulk_update`` per model, using
+``F("view_count") + n`` so concurrent flushes from several gunicorn
+workers add up instead of overwriting each other. A flush is scheduled
+on a background thread every ``VIEW_COUNT_FLUSH_EVERY`` hits or when
+``VIEW_COUNT_FLUSH_SECONDS`` have passed since the last one, and runs
+inline at interpreter exit.
+
+Edit forms load the counter with the rest of the row; ``keep_stored()``
+stops their save from writing that stale value back.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = Counter()  # (model, pk) -> hits not yet written
+_hits = 0
+_last_flush = time.monotonic()
+
+
+def record(instance) -> None:
+    """Count one view of ``instance`` (a Post or Destination)."""
+    global _hits
+    flush_every = getattr(settings, "VIEW_COUNT_FLUSH_EVERY", 50)
+    flush_seconds = getattr(settings, "VIEW_COUNT_FLUSH_SECONDS", 30)
+    with _lock:
+        _pending[(type(instance), instance.pk)] += 1
+        _hits += 1
+        due = _hits >= flush_every or time.monotonic() - _last_flush >= flush_seconds
+    if due:
+        schedule_flush()
+
+
+def keep_stored(instance) -> None:
+    """Make the next save of an existing ``instance`` leave ``view_count`` as stored."""
+    if not instance._state.adding:
+        instance.view_count = F("view_count")
+
+
+def flush() -> int:
+    """Write buffered counts to the database; returns the number of rows updated."""
+    global _pending, _hits, _last_flush
+    with _lock:
+        pending, _pending = _pending, Counter()
+        _hits = 0
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    by_model = {}
+    for (model, pk), hits in pending.items():
+        obj = model(pk=pk)
+        obj.view_count = F("view_count") + hits
+        by_model.setdefault(model, []).append(obj)
+
+    try:
+        with transaction.atomic():
+            for model, objs in by_model.items():
+                model.objects.bulk_update(objs, ["view_count"], batch_size=500)
+    except Exception:
+        logger.exception("Flushing view counts failed; keeping them for the next flush")
+        with _lock:
+            _pending.update(pending)
+        return 0
+    return len(pending)
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="view-counts")
+_scheduled = threading.Event()
+
+
+def _run():
+    _scheduled.clear()
+    close_old_connections()
+    try:
+        flush()
+    finally:
+        connection.close()
+
+
+def schedule_flush() -> None:
+    """Flush on the background thread; set ``VIEW_COUNT_FLUSH_BACKGROUND = False`` to flush inline."""
+    if not getattr(settings, "VIEW_COUNT_FLUSH_BACKGROUND", True):
+        flush()
+    elif not _scheduled.is_set():
+        _scheduled.set()
+        _executor.submit(_run)
+
+
+atexit.register(flush)
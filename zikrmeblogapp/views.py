@@ -1,10 +1,17 @@
-from django.db.models import Q
+import hashlib
+
+from django.db.models import Count, Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
 
-from .models import Category, HeroImage, Post, Destination, PageHeroImage, HomeMiniVideo
+from .models import Category, HeroImage, Post, Destination, PageHeroImage, HomeMiniVideo, RelatedPost
 from .forms import ContactForm
-from django.core.mail import send_mail
+from .related import RELATED_LIMIT
+from .search_index import index as search_index
+from . import caching, home_snapshot, outbox, surrogate, view_counts
 from django.conf import settings
 
 
@@ -12,7 +19,15 @@ def home(request):
     query = request.GET.get("q", "").strip()
     category_slug = request.GET.get("category")
 
-    posts = Post.objects.filter(is_published=True)
+    if not query and not category_slug and home_snapshot.enabled():
+        snapshot = home_snapshot.get()
+        surrogate.tag(
+            request, "posts", "categories", "hero", "home-video",
+            snapshot["posts_sample"], snapshot["featured_posts"], snapshot["article_posts"], snapshot["categories"],
+        )
+        return render(request, "home.html", {**snapshot, "selected_category": None, "query": ""})
+
+    posts = Post.objects.filter(is_published=True).prefetch_related("categories", "links")
     if query:
         posts = posts.filter(
             Q(title__icontains=query)
@@ -32,12 +47,17 @@ def home(request):
 
     hero_images = HeroImage.objects.filter(is_active=True)
     home_mini_video = HomeMiniVideo.objects.filter(is_active=True).first()
+    posts_sample = posts[:15]
+    surrogate.tag(
+        request, "posts", "categories", "hero", "home-video",
+        posts_sample, featured_posts, article_posts, categories,
+    )
 
     context = {
         "hero_images": hero_images,
         "categories": categories,
         "selected_category": selected_category,
-        "posts_sample": posts[:15],
+        "posts_sample": posts_sample,
         "featured_posts": featured_posts,
         "article_posts": article_posts,
         "query": query,
@@ -46,48 +66,133 @@ def home(request):
     return render(request, "home.html", context)
 
 
-def posts_list(request):
-    query = request.GET.get("q", "").strip()
+POSTS_PER_PAGE = 15
+POSTS_MORE_CACHE_SECONDS = 120
+
+
+def _listing_posts(kind: str, slug: str = "", query: str = ""):
+    """Return ``(posts, category)`` for one of the public post listings.
+
+    Shared by the full listing pages and the ``posts_more`` fragment
+    endpoint so both page through exactly the same queryset.
+    """
     posts = Post.objects.filter(is_published=True)
+    category = None
+    if kind == "featured":
+        posts = posts.filter(is_featured=True)
+    elif kind == "articles":
+        posts = posts.filter(is_article=True)
+    elif kind == "category":
+        category = get_object_or_404(Category, slug=slug)
+        posts = posts.filter(categories=category)
     if query:
         posts = posts.filter(Q(title__icontains=query) | Q(description__icontains=query))
-    paginator = Paginator(posts, 15)
+    return posts.prefetch_related("categories", "links"), category
+
+
+def posts_list(request):
+    query = request.GET.get("q", "").strip()
+    posts, _ = _listing_posts("blogs", query=query)
+    paginator = Paginator(posts, POSTS_PER_PAGE)
     page = request.GET.get("page")
     paginated = paginator.get_page(page)
-    return render(request, "posts_list.html", {"page_obj": paginated, "query": query})
+    surrogate.tag(request, "posts", paginated.object_list)
+    return render(
+        request,
+        "posts_list.html",
+        {"page_obj": paginated, "query": query, "list_kind": "blogs"},
+    )
 
 
 def posts_by_category(request, slug: str):
-    category = get_object_or_404(Category, slug=slug)
-    posts = Post.objects.filter(is_published=True, categories=category)
-    paginator = Paginator(posts, 15)
+    posts, category = _listing_posts("category", slug=slug)
+    paginator = Paginator(posts, POSTS_PER_PAGE)
     page = request.GET.get("page")
     paginated = paginator.get_page(page)
+    surrogate.tag(request, "posts", category, paginated.object_list)
     return render(
         request,
         "posts_list.html",
-        {"page_obj": paginated, "category": category},
+        {"page_obj": paginated, "category": category, "list_kind": "category"},
     )
 
 
 def featured_list(request):
-    posts = Post.objects.filter(is_published=True, is_featured=True)
-    paginator = Paginator(posts, 15)
+    posts, _ = _listing_posts("featured")
+    paginator = Paginator(posts, POSTS_PER_PAGE)
     page = request.GET.get("page")
     paginated = paginator.get_page(page)
-    return render(request, "posts_list.html", {"page_obj": paginated, "list_title": "Featured Posts"})
+    surrogate.tag(request, "posts", paginated.object_list)
+    return render(
+        request,
+        "posts_list.html",
+        {"page_obj": paginated, "list_title": "Featured Posts", "list_kind": "featured"},
+    )
 
 
 def articles_list(request):
-    posts = Post.objects.filter(is_published=True, is_article=True)
-    paginator = Paginator(posts, 15)
+    posts, _ = _listing_posts("articles")
+    paginator = Paginator(posts, POSTS_PER_PAGE)
     page = request.GET.get("page")
     paginated = paginator.get_page(page)
-    return render(request, "posts_list.html", {"page_obj": paginated, "list_title": "Latest Articles"})
+    surrogate.tag(request, "posts", paginated.object_list)
+    return render(
+        request,
+        "posts_list.html",
+        {"page_obj": paginated, "list_title": "Latest Articles", "list_kind": "articles"},
+    )
+
+
+@require_GET
+def posts_more(request):
+    """Return the next batch of rendered post cards for infinite scroll.
+
+    The cursor is the offset of the first card to render. One extra row is
+    fetched to tell whether another batch exists, so no COUNT query is run.
+    """
+    kind = request.GET.get("list", "blogs")
+    if kind not in {"blogs", "featured", "articles", "category"}:
+        return JsonResponse({"error": "Unknown listing."}, status=400)
+    try:
+        cursor = max(0, int(request.GET.get("cursor", 0)))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+
+    query = request.GET.get("q", "").strip()
+    slug = request.GET.get("slug", "")
+
+    def render_batch():
+        posts, _ = _listing_posts(kind, slug=slug, query=query)
+        batch = list(posts[cursor:cursor + POSTS_PER_PAGE + 1])
+        has_more = len(batch) > POSTS_PER_PAGE
+        batch = batch[:POSTS_PER_PAGE]
+        # The cards only read ``request`` (for the YouTube embed origin), so
+        # pass it as a variable instead of running every context processor.
+        html = render_to_string("partials/post_cards.html", {"posts": batch, "request": request})
+        return html, cursor + len(batch) if has_more else None, [p.pk for p in batch]
+
+    # Rendered card batches are shared by every visitor scrolling the same list.
+    digest = hashlib.md5(f"{request.get_host()}|{kind}|{slug}|{query}".encode()).hexdigest()
+    html, next_cursor, pks = caching.get_or_compute(
+        f"fragment:post-cards:{caching.generation('posts')}:{digest}:{cursor}",
+        render_batch,
+        POSTS_MORE_CACHE_SECONDS,
+    )
+    surrogate.tag(request, "posts", *(f"post-{pk}" for pk in pks))
+    return JsonResponse({"html": html, "cursor": next_cursor})
+
+
+@require_GET
+def search_suggest(request):
+    """Autocomplete titles from the in-memory prefix index (no DB access)."""
+    query = request.GET.get("q", "").strip()[:100]
+    surrogate.tag(request, "posts")
+    return JsonResponse({"results": search_index.suggest(query)})
 
 
 def about(request):
     hero_image = PageHeroImage.objects.filter(page='about', is_active=True).first()
+    surrogate.tag(request, "page-hero-about")
     return render(request, "about.html", {"hero_image": hero_image})
 
 
@@ -96,28 +201,20 @@ def contact(request):
     success = False
     error_message = None
     form = ContactForm(request.POST or None)
-    
-    # Debug info
-    print(f"Request method: {request.method}")
-    print(f"Form is valid: {form.is_valid()}")
-    if request.method == "POST":
-        print(f"POST data: {request.POST}")
-        print(f"Form errors: {form.errors}")
-    
+
     if request.method == "POST" and form.is_valid():
         data = form.cleaned_data
         subject = f"New contact message from {data['name']}"
         body = f"From: {data['name']} <{data['email']}>\n\n{data['message']}"
         try:
-            from django.core.mail import EmailMessage
-            email = EmailMessage(
+            # Queued in the outbox; delivery happens off the request path.
+            outbox.enqueue(
                 subject,
                 body,
                 data['email'],  # use sender's email as FROM
-                ["01personal002@gmail.com"],
-                headers={"Reply-To": data['email']},
+                settings.CONTACT_RECIPIENTS,
+                reply_to=data['email'],
             )
-            email.send()
             success = True
             form = ContactForm()
         except Exception as e:
@@ -133,28 +230,44 @@ def contact(request):
 
 def categories_view(request):
     hero_image = PageHeroImage.objects.filter(page='categories', is_active=True).first()
-    return render(request, "categories.html", {"categories": Category.objects.all(), "hero_image": hero_image})
+    categories = Category.objects.annotate(post_count=Count("posts"))
+    surrogate.tag(request, "page-hero-categories", "categories", "posts", categories)
+    return render(request, "categories.html", {"categories": categories, "hero_image": hero_image})
 
 
 def destinations(request):
     hero_image = PageHeroImage.objects.filter(page='destination', is_active=True).first()
     items = Destination.objects.all()
+    surrogate.tag(request, "page-hero-destination", "destinations", items)
     return render(request, "destination.html", {"destinations": items, "hero_image": hero_image})
 
 
 def destination_detail(request, slug: str):
-    dest = get_object_or_404(Destination, slug=slug)
+    dest = get_object_or_404(Destination.objects.prefetch_related("cities__media"), slug=slug)
+    view_counts.record(dest)
+    surrogate.tag(request, dest, dest.cities.all())
     return render(request, "destination_detail.html", {"destination": dest})
 
 
 def post_detail(request, slug: str):
-    post = get_object_or_404(Post, slug=slug, is_published=True)
-    return render(request, "post_detail.html", {"post": post})
+    post = get_object_or_404(
+        Post.objects.prefetch_related("categories", "links"), slug=slug, is_published=True
+    )
+    view_counts.record(post)
+    related_posts = [
+        entry.related
+        for entry in RelatedPost.objects.filter(post=post, related__is_published=True)
+        .select_related("related")[:RELATED_LIMIT]
+    ]
+    surrogate.tag(request, "related", post, post.categories.all(), related_posts)
+    return render(request, "post_detail.html", {"post": post, "related_posts": related_posts})
 
 
 def privacy_policy(request):
+    surrogate.tag(request, "pages")
     return render(request, "privacy_policy.html")
 
 
 def terms_and_conditions(request):
+    surrogate.tag(request, "pages")
     return render(request, "terms_and_conditions.html")
\ No newline at end of file
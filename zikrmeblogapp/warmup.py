@@ -0,0 +1,88 @@
+"""Warm per-process state before the first request is served.
+
+Run from the gunicorn master (``gunicorn.conf.py``) after the app is
+preloaded, so the compiled templates, URL resolver and search index are
+built once and shared copy-on-write by every forked worker.
+"""
+
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def template_names():
+    """Names of every template under the Django engine's template directories."""
+    names = set()
+    for config in settings.TEMPLATES:
+        if not config["BACKEND"].endswith(".DjangoTemplates"):
+            continue
+        for directory in config.get("DIRS", []):
+            root = Path(directory)
+            names.update(
+                path.relative_to(root).as_posix()
+                for path in root.rglob("*.html")
+            )
+    return sorted(names)
+
+
+def template_sources():
+    """(engine, name) for every template the project ships, per engine."""
+    django_names = template_names()
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates):
+            names = django_names
+        elif hasattr(engine, "env"):  # Jinja2
+            names = engine.env.list_templates(extensions=["html"])
+        else:
+            continue
+        for name in names:
+            yield engine, name
+
+
+def compile_templates():
+    """Compile every template into its engine's cache; raises on syntax errors."""
+    count = 0
+    for engine, name in template_sources():
+        engine.get_template(name)
+        count += 1
+    return count
+
+
+def resolve_urls():
+    # Building the reverse map imports every URLconf and view module.
+    return len(get_resolver().reverse_dict)
+
+
+def prime_caches():
+    from . import home_snapshot
+    from .search_index import index as search_index
+
+    try:
+        search_index.ensure_built()
+    except DatabaseError:
+        logger.warning("Skipping search index warm-up: database not ready")
+    if home_snapshot.enabled():
+        try:
+            home_snapshot.get()
+        except DatabaseError:
+            logger.warning("Skipping home snapshot warm-up: database not ready")
+
+
+def warm_up():
+    """Run every warm-up step; returns the seconds each one took."""
+    timings = {}
+    for step in (resolve_urls, compile_templates, prime_caches):
+        started = time.perf_counter()
+        step()
+        timings[step.__name__] = time.perf_counter() - started
+    # Never hand an open database connection to forked workers.
+    connections.close_all()
+    return timings